@@ -1,17 +1,46 @@
 import argparse
+import asyncio
+import copy
 import logging
+import multiprocessing
+import socket
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
 import json
 import time
+import numpy as np
 from tqdm import tqdm
 
 from src.utils.offline_manager import OfflineModelManager
+from src.utils.memory_governor import MemoryGovernor
+from src.utils.page_hash import PerceptualHashIndex, dhash, thumbnail
+from src.utils.work_queue import WorkQueue, default_worker_id
+from src.utils.resource_manager import CoreBudget
+from src.utils.pdf_exporter import ClassPDFExporter
+from src.utils.feature_store import FeatureStore, FeatureStoreWriter
+from src.utils.cost_model import CostModel, schedule
+from src.utils.watchdog import Deadline, StageTimeout, Watchdog, latency_report
+from src.utils.input_sources import InputItem, item_from_name, iter_items
 from src.preprocessing.pdf_processor import PDFProcessor
+from src.preprocessing.orientation import OrientationDetector
+from src.preprocessing.script_detector import ScriptDetector
 from src.cv_module.template_detector import TemplateDetector
+from src.cv_module.hybrid_classifier import HybridCVClassifier
 from src.nlp_module.ocr_extractor import OCRExtractor
 from src.nlp_module.pattern_matcher import PatternMatcher
+from src.nlp_module.text_classifier import TextClassifier
 from src.fusion.multimodal_fusion import MultimodalFusion
-from src.config.config import CLASSES, DATA_DIR
+from src.config.rules import RuleStore
+from src.config.profiles import resolve_profile
+from src.config.config import (
+    CLASSES, DATA_DIR, PIPELINE_CONFIG, DOCUMENT_MODE_CONFIG, DEDUP_CONFIG,
+    LAYOUT_INDEX_CONFIG, QUEUE_CONFIG, CV_CONFIG, OCR_ESCALATION_CONFIG, ORIENTATION_CONFIG,
+    EXPORT_CONFIG, OCR_PROFILES, DEADLINE_CONFIG, INPUT_CONFIG, TEXT_CLASSIFIER_CONFIG,
+    WORD_LAYOUT_CONFIG, PERFORMANCE_PROFILES, LARGE_DOCUMENT_CONFIG, SCRIPT_CONFIG, MEMORY_CONFIG
+)
 
 # Configuration du logging
 logging.basicConfig(
@@ -22,69 +51,201 @@ logging.basicConfig(
 class DocumentClassifier:
     """Pipeline principal de classification"""
     
-    def __init__(self, models_dir):
+    def __init__(self, models_dir, memory_budget_mb=None, document_mode=None,
+                 dedup=None, dedup_threshold=None, rules_path=None, export_format=None,
+                 ocr_profile=None, progress=None, performance_profile=None, page_workers=None):
         self.logger = logging.getLogger(__name__)
         
         # Initialisation des modules
         self.logger.info("🚀 Initialisation du système...")
         
+        # Règles de classification partagées (YAML rechargé à chaud)
+        self.rule_store = RuleStore(rules_path)
+        
+        # Profil de performance: dpi, débruitage, détecteurs et OCR réglés ensemble
+        self.performance = resolve_profile(performance_profile)
+        self.logger.info(f"⚙️ Profil de performance: {self.performance['name']}")
+        
         self.model_manager = OfflineModelManager(models_dir)
-        self.pdf_processor = PDFProcessor()
-        self.template_detector = TemplateDetector()
-        self.ocr_extractor = OCRExtractor()
-        self.pattern_matcher = PatternMatcher()
-        self.fusion = MultimodalFusion()
+        self.pdf_processor = PDFProcessor(self.performance)
+        self.orientation_detector = OrientationDetector() if ORIENTATION_CONFIG['enabled'] else None
+        self.script_detector = ScriptDetector() if SCRIPT_CONFIG['enabled'] else None
+        self.template_detector = TemplateDetector(
+            layout_index_path=Path(models_dir) / LAYOUT_INDEX_CONFIG['index_file'],
+            rule_store=self.rule_store,
+            performance=self.performance
+        )
+        # --ocr-profile l'emporte sur le profil OCR du profil de performance
+        self.ocr_extractor = OCRExtractor(
+            profile=ocr_profile or self.performance['ocr_profile'],
+            rule_store=self.rule_store
+        )
+        self.pattern_matcher = PatternMatcher(rule_store=self.rule_store)
+        self.fusion = MultimodalFusion(rule_store=self.rule_store)
+        
+        # CNN entraîné sur nos documents (optionnel: gabarits seuls sinon)
+        # (graphe ONNX ou checkpoint torch selon le backend d'inférence configuré)
+        self.cv_classifier = None
+        cnn_path = self.model_manager.cv_artifact_path()
+        if CV_CONFIG['use_cnn'] and not cnn_path.exists():
+            if self.model_manager.cv_checkpoint_path().exists():
+                self.logger.warning(f"⚠️ Graphe ONNX du CNN absent ({cnn_path}, lancer scripts/export_onnx.py): gabarits seuls")
+            else:
+                self.logger.info("ℹ️ Aucun CNN entraîné: gabarits seuls")
+        elif CV_CONFIG['use_cnn']:
+            try:
+                self.cv_classifier = HybridCVClassifier(self.model_manager, self.pdf_processor)
+            except Exception as e:
+                self.logger.warning(f"⚠️ Modèle CV indisponible, gabarits seuls: {e}")
+        
+        # Classifieur de texte TF-IDF entraîné (optionnel: mots-clés seuls sinon)
+        self.text_classifier = load_text_classifier(self.model_manager)
+        self.memory_governor = MemoryGovernor(budget_mb=memory_budget_mb)
+        
+        # Mode document: échantillonnage des pages et propagation du label
+        if document_mode is None:
+            document_mode = DOCUMENT_MODE_CONFIG['enabled']
+        self.document_mode = document_mode
+        
+        # Index de hashes perceptuels pour réutiliser les quasi-doublons
+        if dedup is None:
+            dedup = DEDUP_CONFIG['enabled']
+        self.dedup_index = PerceptualHashIndex(max_hamming=dedup_threshold) if dedup else None
+        
+        # Export des pages classées: JPEG par page ou PDF par classe
+        self.export_format = export_format or EXPORT_CONFIG['format']
+        
+        # Plages de pages d'un gros PDF traitées en parallèle (threads); au-delà
+        # de 1, le budget de cœurs doit être partagé (CoreBudget.apply)
+        self.page_workers = page_workers or 1
+        
+        # Modèle de coût des PDFs (ordonnancement, ajusté sur les runs passés)
+        self.cost_model = CostModel(models_dir)
+        
+        # Magasin de features (actif pendant process_batch si demandé)
+        self.feature_writer = None
+        
+        # Watchdog des pages (progress: battement partagé avec le superviseur)
+        self.watchdog = Watchdog(progress=progress)
         
         self.logger.info("✅ Système initialisé")
     
-    def classify_image(self, image):
-        """Classifie une seule image"""
+    def classify_image(self, image, label="page"):
+        """Classifie une seule image (dans son budget de temps, sinon a_verifier)"""
+        # Le gouverneur mémoire limite le nombre de pages traitées en parallèle
+        with self.memory_governor.page_slot():
+            deadline = Deadline.from_config()
+            with self.watchdog.watch(deadline, label):
+                try:
+                    result = self._classify_image(image, deadline)
+                except StageTimeout as e:
+                    self.logger.warning(f"⏰ {label}: {e}")
+                    result = self._timeout_result(e)
+            result['page_time'] = deadline.elapsed()
+            return result
+    
+    def _timeout_result(self, error):
+        """Résultat d'une page abandonnée pour dépassement de délai (vers a_verifier)"""
+        return {
+            'predicted_class': None,
+            'confidence': 0.0,
+            'decision_path': "timeout",
+            'rejected': True,
+            'timeout': {
+                'stage': error.stage,
+                'budget_seconds': error.budget,
+                'elapsed_seconds': round(error.elapsed, 3)
+            },
+            'rules_version': self.rule_store.current().version
+        }
+    
+    @contextmanager
+    def _stage(self, name, deadline=None):
+        """Étape du pipeline: pic mémoire mesuré et budget de temps vérifié"""
+        with self.memory_governor.track(name):
+            if deadline is None:
+                yield
+            else:
+                with deadline.stage(name):
+                    yield
+    
+    def _classify_image(self, image, deadline=None):
+        """Pipeline de classification d'une page (sans contrôle de concurrence)"""
+        stage = lambda name: self._stage(name, deadline)
         
-        # 1. Extraction des features de gabarits
-        template_features = self.template_detector.extract_features(image)
+        # Une seule version des règles pour toute la page
+        rules = self.rule_store.current()
         
-        # Calcul des scores pour chaque classe
-        template_scores = {}
-        for cls in CLASSES:
-            score = self.template_detector.match_template(template_features, cls)
-            template_scores[cls] = score
+        # Conversion en niveaux de gris une seule fois, partagée par CV et OCR
+        gray = self.pdf_processor.to_grayscale(image)
         
-        template_features['template_scores'] = template_scores
+        # Redressement des pages tournées (90/180/270°) avant gabarits et OCR
+        gray, orientation = self._correct_orientation(gray, deadline)
         
-        # 2. Classification CV (simplifié pour cette version)
-        # TODO: Implémenter le modèle ResNet50 hybride
-        cv_pred = max(template_scores, key=template_scores.get)
-        cv_conf = template_scores[cv_pred]
+        # 0. Reconnaissance du gabarit par empreinte de mise en page (avant OCR)
+        with stage('layout_index'):
+            layout_match = self.template_detector.lookup_layout(gray)
         
-        # 3. Extraction et classification NLP
-        # Prétraitement pour OCR
-        ocr_image = self.pdf_processor.preprocess_for_ocr(image)
+        if layout_match is not None and layout_match['short_circuit']:
+            return {
+                'predicted_class': layout_match['predicted_class'],
+                'confidence': layout_match['similarity'],
+                'decision_path': "layout_index_match",
+                'rejected': False,
+                'cv_prediction': layout_match['predicted_class'],
+                'cv_confidence': layout_match['similarity'],
+                'nlp_prediction': None,
+                'nlp_confidence': 0.0,
+                'ocr_confidence': None,
+                'text_length': 0,
+                'template_scores': {},
+                'pattern_scores': {},
+                'layout_match': layout_match,
+                'orientation': orientation,
+                'rules_version': rules.version
+            }
+        
+        # 1. Extraction et classification NLP (OCR par échelons de coût croissant)
+        ocr = self._ocr_with_escalation(gray, rules, deadline)
+        
+        # Zones arabes (documents bilingues) OCRisées seules avec le modèle arabe
+        scripts = self._detect_scripts(gray, deadline)
+        if scripts is not None and scripts['blocks']:
+            ocr = self._ocr_arabic_blocks(gray, scripts['blocks'], ocr, rules, deadline)
+        text, ocr_confidence = ocr['text'], ocr['ocr_confidence']
         
-        # OCR
-        text, ocr_confidence = self.ocr_extractor.extract_with_confidence(ocr_image)
+        # 2. Features de gabarits; densité, tableau et signature dérivés des
+        # boîtes de mots OCR plutôt que de passes OpenCV pleine page
+        layout = ocr['words'].layout_features() if WORD_LAYOUT_CONFIG['enabled'] else None
+        template_features, template_scores = self._template_analysis(gray, rules, deadline, layout)
         
-        # Pattern matching
-        nlp_pred, nlp_conf, pattern_scores = self.pattern_matcher.predict(text)
+        # 3. Classification CV: gabarits, combinés au CNN s'il est entraîné
+        cnn_probabilities = None
+        if self.cv_classifier is not None:
+            with stage('cnn'):
+                cnn_probabilities = self.cv_classifier.predict_proba(gray)
+        
+        cv_pred, cv_conf = combine_cv_scores(template_scores, cnn_probabilities)
         
         # Extraction des patterns spécifiques
         text_patterns = self.pattern_matcher.extract_specific_patterns(text)
         
-        # Force NLP pred si aucune prédiction
-        if nlp_pred is None:
-            nlp_pred = cv_pred
-            nlp_conf = 0.1
-        
-        pattern_strength = max(pattern_scores.values()) if pattern_scores else 0.0
+        # Mots-clés, combinés au classifieur TF-IDF s'il est entraîné
+        text_probabilities = None
+        if self.text_classifier is not None and len(text) >= TEXT_CLASSIFIER_CONFIG['min_text_length']:
+            with stage('text_model'):
+                text_probabilities = self.text_classifier.predict(text)[2]
+        nlp_prediction = combine_nlp_scores(ocr['prediction'], text_probabilities)
         
         # 4. Fusion multimodale
-        final_class, final_conf, decision_path, should_reject = self.fusion.fuse(
-            cv_result=(cv_pred, cv_conf),
-            nlp_result=(nlp_pred, nlp_conf, pattern_strength),
-            template_features=template_features,
-            text_patterns=text_patterns
+        decision = fuse_page(
+            self.fusion, (cv_pred, cv_conf), nlp_prediction,
+            template_features, text_patterns, rules
         )
+        final_class, final_conf, decision_path, should_reject, nlp_pred, nlp_conf = decision
+        pattern_scores = ocr['prediction'][2]
         
-        return {
+        result = {
             'predicted_class': final_class,
             'confidence': final_conf,
             'decision_path': decision_path,
@@ -94,82 +255,961 @@ class DocumentClassifier:
             'nlp_prediction': nlp_pred,
             'nlp_confidence': nlp_conf,
             'ocr_confidence': ocr_confidence,
+            'ocr_rung': ocr['rung'],
+            'ocr_escalations': ocr['escalations'],
             'text_length': len(text),
             'template_scores': template_scores,
-            'pattern_scores': pattern_scores
+            'pattern_scores': pattern_scores,
+            'cnn_probabilities': cnn_probabilities,
+            'text_probabilities': text_probabilities,
+            'layout_blocks': ocr['words'].header_footer() if layout is not None else None,
+            'layout_match': layout_match,
+            'orientation': orientation,
+            'scripts': None if scripts is None else {
+                'blocks': len(scripts['blocks']),
+                'arabic_area': round(scripts['arabic_area'], 3),
+                'arabic_text_length': len(ocr.get('arabic_text', ""))
+            },
+            'rules_version': rules.version
         }
+        
+        # Intermédiaires conservés pour le magasin de features (re-fusion sans OCR)
+        if self.feature_writer is not None:
+            result['_features'] = {
+                'template': template_features,
+                'cnn': cnn_probabilities,
+                'text': text,
+                'ocr_confidence': ocr_confidence,
+                'text_patterns': text_patterns
+            }
+        
+        return result
+    
+    def _correct_orientation(self, gray, deadline=None):
+        """Détecte et corrige l'orientation de la page (inchangée si désactivé)"""
+        if self.orientation_detector is None:
+            return gray, None
+        with self._stage('orientation', deadline):
+            return self.orientation_detector.correct(gray)
     
-    def process_pdf(self, pdf_path, output_dir):
-        """Traite un PDF complet"""
+    def _detect_scripts(self, gray, deadline=None):
+        """Zones de texte arabe de la page (None si la détection est désactivée)"""
+        if self.script_detector is None:
+            return None
+        with self._stage('script', deadline):
+            return self.script_detector.detect(gray)
+    
+    def _ocr_arabic_blocks(self, gray, blocks, ocr, rules, deadline=None):
+        """
+        OCR des zones arabes avec le seul modèle arabe, ajouté au texte de la page
         
-        self.logger.info(f"📄 Traitement: {pdf_path}")
+        La page entière reste OCRisée avec la langue du run: fra+ara sur
+        toute la page coûterait les deux modèles sur chaque mot. Les boîtes
+        de mots (features de mise en page) restent celles de la passe
+        principale; seuls le texte et la prédiction par motifs sont complétés.
+        """
+        deadline = deadline or Deadline()
+        ocr_config = self.ocr_extractor.profile_config(self.ocr_extractor.profile)
         
-        # Conversion PDF -> images
-        images = self.pdf_processor.pdf_to_images(pdf_path)
+        arabic_text = []
+        for x, y, w, h in blocks:
+            with self._stage('preprocess', deadline):
+                block = self.pdf_processor.preprocess_for_ocr(gray[y:y + h, x:x + w], mode="light")
+            
+            with self._stage('ocr', deadline):
+                words = self.ocr_extractor.extract_words(
+                    block, config=ocr_config, timeout=deadline.timeout_for('ocr'),
+                    lang=SCRIPT_CONFIG['arabic_lang']
+                )
+            arabic_text.append(words.text())
         
-        if not images:
-            self.logger.error("❌ Impossible de convertir le PDF")
-            return []
+        arabic_text = "\n".join(t for t in arabic_text if t)
+        if not arabic_text:
+            return ocr
+        
+        text = f"{ocr['text']}\n{arabic_text}"
+        return {
+            **ocr,
+            'text': text,
+            'arabic_text': arabic_text,
+            'prediction': self.pattern_matcher.predict(text, rules)
+        }
+    
+    def _ocr_with_escalation(self, gray, rules, deadline=None):
+        """
+        OCR + pattern matching, en commençant par la passe la moins coûteuse
+        
+        On passe à l'échelon suivant (résolution pleine, prétraitement complet,
+        autres modes PSM) tant que la confiance OCR ou le signal PatternMatcher
+        restent sous les seuils d'OCR_ESCALATION_CONFIG. La meilleure tentative
+        (signal de motifs, puis confiance) est retenue.
+        """
+        deadline = deadline or Deadline()
+        config = OCR_ESCALATION_CONFIG
+        
+        if config['enabled'] and self.performance['ocr_escalation']:
+            ladder = config['ladder']
+        else:
+            # Comportement historique: une seule passe complète
+            ladder = [{"name": "standard", "scale": 1.0, "preprocess": "full", "profile": "default"}]
+        
+        best = None
+        for escalations, rung in enumerate(ladder):
+            # "default" désigne le profil OCR du run (--ocr-profile)
+            profile = rung['profile']
+            if profile == "default":
+                profile = self.ocr_extractor.profile
+            ocr_config = self.ocr_extractor.profile_config(profile, psm=rung.get('psm'))
+            
+            with self._stage('preprocess', deadline):
+                ocr_image = self.pdf_processor.preprocess_for_ocr(
+                    gray, mode=rung['preprocess'], scale=rung['scale']
+                )
+            
+            # Tesseract est interrompu au plus tard à la fin du budget de la page
+            with self._stage('ocr', deadline):
+                words = self.ocr_extractor.extract_words(
+                    ocr_image, config=ocr_config, timeout=deadline.timeout_for('ocr')
+                )
+            del ocr_image
+            text, ocr_confidence = words.text(), words.mean_confidence()
+            
+            prediction = self.pattern_matcher.predict(text, rules)
+            pattern_strength = max(prediction[2].values()) if prediction[2] else 0.0
+            
+            attempt = {
+                'text': text,
+                'ocr_confidence': ocr_confidence,
+                'words': words,
+                'prediction': prediction,
+                'rung': rung['name'],
+                'key': (pattern_strength, ocr_confidence)
+            }
+            if best is None or attempt['key'] > best['key']:
+                best = attempt
+            
+            if (ocr_confidence >= config['min_confidence']
+                    and pattern_strength >= config['min_pattern_strength']):
+                break
+        
+        # Nombre d'échelons réellement tentés au-delà du premier
+        best['escalations'] = escalations
+        return best
+    
+    @staticmethod
+    def _ocr_escalation_report(pages):
+        """Répartition des escalades OCR et des échelons retenus (pages réellement OCRisées)"""
+        ocr_pages = [
+            r for r in pages
+            if 'ocr_rung' in r and not r.get('inferred') and 'duplicate_of' not in r
+        ]
+        escalations = Counter(r['ocr_escalations'] for r in ocr_pages)
+        rungs = Counter(r['ocr_rung'] for r in ocr_pages)
+        
+        return {
+            'pages': len(ocr_pages),
+            'total_escalations': sum(r['ocr_escalations'] for r in ocr_pages),
+            'escalations_per_page': {str(k): v for k, v in sorted(escalations.items())},
+            'retained_rung': dict(rungs)
+        }
+    
+    @staticmethod
+    def _script_report(pages):
+        """Pages bilingues: pages avec zones arabes et appels OCR arabes (un par zone)"""
+        scripts = [
+            r['scripts'] for r in pages
+            if r.get('scripts') and not r.get('inferred') and 'duplicate_of' not in r
+        ]
+        arabic = [s for s in scripts if s['blocks']]
+        
+        return {
+            'pages': len(scripts),
+            'arabic_pages': len(arabic),
+            'arabic_ocr_calls': sum(s['blocks'] for s in arabic)
+        }
+    
+    def _template_analysis(self, gray, rules=None, deadline=None, layout=None):
+        """
+        Features de gabarits et score de correspondance par classe
+        
+        layout: features dérivées des boîtes de mots OCR (passes OpenCV sautées)
+        """
+        with self._stage('template', deadline):
+            template_features = self.template_detector.extract_features(gray, layout)
+        
+        # Calcul des scores pour chaque classe
+        template_scores = {}
+        for cls in CLASSES:
+            score = self.template_detector.match_template(template_features, cls, rules)
+            template_scores[cls] = score
+        
+        template_features['template_scores'] = template_scores
+        
+        return template_features, template_scores
+    
+    def _render(self, item):
+        """
+        Document -> images, mesuré par le gouverneur mémoire (poppler borné en temps)
+        
+        item: InputItem ou chemin; les images scannées sont lues directement,
+        sans rendu PDF
+        """
+        if not isinstance(item, InputItem):
+            item = item_from_name(item)
+        
+        timeout = DEADLINE_CONFIG['stage_seconds']['render'] if DEADLINE_CONFIG['enabled'] else None
+        with self.memory_governor.track('render'):
+            if item.kind == 'image':
+                return self.pdf_processor.image_to_pages(item.source())
+            return self.pdf_processor.pdf_to_images(item.source(), timeout=timeout)
+    
+    def _classify_page(self, image, page_ref, local_index=None):
+        """
+        Classifie une page en réutilisant le résultat d'un quasi-doublon déjà vu
+        
+        local_index (plage d'un gros PDF): l'index partagé n'est que consulté,
+        les nouvelles pages vont dans l'index local, fusionné ensuite dans
+        l'ordre des pages (résultat indépendant de l'ordonnancement des threads).
+        """
+        if self.dedup_index is None:
+            return self.classify_image(image, page_ref)
+        
+        # Hash perceptuel calculé juste après le rendu, avant tout traitement coûteux
+        gray = self.pdf_processor.to_grayscale(image)
+        page_hash = dhash(gray, DEDUP_CONFIG['hash_size'])
+        thumb = thumbnail(gray, DEDUP_CONFIG['verify_thumb_size'])
+        
+        match = self.dedup_index.lookup(page_hash, thumb)
+        if match is None and local_index is not None:
+            match = local_index.lookup(page_hash, thumb)
+        if match is not None:
+            original_ref, original_result, distance = match
+            self.logger.info(f"  ♻️ Quasi-doublon de {original_ref} (distance {distance})")
+            result = copy.deepcopy(original_result)
+            result['duplicate_of'] = original_ref
+            result['duplicate_distance'] = distance
+            return result
+        
+        result = self.classify_image(image, page_ref)
+        # Une page abandonnée (délai) n'est pas réutilisée pour ses doublons;
+        # les intermédiaires (texte OCR, features) ne sont pas gardés dans l'index
+        if 'timeout' not in result:
+            cached = copy.deepcopy({k: v for k, v in result.items() if k != '_features'})
+            (local_index or self.dedup_index).add(page_hash, thumb, page_ref, cached)
+        return result
+    
+    def _classify_pages(self, images, source=None):
+        """Classifie une liste de pages (images) et numérote les résultats"""
+        if self.document_mode and len(images) >= DOCUMENT_MODE_CONFIG['min_pages']:
+            return self._classify_pages_sampled(images, source)
         
         results = []
         
         for i, image in enumerate(tqdm(images, desc="Pages")):
             self.logger.info(f"  Page {i+1}/{len(images)}")
             
-            result = self.classify_image(image)
+            result = self._classify_page(image, f"{source}#page{i+1}")
             result['page_number'] = i + 1
+            result['inferred'] = False
             results.append(result)
+        
+        return results
+    
+    def _sample_page_indices(self, page_count):
+        """Indices des pages échantillons: première, dernière et quelques pages intermédiaires"""
+        middle = np.linspace(0, page_count - 1, DOCUMENT_MODE_CONFIG['middle_samples'] + 2)
+        return sorted({int(round(i)) for i in middle})
+    
+    def _classify_pages_sampled(self, images, source=None):
+        """
+        Mode document: classifie un échantillon de pages puis propage le label
+        
+        Si les pages échantillons s'accordent avec une confiance suffisante, les
+        autres pages reçoivent leur label après une simple vérification des
+        gabarits (sans OCR). Sinon, ou si la vérification est trop proche de la
+        limite, la page est traitée complètement.
+        """
+        config = DOCUMENT_MODE_CONFIG
+        sample_indices = self._sample_page_indices(len(images))
+        
+        results = {}
+        for i in sample_indices:
+            self.logger.info(f"  Page échantillon {i+1}/{len(images)}")
+            results[i] = self._classify_page(images[i], f"{source}#page{i+1}")
+        
+        samples = [results[i] for i in sample_indices]
+        labels = {r['predicted_class'] for r in samples}
+        agreement = (
+            len(labels) == 1
+            and not any(r['rejected'] for r in samples)
+            and min(r['confidence'] for r in samples) >= config['agreement_confidence']
+        )
+        
+        if agreement:
+            label = samples[0]['predicted_class']
+            confidence = min(r['confidence'] for r in samples)
+            self.logger.info(f"  🔁 Échantillons d'accord ({label}), propagation du label")
+        else:
+            self.logger.info("  ⚠️ Échantillons en désaccord, traitement complet des pages")
+        
+        for i, image in enumerate(tqdm(images, desc="Pages")):
+            if i in results:
+                continue
             
-            # Sauvegarde dans le dossier approprié
-            if result['rejected']:
-                output_folder = output_dir / "a_verifier"
+            if agreement:
+                inferred = self._infer_page(image, label, confidence, sample_indices)
+                if inferred is not None:
+                    results[i] = inferred
+                    continue
+            
+            results[i] = self._classify_page(image, f"{source}#page{i+1}")
+        
+        ordered_results = []
+        for i in range(len(images)):
+            result = results[i]
+            result['page_number'] = i + 1
+            result.setdefault('inferred', False)
+            ordered_results.append(result)
+        
+        return ordered_results
+    
+    def _infer_page(self, image, label, confidence, sample_indices):
+        """Propage un label sur une page après vérification par les gabarits seuls"""
+        rules = self.rule_store.current()
+        with self.memory_governor.page_slot():
+            gray = self.pdf_processor.to_grayscale(image)
+            gray, orientation = self._correct_orientation(gray)
+            template_features, template_scores = self._template_analysis(gray, rules)
+        
+        # Proche de la limite: on laisse la page au pipeline complet
+        if template_scores[label] < DOCUMENT_MODE_CONFIG['template_verify_threshold']:
+            return None
+        
+        cv_pred = max(template_scores, key=template_scores.get)
+        
+        return {
+            'predicted_class': label,
+            'confidence': confidence,
+            'decision_path': "propagated_from_samples",
+            'rejected': False,
+            'cv_prediction': cv_pred,
+            'cv_confidence': template_scores[cv_pred],
+            'nlp_prediction': None,
+            'nlp_confidence': 0.0,
+            'ocr_confidence': None,
+            'text_length': 0,
+            'template_scores': template_scores,
+            'pattern_scores': {},
+            'orientation': orientation,
+            'inferred': True,
+            'propagated_from': [i + 1 for i in sample_indices],
+            'rules_version': rules.version
+        }
+    
+    def classify_document(self, item):
+        """
+        Classifie un document sans écriture disque
+        
+        item: image NumPy, InputItem, ou nom de document (chemin PDF/image,
+        "archive.zip!membre.pdf")
+        """
+        start_time = time.time()
+        
+        if isinstance(item, np.ndarray):
+            source = None
+            images = [item]
+        else:
+            source = str(item)
+            images = self._render(item)
+        
+        results = self._classify_pages(images, source or "image")
+        
+        return {
+            'source': source,
+            'results': results,
+            'processing_time': time.time() - start_time,
+            'pages_count': len(results)
+        }
+    
+    def _classify_indexed(self, index, item):
+        """Classifie un élément de classify_many en capturant ses erreurs"""
+        try:
+            document = self.classify_document(item)
+        except Exception as e:
+            self.logger.error(f"❌ Erreur classification (élément {index}): {e}")
+            document = {
+                'source': None if isinstance(item, np.ndarray) else str(item),
+                'results': [],
+                'processing_time': 0.0,
+                'pages_count': 0,
+                'error': str(e)
+            }
+        
+        document['index'] = index
+        if document['source'] is None:
+            document['source'] = f"image_{index}"
+        
+        return document
+    
+    def classify_many(self, items, max_in_flight=None, ordered=None):
+        """
+        Classifie un flux de documents et produit les résultats au fil de l'eau
+        
+        Args:
+            items: itérable de chemins PDF et/ou d'images NumPy (consommé paresseusement)
+            max_in_flight: nombre maximal de documents en cours de traitement
+            ordered: True = ordre d'entrée, False = ordre de complétion
+        
+        Yields:
+            dict par document: source, index, results, processing_time, pages_count
+        """
+        max_in_flight = max_in_flight or PIPELINE_CONFIG['max_in_flight']
+        if ordered is None:
+            ordered = PIPELINE_CONFIG['ordered']
+        
+        items = enumerate(items)
+        exhausted = False
+        
+        # deque (ordre d'entrée) ou set (ordre de complétion) de futures
+        pending = deque() if ordered else set()
+        
+        executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        try:
+            while True:
+                # Remplissage jusqu'à la limite de documents en vol
+                while not exhausted and len(pending) < max_in_flight:
+                    try:
+                        index, item = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    
+                    future = executor.submit(self._classify_indexed, index, item)
+                    if ordered:
+                        pending.append(future)
+                    else:
+                        pending.add(future)
+                
+                if not pending:
+                    return
+                
+                if ordered:
+                    yield pending.popleft().result()
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                        yield future.result()
+        finally:
+            # Arrêt anticipé du consommateur: on annule ce qui n'a pas démarré
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+    
+    async def _aclassify_indexed(self, loop, executor, index, item):
+        """Classifie un élément en déléguant chaque étape bloquante à l'executor"""
+        start_time = time.time()
+        source = f"image_{index}" if isinstance(item, np.ndarray) else str(item)
+        
+        try:
+            if isinstance(item, np.ndarray):
+                images = [item]
             else:
-                output_folder = output_dir / result['predicted_class']
+                images = await loop.run_in_executor(executor, self._render, item)
             
-            output_folder.mkdir(parents=True, exist_ok=True)
+            results = await loop.run_in_executor(
+                executor, self._classify_pages, images, source
+            )
             
-            # Sauvegarde de l'image
-            import cv2
-            output_path = output_folder / f"{Path(pdf_path).stem}_page{i+1}.jpg"
-            cv2.imwrite(str(output_path), image)
+            document = {'source': source, 'results': results}
+        
+        except Exception as e:
+            self.logger.error(f"❌ Erreur classification (élément {index}): {e}")
+            document = {'source': source, 'results': [], 'error': str(e)}
+        
+        document['index'] = index
+        document['processing_time'] = time.time() - start_time
+        document['pages_count'] = len(document['results'])
+        
+        return document
+    
+    async def aclassify_many(self, items, max_in_flight=None, ordered=None, executor=None):
+        """
+        Variante asyncio de classify_many
+        
+        Le rendu PDF et la classification de chaque page tournent dans un executor:
+        la boucle d'événements n'est jamais bloquée.
+        
+        Args:
+            items: itérable (synchrone ou asynchrone) de chemins PDF et/ou d'images
+            max_in_flight: nombre maximal de documents en cours de traitement
+            ordered: True = ordre d'entrée, False = ordre de complétion
+            executor: executor à utiliser (par défaut un ThreadPoolExecutor dédié)
+        """
+        max_in_flight = max_in_flight or PIPELINE_CONFIG['max_in_flight']
+        if ordered is None:
+            ordered = PIPELINE_CONFIG['ordered']
+        
+        loop = asyncio.get_running_loop()
+        own_executor = executor is None
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        
+        if hasattr(items, '__aiter__'):
+            iterator = items.__aiter__()
+            async def next_item():
+                return await iterator.__anext__()
+        else:
+            iterator = iter(items)
+            async def next_item():
+                try:
+                    return next(iterator)
+                except StopIteration:
+                    raise StopAsyncIteration
+        
+        index = 0
+        exhausted = False
+        pending = deque() if ordered else set()
+        
+        try:
+            while True:
+                while not exhausted and len(pending) < max_in_flight:
+                    try:
+                        item = await next_item()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    
+                    task = asyncio.ensure_future(
+                        self._aclassify_indexed(loop, executor, index, item)
+                    )
+                    index += 1
+                    if ordered:
+                        pending.append(task)
+                    else:
+                        pending.add(task)
+                
+                if not pending:
+                    return
+                
+                if ordered:
+                    yield await pending.popleft()
+                else:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        pending.remove(task)
+                        yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if own_executor:
+                executor.shutdown(wait=False)
+    
+    def process_pdf(self, pdf_path, output_dir, exporter=None):
+        """Traite un PDF complet (voir process_item)"""
+        return self.process_item(item_from_name(pdf_path), output_dir, exporter)
+    
+    def process_item(self, item, output_dir, exporter=None):
+        """
+        Traite un document complet (PDF ou image, sur disque ou dans une archive)
+        
+        En export "pdf", les pages des PDFs sont confiées à exporter (tampon
+        écrit par lot); sans exporter, un exporteur dédié écrit ce seul PDF.
+        Les images scannées n'ont pas de page PDF à recopier: elles sont
+        toujours sauvegardées en JPEG.
+        """
+        
+        self.logger.info(f"📄 Traitement: {item}")
+        output_dir = Path(output_dir)
+        copy_pages = self.export_format == "pdf" and item.kind == 'pdf'
+        
+        # Budget mémoire dépassé (même en série): rendu par petites plages
+        # plutôt que toutes les pages du document en mémoire à la fois
+        ranges = self._page_ranges(item, low_memory=self.memory_governor.over_budget())
+        if ranges is not None:
+            # Gros PDF: plages rendues et classées en parallèle (JPEG écrits par plage)
+            source, ranges = ranges
+            results = self._process_ranges(item, source, ranges, output_dir, save_images=not copy_pages)
+        else:
+            # Conversion document -> images
+            images = self._render(item)
+            results = self._classify_pages(images, item.name) if images else []
+            if not copy_pages:
+                for i, (image, result) in enumerate(zip(images, results)):
+                    self._save_page(item, i + 1, image, result, output_dir)
+            del images
+        
+        if not results:
+            self.logger.error("❌ Impossible de convertir le document")
+            return []
+        
+        # Intermédiaires des pages calculées -> magasin de features (les autres
+        # pages y sont listées avec leur provenance)
+        for i, result in enumerate(results):
+            features = result.pop('_features', None)
+            if self.feature_writer is None:
+                continue
+            if features is not None:
+                self.feature_writer.add(item.name, i + 1, features, result)
+            else:
+                self.feature_writer.skip(item.name, i + 1, result)
+        
+        if copy_pages:
+            if exporter is None:
+                exporter = ClassPDFExporter(output_dir, prefix=item.output_stem, flush_every=1)
+            
+            # Copie des pages d'origine dans le dossier approprié, sans ré-encodage du raster
+            for i, result in enumerate(results):
+                folder = "a_verifier" if result['rejected'] else result['predicted_class']
+                result['output'] = exporter.add(item, i, folder)
+            exporter.document_done()
         
         return results
     
-    def process_batch(self, input_dir, output_dir):
-        """Traite un lot de PDFs"""
+    def _save_page(self, item, page_number, image, result, output_dir):
+        """Sauvegarde la page en JPEG dans le dossier de sa classe (a_verifier si rejetée)"""
+        import cv2
+        folder = "a_verifier" if result['rejected'] else result['predicted_class']
+        output_folder = output_dir / folder
+        output_folder.mkdir(parents=True, exist_ok=True)
+        
+        output_path = output_folder / f"{item.output_stem}_page{page_number}.jpg"
+        cv2.imwrite(str(output_path), image)
+        result['output'] = {'file': str(output_path)}
+    
+    def _page_ranges(self, item, low_memory=False):
+        """
+        Découpage d'un gros PDF en plages de pages: (source, [(première, dernière)]) ou None
+        
+        Les petits documents, les images et le mode document (qui échantillonne
+        sur l'ensemble des pages) restent traités en un seul rendu. low_memory
+        (budget mémoire dépassé): tout PDF de plusieurs pages est découpé en
+        plages de MEMORY_CONFIG['low_memory_range_pages'] pages, même en série.
+        """
+        config = LARGE_DOCUMENT_CONFIG
+        if not config['enabled'] or item.kind != 'pdf' or self.document_mode:
+            return None
+        if self.page_workers < 2 and not low_memory:
+            return None
+        
+        # Contenu lu une seule fois (membre d'archive) pour toutes les plages
+        source = item.source()
+        try:
+            page_count = self.pdf_processor.page_count(source)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Nombre de pages illisible ({e}): rendu complet")
+            return None
+        
+        size = config['range_pages']
+        if low_memory:
+            size = MEMORY_CONFIG['low_memory_range_pages']
+            if page_count <= size:
+                return None
+            self.memory_governor.throttle_document()
+            self.logger.info(f"  🧠 Budget mémoire dépassé: rendu par plages de {size} page(s)")
+        elif page_count < config['min_pages']:
+            return None
+        
+        ranges = [(first, min(first + size - 1, page_count)) for first in range(1, page_count + 1, size)]
+        return source, ranges
+    
+    def _process_ranges(self, item, source, ranges, output_dir, save_images):
+        """
+        Rend et classe les plages d'un gros PDF en parallèle, résultats fusionnés dans l'ordre
+        
+        Chaque plage est rendue seule (first_page/last_page), classée puis
+        libérée: au plus page_workers plages en mémoire. Numéros de pages,
+        références et noms de fichiers sont ceux d'un traitement en série.
+        Le gouverneur mémoire borne toujours le nombre de pages simultanées.
+        Les quasi-doublons sont cherchés dans les documents précédents et dans
+        la plage elle-même; les index des plages sont fusionnés dans l'ordre
+        des pages. Si une plage échoue, les JPEG déjà écrits par les autres
+        sont retirés: le document est entièrement en échec, jamais partiel.
+        """
+        workers = min(self.page_workers, len(ranges))
+        self.logger.info(f"  ✂️ {ranges[-1][1]} pages en {len(ranges)} plage(s), {workers} en parallèle")
+        
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = [
+            executor.submit(self._process_range, item, source, first, last, output_dir, save_images)
+            for first, last in ranges
+        ]
+        failed = True
+        try:
+            outcomes = []
+            for future in futures:
+                outcome = future.result()
+                if outcome is None:
+                    return []
+                outcomes.append(outcome)
+            failed = False
+        finally:
+            # Échec d'une plage (ou délai de rendu dépassé): les plages non démarrées sont annulées
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+            if failed:
+                self._rollback_ranges(futures)
+        
+        results = []
+        for range_results, local_index in outcomes:
+            results.extend(range_results)
+            if local_index is not None:
+                self.dedup_index.merge(local_index)
+        return results
+    
+    def _rollback_ranges(self, futures):
+        """Retire les JPEG écrits par les plages terminées d'un gros PDF en échec"""
+        removed = 0
+        for future in futures:
+            if future.cancelled() or future.exception() is not None or future.result() is None:
+                continue
+            range_results, _ = future.result()
+            removed += self._remove_saved_pages(range_results)
+        if removed:
+            self.logger.warning(f"↩️ Document en échec: {removed} page(s) déjà écrite(s) retirée(s)")
+    
+    @staticmethod
+    def _remove_saved_pages(results):
+        """Supprime les JPEG référencés par des résultats de pages; nombre de fichiers retirés"""
+        removed = 0
+        for result in results:
+            path = result.get('output', {}).get('file')
+            if path and Path(path).exists():
+                Path(path).unlink()
+                removed += 1
+        return removed
+    
+    def _process_range(self, item, source, first, last, output_dir, save_images):
+        """Rend et classe les pages first..last: (résultats, index local de doublons); None si le rendu échoue"""
+        timeout = DEADLINE_CONFIG['stage_seconds']['render'] if DEADLINE_CONFIG['enabled'] else None
+        with self.memory_governor.track('render'):
+            images = self.pdf_processor.pdf_to_images(
+                source, timeout=timeout, first_page=first, last_page=last
+            )
+        if len(images) != last - first + 1:
+            self.logger.error(f"❌ Rendu des pages {first}-{last} incomplet ({len(images)} page(s))")
+            return None
+        
+        local_index = None
+        if self.dedup_index is not None:
+            local_index = PerceptualHashIndex(
+                max_hamming=self.dedup_index.max_hamming,
+                verify_max_diff=self.dedup_index.verify_max_diff,
+                max_entries=self.dedup_index.max_entries
+            )
+        
+        results = []
+        try:
+            for page_number, image in enumerate(images, first):
+                self.logger.info(f"  Page {page_number} ({item.name})")
+                result = self._classify_page(image, f"{item.name}#page{page_number}", local_index)
+                result['page_number'] = page_number
+                result['inferred'] = False
+                if save_images:
+                    self._save_page(item, page_number, image, result, output_dir)
+                results.append(result)
+        except BaseException:
+            # Plage interrompue: ses propres JPEG sont retirés avant de propager l'erreur
+            self._remove_saved_pages(results)
+            raise
+        
+        return results, local_index
+    
+    @contextmanager
+    def _lease_heartbeat(self, queue, pdf_path, worker_id):
+        """Prolonge périodiquement le bail d'un PDF pendant son traitement"""
+        stop = threading.Event()
         
-        input_path = Path(input_dir)
+        def beat():
+            while not stop.wait(QUEUE_CONFIG['heartbeat_interval']):
+                if not queue.heartbeat(pdf_path, worker_id):
+                    self.logger.warning(f"⚠️ Bail perdu pour {pdf_path}")
+                    return
+        
+        thread = threading.Thread(target=beat, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+    
+    def run_queue_worker(self, queue, output_dir, worker_id=None):
+        """Traite les PDFs d'une file de travail partagée jusqu'à épuisement"""
+        worker_id = worker_id or default_worker_id()
         output_path = Path(output_dir)
+        processed = 0
         
-                # Recherche récursive de tous les PDFs dans input_dir et ses sous-dossiers
-        pdf_files = list(input_path.rglob("*.pdf"))
+        # Un fichier par worker (pas d'écritures concurrentes), écrit à chaque PDF
+        exporter = None
+        if self.export_format == "pdf":
+            exporter = ClassPDFExporter(output_path, prefix=worker_id, flush_every=1)
         
-        if not pdf_files:
-            self.logger.warning("⚠️ Aucun PDF trouvé dans le dossier ou ses sous-dossiers")
-            return
+        self.logger.info(f"👷 Worker {worker_id} démarré sur {queue.db_path}")
         
+        while True:
+            pdf_path = queue.claim(worker_id)
+            
+            # L'attente d'un bail compte comme progression pour le superviseur
+            self.watchdog.beat()
+            
+            if pdf_path is None:
+                # Plus rien en attente: on s'arrête si aucun bail n'est en cours,
+                # sinon on attend un éventuel bail expiré à reprendre
+                if queue.is_drained():
+                    break
+                time.sleep(QUEUE_CONFIG['poll_interval'])
+                continue
+            
+            start_time = time.time()
+            
+            try:
+                with self._lease_heartbeat(queue, pdf_path, worker_id):
+                    # Export écrit avant complete(): un PDF terminé a toujours ses sorties
+                    item = item_from_name(pdf_path)
+                    results = self.process_item(item, output_path, exporter)
+                if not results:
+                    raise RuntimeError("Conversion du document impossible")
+            except Exception as e:
+                self.logger.error(f"❌ Échec {pdf_path}: {e}")
+                queue.fail(pdf_path, worker_id, e)
+                continue
+            
+            elapsed = time.time() - start_time
+            self.cost_model.record(item.prescan(), elapsed)
+            # Bail expiré et PDF réattribué: le résultat du nouveau détenteur fait foi
+            if not queue.complete(pdf_path, worker_id, {
+                'results': results,
+                'processing_time': elapsed,
+                'pages_count': len(results)
+            }):
+                continue
+            processed += 1
+            self.logger.info(f"✅ Terminé en {elapsed:.2f}s")
+        
+        self.logger.info(f"👷 Worker {worker_id}: {processed} PDF(s) traité(s)")
+        return processed
+    
+    def process_batch(self, input_dir, output_dir, features_dir=None):
+        """
+        Traite un lot de documents (features_dir: magasin de features à écrire)
+        
+        input_dir: dossier (parcouru récursivement), archive ZIP/TAR, PDF ou image
+        """
         
-        self.logger.info(f"📚 {len(pdf_files)} PDF(s) à traiter")
-        #for p in pdf_files:
-        #    self.logger.info(f"  - {p}")
+        output_path = Path(output_dir)
+        
+        # Recherche récursive des PDFs, images et archives de input_dir
+        items = iter_items(input_dir)
+        
+        if INPUT_CONFIG['schedule']:
+            # Métadonnées seules (nom, taille, localisation dans l'archive): le
+            # contenu n'est lu que par la pré-analyse, document par document
+            items = list(items)
+            if not items:
+                self.logger.warning("⚠️ Aucun document trouvé dans le dossier ou ses sous-dossiers")
+                return
+            
+            self.logger.info(f"📚 {len(items)} document(s) à traiter")
+            
+            # Pré-analyse sans rendu et ordre longest-first selon le modèle de coût
+            by_name = {item.name: item for item in items}
+            scans, costs, predicted_time = schedule(
+                [item.prescan() for item in items], self.cost_model
+            )
+            jobs = ((by_name[scan['path']], scan) for scan in scans)
+            self.logger.info(f"⏱️ Temps prévu: {predicted_time:.0f}s")
+        else:
+            # Au fil du parcours: chaque document est pré-analysé juste avant son traitement
+            costs, predicted_time = {}, None
+            jobs = ((item, item.prescan()) for item in items)
         
         all_results = {}
+        # Préfixe propre au run: un nouveau lot n'écrase pas les PDFs d'un run précédent
+        exporter = None
+        if self.export_format == "pdf":
+            exporter = ClassPDFExporter(output_path, prefix=f"lot_{time.strftime('%Y%m%d-%H%M%S')}")
+        if features_dir is not None:
+            self.feature_writer = FeatureStoreWriter(features_dir)
+        self.memory_governor.reset()
+        self.watchdog.reset()
+        if self.dedup_index is not None:
+            self.dedup_index.reset()
         
-        for pdf_file in pdf_files:
+        batch_start = time.time()
+        for item, scan in jobs:
+            if scan['path'] not in costs:
+                costs[scan['path']] = self.cost_model.predict(scan)
             start_time = time.time()
+            timeout = None
             
-            results = self.process_pdf(pdf_file, output_path)
+            try:
+                results = self.process_item(item, output_path, exporter)
+            except StageTimeout as e:
+                # Rendu trop long: le document entier reste à vérifier
+                self.logger.warning(f"⏰ {item}: {e}")
+                results = []
+                timeout = {'stage': e.stage, 'budget_seconds': e.budget}
             
             elapsed = time.time() - start_time
+            if results:
+                self.cost_model.record(scan, elapsed)
             
-            all_results[str(pdf_file)] = {
+            all_results[item.name] = {
                 'results': results,
                 'processing_time': elapsed,
+                'predicted_time': costs[scan['path']],
                 'pages_count': len(results)
             }
+            if timeout is not None:
+                all_results[item.name]['timeout'] = timeout
             
             self.logger.info(f"✅ Terminé en {elapsed:.2f}s")
         
+        if predicted_time is None:
+            if not all_results:
+                self.logger.warning("⚠️ Aucun document trouvé dans le dossier ou ses sous-dossiers")
+            predicted_time = sum(costs.values())
+        
+        if exporter is not None:
+            exporter.flush()
+        if self.feature_writer is not None:
+            self.feature_writer.close()
+            self.feature_writer = None
+        
+        # Résumé du lot (clé préfixée pour la distinguer des chemins de PDF)
+        pages = [r for doc in all_results.values() for r in doc['results']]
+        inferred_pages = sum(1 for r in pages if r.get('inferred'))
+        document_timeouts = [
+            doc['timeout']['stage'] for doc in all_results.values() if 'timeout' in doc
+        ]
+        
+        all_results['_summary'] = {
+            'profile': self.performance['name'],
+            'memory': self.memory_governor.report(),
+            'pages': {
+                'computed': len(pages) - inferred_pages,
+                'inferred': inferred_pages
+            },
+            'ocr': self._ocr_escalation_report(pages),
+            'scripts': self._script_report(pages),
+            'latency': {
+                **latency_report(pages, document_timeouts),
+                'overdue_pages': self.watchdog.overdue_pages
+            },
+            'schedule': {
+                'predicted_seconds': predicted_time,
+                'actual_seconds': time.time() - batch_start
+            }
+        }
+        self.cost_model.fit()
+        if self.dedup_index is not None:
+            all_results['_summary']['dedup'] = self.dedup_index.report()
+        if exporter is not None:
+            all_results['_summary']['export'] = exporter.report()
+        self.logger.info(f"🧠 Mémoire: {all_results['_summary']['memory']}")
+        
         # Sauvegarde du rapport global
         report_path = output_path / "classification_report.json"
         with open(report_path, 'w', encoding='utf-8') as f:
@@ -180,6 +1220,218 @@ class DocumentClassifier:
         return all_results
 
 
+def combine_cv_scores(template_scores, cnn_probabilities=None):
+    """Prédiction CV: scores de gabarits, combinés au CNN s'il est disponible"""
+    if cnn_probabilities is not None:
+        weight = CV_CONFIG['cnn_weight']
+        cv_scores = {
+            cls: weight * cnn_probabilities[cls] + (1 - weight) * template_scores[cls]
+            for cls in CLASSES
+        }
+    else:
+        cv_scores = template_scores
+    
+    cv_pred = max(cv_scores, key=cv_scores.get)
+    return cv_pred, cv_scores[cv_pred]
+
+
+def combine_nlp_scores(pattern_prediction, text_probabilities=None):
+    """
+    Prédiction NLP: mots-clés, combinés au classifieur TF-IDF s'il est disponible
+    
+    Les scores de mots-clés restent en troisième position: la fusion en
+    tire la force du signal de motifs.
+    """
+    if text_probabilities is None:
+        return pattern_prediction
+    
+    pattern_scores = pattern_prediction[2]
+    weight = TEXT_CLASSIFIER_CONFIG['weight']
+    nlp_scores = {
+        cls: weight * text_probabilities[cls] + (1 - weight) * pattern_scores.get(cls, 0.0)
+        for cls in CLASSES
+    }
+    nlp_pred = max(nlp_scores, key=nlp_scores.get)
+    return nlp_pred, nlp_scores[nlp_pred], pattern_scores
+
+
+def load_text_classifier(model_manager):
+    """Classifieur TF-IDF entraîné, ou None (absent, désactivé ou illisible)"""
+    model_path = model_manager.text_classifier_path()
+    if not TEXT_CLASSIFIER_CONFIG['enabled'] or not model_path.exists():
+        return None
+    try:
+        return TextClassifier.load(model_path)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"⚠️ Classifieur TF-IDF indisponible, mots-clés seuls: {e}")
+        return None
+
+
+def fuse_page(fusion, cv_result, nlp_prediction, template_features, text_patterns, rules):
+    """
+    Fusion CV + NLP d'une page
+    
+    Args:
+        cv_result: (cv_pred, cv_conf)
+        nlp_prediction: (classe, confiance, scores des mots-clés), voir combine_nlp_scores
+    
+    Returns:
+        (classe, confiance, decision_path, rejet, nlp_pred, nlp_conf)
+    """
+    cv_pred, cv_conf = cv_result
+    nlp_pred, nlp_conf, pattern_scores = nlp_prediction
+    
+    # Force NLP pred si aucune prédiction
+    if nlp_pred is None:
+        nlp_pred = cv_pred
+        nlp_conf = 0.1
+    
+    pattern_strength = max(pattern_scores.values()) if pattern_scores else 0.0
+    
+    final_class, final_conf, decision_path, should_reject = fusion.fuse(
+        cv_result=(cv_pred, cv_conf),
+        nlp_result=(nlp_pred, nlp_conf, pattern_strength),
+        template_features=template_features,
+        text_patterns=text_patterns,
+        rules=rules
+    )
+    return final_class, final_conf, decision_path, should_reject, nlp_pred, nlp_conf
+
+
+def refuse_features(features_dir, output_dir, rules_path=None, models_dir=None):
+    """
+    Re-fusion seule: rejoue PatternMatcher et MultimodalFusion sur un magasin
+    de features, sans rendu ni OCR (pour régler mots-clés, gabarits et seuils)
+    
+    Si models_dir contient un classifieur TF-IDF, il est appliqué au texte
+    stocké par lots (utile après un ré-entraînement).
+    """
+    logger = logging.getLogger(__name__)
+    start_time = time.time()
+    
+    store = FeatureStore(features_dir)
+    rule_store = RuleStore(rules_path)
+    rules = rule_store.current()
+    template_detector = TemplateDetector(rule_store=rule_store)
+    pattern_matcher = PatternMatcher(rule_store=rule_store)
+    fusion = MultimodalFusion(rule_store=rule_store)
+    text_classifier = load_text_classifier(OfflineModelManager(models_dir)) if models_dir else None
+    
+    logger.info(f"🔁 Re-fusion de {len(store)} page(s) (règles v{rules.version})")
+    
+    report = {}
+    changed = 0
+    rejected = 0
+    
+    batch_size = 1024
+    for row in range(len(store)):
+        source, page_number = store.source(row)
+        text = store.text(row)
+        
+        # Probabilités TF-IDF calculées par lots de pages
+        if text_classifier is not None and row % batch_size == 0:
+            batch = [store.text(r) for r in range(row, min(row + batch_size, len(store)))]
+            batch_probabilities = text_classifier.predict_proba_batch(batch)
+        
+        template_features = store.template_features(row)
+        template_scores = {
+            cls: template_detector.match_template(template_features, cls, rules)
+            for cls in CLASSES
+        }
+        template_features['template_scores'] = template_scores
+        
+        cv_result = combine_cv_scores(template_scores, store.cnn_probabilities(row))
+        text_probabilities = None
+        if text_classifier is not None and len(text) >= TEXT_CLASSIFIER_CONFIG['min_text_length']:
+            text_probabilities = dict(zip(CLASSES, batch_probabilities[row % batch_size].tolist()))
+        nlp_prediction = combine_nlp_scores(pattern_matcher.predict(text, rules), text_probabilities)
+        
+        final_class, final_conf, decision_path, should_reject, _, _ = fuse_page(
+            fusion, cv_result, nlp_prediction, template_features,
+            store.text_patterns(row), rules
+        )
+        
+        previous_class = CLASSES[store.predicted[row]]
+        previous_rejected = bool(store.rejected[row])
+        if (final_class, should_reject) != (previous_class, previous_rejected):
+            changed += 1
+        rejected += should_reject
+        
+        report.setdefault(source, {'results': []})['results'].append({
+            'page_number': page_number,
+            'predicted_class': final_class,
+            'confidence': final_conf,
+            'decision_path': decision_path,
+            'rejected': should_reject,
+            'previous_class': previous_class,
+            'previous_rejected': previous_rejected
+        })
+    
+    # Pages sans features (doublons, inférées, index de gabarits, délais):
+    # non rejouées, reportées avec leur classe d'origine et leur provenance
+    skipped = {}
+    for page in store.skipped:
+        skipped[page['reason']] = skipped.get(page['reason'], 0) + 1
+        report.setdefault(page['source'], {'results': []})['results'].append({
+            'page_number': page['page_number'],
+            'predicted_class': page['predicted_class'],
+            'rejected': page['rejected'],
+            'skipped': page['reason']
+        })
+    for entry in report.values():
+        entry['results'].sort(key=lambda r: r['page_number'])
+    
+    report['_summary'] = {
+        'pages': len(store),
+        'changed': changed,
+        'rejected': rejected,
+        'skipped': skipped,
+        'rules_version': rules.version,
+        'processing_time': time.time() - start_time
+    }
+    
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    report_path = output_path / "classification_report_refused.json"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    
+    logger.info(
+        f"📊 {changed} page(s) changée(s) sur {len(store)} en "
+        f"{report['_summary']['processing_time']:.1f}s: {report_path}"
+    )
+    if skipped:
+        logger.warning(f"⚠️ {sum(skipped.values())} page(s) sans features non rejouée(s): {skipped}")
+    return report
+
+
+def estimate(input_dir, models_dir, workers=1, top=10):
+    """Dry-run: temps mur prévu pour un dossier, sans rendu ni OCR"""
+    cost_model = CostModel(models_dir)
+    scans = [item.prescan() for item in iter_items(input_dir)]
+    if not scans:
+        print("❌ Aucun document trouvé")
+        return None
+    
+    scans, costs, predicted_time = schedule(scans, cost_model, workers)
+    
+    source = (f"ajusté sur {cost_model.samples} PDF(s)" if cost_model.samples
+              else "coefficients par défaut")
+    print(f"📚 {len(scans)} document(s), {sum(s['pages'] for s in scans)} page(s) "
+          f"(modèle de coût {source})\n")
+    print("| Document | Pages | Taille (Mo) | Couche texte | Temps prévu (s) |")
+    print("|-----|-------|-------------|--------------|-----------------|")
+    for scan in scans[:top]:
+        print(f"| {Path(scan['path']).name} | {scan['pages']} | {scan['size_mb']:.1f} | "
+              f"{'oui' if scan['has_text'] else 'non'} | {costs[scan['path']]:.0f} |")
+    if len(scans) > top:
+        print(f"| ... {len(scans) - top} autre(s) | | | | |")
+    
+    print(f"\n⏱️ Temps mur prévu avec {workers} worker(s): {predicted_time:.0f}s "
+          f"(total séquentiel {sum(costs.values()):.0f}s)")
+    return predicted_time
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Classification automatique de documents administratifs"
@@ -188,8 +1440,8 @@ def main():
     parser.add_argument(
         '--input', '-i',
         type=str,
-        required=True,
-        help="Dossier contenant les PDFs à traiter"
+        default=None,
+        help="Dossier (récursif), archive ZIP/TAR, PDF ou image (TIFF/JPEG/PNG) à traiter"
     )
     
     parser.add_argument(
@@ -206,16 +1458,285 @@ def main():
         help="Dossier contenant les modèles"
     )
     
+    parser.add_argument(
+        '--memory-budget',
+        type=float,
+        default=None,
+        help="Budget mémoire RSS en Mo (freine la concurrence des pages)"
+    )
+    
+    parser.add_argument(
+        '--document-mode',
+        action='store_true',
+        default=None,
+        help="Classifie un échantillon de pages et propage le label aux autres"
+    )
+    
+    parser.add_argument(
+        '--dedup-threshold',
+        type=int,
+        default=None,
+        help="Distance de Hamming maximale (dHash 64 bits) pour réutiliser un quasi-doublon"
+    )
+    
+    parser.add_argument(
+        '--no-dedup',
+        action='store_true',
+        help="Désactive la réutilisation des classifications de pages quasi identiques"
+    )
+    
+    parser.add_argument(
+        '--rules',
+        type=str,
+        default=None,
+        help="Fichier YAML des règles de classification (rechargé à chaud)"
+    )
+    
+    parser.add_argument(
+        '--cores',
+        type=int,
+        default=None,
+        help="Budget total de cœurs réparti entre les workers (défaut: tous)"
+    )
+    
+    parser.add_argument(
+        '--pin-cpus',
+        action='store_true',
+        default=None,
+        help="Épingle chaque worker sur sa tranche de cœurs"
+    )
+    
+    parser.add_argument(
+        '--queue',
+        type=str,
+        default=None,
+        help="Base SQLite de la file de travail partagée (mode multi-workers)"
+    )
+    
+    parser.add_argument(
+        '--enqueue',
+        action='store_true',
+        help="Ajoute les PDFs de --input à la file de travail"
+    )
+    
+    parser.add_argument(
+        '--worker',
+        action='store_true',
+        help="Traite les PDFs de la file jusqu'à épuisement"
+    )
+    
+    parser.add_argument(
+        '--processes',
+        type=int,
+        default=1,
+        help="Nombre de processus workers lancés sur cette machine"
+    )
+    
+    parser.add_argument(
+        '--export',
+        choices=['jpeg', 'pdf'],
+        default=None,
+        help="Format de sortie: JPEG par page ou PDF par classe (pages d'origine copiées)"
+    )
+    
+    parser.add_argument(
+        '--profile',
+        choices=sorted(PERFORMANCE_PROFILES),
+        default=None,
+        help="Profil de performance (dpi, débruitage, détecteurs, OCR): fast, balanced, accurate..."
+    )
+    
+    parser.add_argument(
+        '--page-workers',
+        type=int,
+        default=1,
+        help="Plages de pages d'un gros PDF traitées en parallèle (défaut: 1, en série)"
+    )
+    
+    parser.add_argument(
+        '--ocr-profile',
+        choices=sorted(OCR_PROFILES),
+        default=None,
+        help="Profil OCR du run (modèles fast/best, LSTM seul, mots-clés...)"
+    )
+    
+    parser.add_argument(
+        '--features',
+        type=str,
+        default=None,
+        help="Enregistre les intermédiaires par page (gabarits, texte OCR, motifs) dans ce dossier"
+    )
+    
+    parser.add_argument(
+        '--refuse',
+        type=str,
+        default=None,
+        help="Rejoue seulement PatternMatcher + fusion sur un magasin de features (sans OCR)"
+    )
+    
+    parser.add_argument(
+        '--estimate',
+        action='store_true',
+        help="Affiche le temps prévu pour --input (sans rien traiter)"
+    )
+    
+    parser.add_argument(
+        '--merge',
+        action='store_true',
+        help="Combine les résultats de la file en un seul rapport"
+    )
+    
     args = parser.parse_args()
     
+    if args.queue:
+        if not (args.enqueue or args.worker or args.merge):
+            parser.error("--queue nécessite --enqueue, --worker et/ou --merge")
+        if args.enqueue and not args.input:
+            parser.error("--enqueue nécessite --input")
+        run_queue(args)
+        return
+    
+    if args.refuse:
+        refuse_features(args.refuse, args.output, args.rules, args.models)
+        return
+    
+    if args.estimate:
+        if not args.input:
+            parser.error("--estimate nécessite --input")
+        estimate(args.input, args.models, args.processes)
+        return
+    
+    if not args.input:
+        parser.error("--input est requis")
+    
     # Création du classifier
-    classifier = DocumentClassifier(args.models)
+    classifier = build_classifier(args)
     
     # Traitement
-    classifier.process_batch(args.input, args.output)
+    classifier.process_batch(args.input, args.output, args.features)
     
     print("\n✅ Traitement terminé!")
 
 
+def build_classifier(args, worker_index=0, workers=1, progress=None):
+    """Crée le classifier à partir des options de la ligne de commande"""
+    # Budget de cœurs appliqué avant le chargement des modèles; partagé entre
+    # les plages de pages seulement si --page-workers est demandé (pas de
+    # cœurs² threads OCR), sinon chaque page garde tous les threads du worker
+    budget = CoreBudget(args.cores, workers, args.pin_cpus)
+    page_workers = max(1, args.page_workers)
+    budget.apply(worker_index, page_workers)
+    
+    return DocumentClassifier(
+        args.models,
+        memory_budget_mb=args.memory_budget,
+        document_mode=args.document_mode,
+        dedup=False if args.no_dedup else None,
+        dedup_threshold=args.dedup_threshold,
+        rules_path=args.rules,
+        export_format=args.export,
+        ocr_profile=args.ocr_profile,
+        progress=progress,
+        performance_profile=args.profile,
+        page_workers=page_workers
+    )
+
+
+def queue_worker_main(args, worker_index=0, progress=None):
+    """Point d'entrée d'un processus worker (progress: battement lu par le superviseur)"""
+    classifier = build_classifier(args, worker_index, args.processes, progress)
+    queue = WorkQueue(args.queue)
+    classifier.run_queue_worker(queue, args.output)
+
+
+def supervise_workers(args, queue):
+    """
+    Lance les processus workers et relance ceux qui plantent ou se bloquent
+    
+    Chaque worker publie un battement (fin de page, attente de la file); sans
+    battement pendant worker_stall_seconds, il est tué. Les baux d'un worker
+    disparu sont libérés aussitôt pour que son PDF soit repris.
+    """
+    logger = logging.getLogger(__name__)
+    # Processus indépendants (spawn): chacun charge ses propres modèles
+    context = multiprocessing.get_context('spawn')
+    workers = {}
+    restarts = 0
+    
+    def start(index):
+        progress = context.Value('d', time.time(), lock=False)
+        process = context.Process(target=queue_worker_main, args=(args, index, progress))
+        process.start()
+        workers[index] = (process, progress)
+    
+    for index in range(args.processes):
+        start(index)
+    
+    while workers:
+        time.sleep(DEADLINE_CONFIG['watchdog_interval'])
+        
+        for index, (process, progress) in list(workers.items()):
+            if process.is_alive():
+                if time.time() - progress.value < DEADLINE_CONFIG['worker_stall_seconds']:
+                    continue
+                logger.warning(f"⏰ Worker {index} (pid {process.pid}) bloqué, arrêt forcé")
+                process.kill()
+            process.join()
+            del workers[index]
+            
+            if process.exitcode == 0:
+                continue
+            
+            worker_id = f"{socket.gethostname()}:{process.pid}"
+            released = queue.release(worker_id, f"worker arrêté (code {process.exitcode})")
+            logger.warning(
+                f"💥 Worker {index} arrêté (code {process.exitcode}), "
+                f"{released} PDF(s) remis en file"
+            )
+            
+            if queue.is_drained():
+                continue
+            if restarts >= DEADLINE_CONFIG['max_restarts']:
+                logger.error("❌ Nombre maximal de redémarrages atteint")
+                continue
+            restarts += 1
+            start(index)
+    
+    return restarts
+
+
+def run_queue(args):
+    """Mode file de travail: alimentation, workers et fusion des résultats"""
+    queue = WorkQueue(args.queue)
+    
+    if args.enqueue:
+        # Priorité = temps prévu: les PDFs les plus longs sont réclamés en premier
+        scans, costs, predicted_time = schedule(
+            [item.prescan() for item in iter_items(args.input)],
+            CostModel(args.models), args.processes
+        )
+        added = queue.enqueue([scan['path'] for scan in scans], costs)
+        print(f"📥 {added} document(s) ajouté(s) à la file {args.queue} "
+              f"(~{predicted_time:.0f}s avec {args.processes} worker(s))")
+    
+    if args.worker:
+        supervise_workers(args, queue)
+    
+    if args.merge:
+        # Les workers ont enrichi l'historique: on réajuste le modèle de coût
+        CostModel(args.models).fit()
+        report = queue.merge()
+        pages = [
+            r for path, doc in report.items() if path != '_summary' for r in doc['results']
+        ]
+        report['_summary']['latency'] = latency_report(pages)
+        output_path = Path(args.output)
+        output_path.mkdir(parents=True, exist_ok=True)
+        report_path = output_path / "classification_report.json"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📊 Rapport fusionné: {report_path} ({report['_summary']['queue']})")
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Export des pages classées: JPEG 300 dpi par page vs PDF par classe (PyPDF2)
+
+Les pages sont réparties entre les classes en tourniquet (la classification
+n'influe pas sur le coût d'export); on compare le temps d'écriture et la
+place disque de chaque format à la taille des PDFs d'entrée.
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import cv2
+
+from src.config.config import CLASSES
+from src.preprocessing.pdf_processor import PDFProcessor
+from src.utils.pdf_exporter import ClassPDFExporter
+
+
+def disk_usage(directory):
+    """Taille totale (octets) des fichiers d'un dossier"""
+    return sum(f.stat().st_size for f in Path(directory).rglob("*") if f.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark export JPEG vs PDF par classe")
+    parser.add_argument('--input', '-i', type=str, default='data/raw',
+                        help="Dossier de PDFs de test")
+    parser.add_argument('--limit', type=int, default=None,
+                        help="Nombre maximal de PDFs utilisés")
+    parser.add_argument('--flush-every', type=int, default=None,
+                        help="PDFs sources par lot écrit (défaut: EXPORT_CONFIG)")
+    args = parser.parse_args()
+
+    pdf_files = sorted(Path(args.input).rglob("*.pdf"))[:args.limit]
+    if not pdf_files:
+        print("❌ Aucun PDF trouvé")
+        return
+
+    processor = PDFProcessor()
+    workdir = Path(tempfile.mkdtemp(prefix="export_bench_"))
+    jpeg_dir, pdf_dir = workdir / "jpeg", workdir / "pdf"
+
+    try:
+        jpeg_seconds = 0.0
+        exporter = ClassPDFExporter(pdf_dir, flush_every=args.flush_every)
+        pdf_seconds = 0.0
+        pages = 0
+
+        for pdf_file in pdf_files:
+            # Le rendu est commun aux deux formats (nécessaire à la classification)
+            images = processor.pdf_to_images(pdf_file)
+
+            start = time.perf_counter()
+            for i, image in enumerate(images):
+                folder = jpeg_dir / CLASSES[(pages + i) % len(CLASSES)]
+                folder.mkdir(parents=True, exist_ok=True)
+                cv2.imwrite(str(folder / f"{pdf_file.stem}_page{i + 1}.jpg"), image)
+            jpeg_seconds += time.perf_counter() - start
+
+            start = time.perf_counter()
+            for i in range(len(images)):
+                exporter.add(pdf_file, i, CLASSES[(pages + i) % len(CLASSES)])
+            exporter.document_done()
+            pdf_seconds += time.perf_counter() - start
+
+            pages += len(images)
+            del images
+
+        start = time.perf_counter()
+        exporter.flush()
+        pdf_seconds += time.perf_counter() - start
+
+        input_bytes = sum(f.stat().st_size for f in pdf_files)
+        jpeg_bytes = disk_usage(jpeg_dir)
+        pdf_bytes = disk_usage(pdf_dir)
+
+        print(f"🔬 {len(pdf_files)} PDF(s), {pages} page(s), entrée {input_bytes / 1e6:.1f} Mo\n")
+        print("| Format | Temps export (s) | ms/page | Disque (Mo) | vs entrée |")
+        print("|--------|------------------|---------|-------------|-----------|")
+        for name, seconds, size in (("JPEG", jpeg_seconds, jpeg_bytes),
+                                    ("PDF par classe", pdf_seconds, pdf_bytes)):
+            print(f"| {name} | {seconds:.2f} | {seconds / pages * 1000:.1f} | "
+                  f"{size / 1e6:.1f} | {size / input_bytes:.2f}x |")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark des profils OCR: temps par page, rappel des mots-clés, précision NLP
+
+Les pages étiquetées (un sous-dossier par classe) sont OCRisées avec chaque
+profil pleine page. Le rappel des mots-clés est mesuré par rapport au profil
+de référence (mots-clés trouvés par la référence et retrouvés par le profil);
+la précision est celle de PatternMatcher seul face au label du dossier.
+
+Les profils à liste blanche (amounts, id) s'appliquent à des zones: les
+montants et identifiants (CIN, RIB) lus par la référence sont recadrés puis
+relus avec le profil de référence et avec leur profil de zone; l'exactitude
+est mesurée face à la lecture pleine page de la référence.
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.config.config import OCR_PROFILES
+from src.preprocessing.pdf_processor import PDFProcessor
+from src.nlp_module.ocr_extractor import OCRExtractor
+from src.nlp_module.pattern_matcher import PatternMatcher
+from src.utils.datasets import class_dirs
+
+
+def load_pages(input_dir, limit):
+    """Pages prétraitées pour l'OCR avec leur label (nom du dossier de classe)"""
+    processor = PDFProcessor()
+    pages = []
+
+    for class_dir, label in class_dirs(input_dir):
+        if label is None:
+            continue
+        for pdf_file in sorted(class_dir.rglob("*.pdf")):
+            for page in processor.pdf_to_images(pdf_file):
+                pages.append((processor.preprocess_for_ocr(page), label))
+            if limit and len(pages) >= limit:
+                return pages[:limit]
+
+    return pages
+
+
+# Mots de la référence traités comme zones: (motif, profil à liste blanche)
+ZONE_PATTERNS = [
+    (re.compile(r'^\d{1,3}(?:[ .]?\d{3})*[,.]\d{2}$'), "amounts"),   # Montants
+    (re.compile(r'^[A-Z]{1,2}\d{5,7}$'), "id"),                        # CIN
+    (re.compile(r'^\d{24}$'), "digits")                                 # RIB
+]
+
+
+def find_zones(ocr, image, config, margin=4):
+    """Zones (x, y, w, h, profil, texte attendu) des montants et identifiants lus par la référence"""
+    words = ocr.extract_words(image, config=config)
+    page_h, page_w = image.shape[:2]
+    zones = []
+    for i, word in enumerate(words.words):
+        for pattern, profile in ZONE_PATTERNS:
+            if pattern.match(word):
+                x = max(0, int(words.left[i] * page_w) - margin)
+                y = max(0, int(words.top[i] * page_h) - margin)
+                w = int(words.width[i] * page_w) + 2 * margin
+                h = int(words.height[i] * page_h) + 2 * margin
+                zones.append((x, y, w, h, profile, word))
+                break
+    return zones
+
+
+def benchmark_zones(ocr, pages, reference):
+    """Lecture des zones avec le profil de référence puis avec leur profil à liste blanche"""
+    zones = [
+        (image, zone)
+        for image, _ in pages
+        for zone in find_zones(ocr, image, ocr.profile_config(reference))
+    ]
+
+    rows = []
+    for name, use_zone_profile in ((reference, False), ("liste blanche", True)):
+        timings, exact = [], 0
+        for image, (x, y, w, h, profile, expected) in zones:
+            config = ocr.profile_config(profile if use_zone_profile else reference)
+            start = time.perf_counter()
+            text = ocr.extract_text(image[y:y + h, x:x + w], config)
+            timings.append((time.perf_counter() - start) * 1000)
+            exact += re.sub(r'\s', '', text) == expected
+        rows.append((name, timings, exact))
+    return len(zones), rows
+
+
+def found_keywords(matcher, text):
+    """Ensemble des (classe, mot-clé) présents dans le texte"""
+    return {
+        (cls, keyword)
+        for cls, hits in matcher.extract_keywords(text).items()
+        for keyword, _ in hits
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des profils OCR")
+    parser.add_argument('--input', '-i', type=str, default='data/raw',
+                        help="Pages étiquetées (un sous-dossier par classe)")
+    parser.add_argument('--profiles', type=str, default="default,lstm,fast,best,keywords",
+                        help=f"Profils pleine page à comparer parmi: {', '.join(OCR_PROFILES)}")
+    parser.add_argument('--reference', type=str, default="best",
+                        help="Profil de référence pour le rappel des mots-clés")
+    parser.add_argument('--limit', type=int, default=50,
+                        help="Nombre maximal de pages")
+    args = parser.parse_args()
+
+    pages = load_pages(args.input, args.limit)
+    if not pages:
+        print("❌ Aucune page étiquetée trouvée")
+        return
+
+    ocr = OCRExtractor()
+    matcher = PatternMatcher()
+
+    profiles = args.profiles.split(',')
+    if args.reference not in profiles:
+        profiles.append(args.reference)
+
+    runs = {}
+    for name in profiles:
+        config = ocr.profile_config(name)
+        timings, keywords, predictions = [], [], []
+        for image, _ in pages:
+            start = time.perf_counter()
+            text, _ = ocr.extract_with_confidence(image, config=config)
+            timings.append((time.perf_counter() - start) * 1000)
+            keywords.append(found_keywords(matcher, text))
+            predictions.append(matcher.predict(text)[0])
+        runs[name] = (timings, keywords, predictions)
+
+    labels = [label for _, label in pages]
+    reference_keywords = runs[args.reference][1]
+
+    print(f"🔬 {len(pages)} page(s), référence: {args.reference}\n")
+    print("| Profil | Options | ms/page (médiane) | Rappel mots-clés | Précision PatternMatcher |")
+    print("|--------|---------|-------------------|------------------|--------------------------|")
+    for name in profiles:
+        timings, keywords, predictions = runs[name]
+        expected = sum(len(ref) for ref in reference_keywords)
+        recovered = sum(len(ref & got) for ref, got in zip(reference_keywords, keywords))
+        recall = recovered / expected if expected else float('nan')
+        accuracy = np.mean([p == label for p, label in zip(predictions, labels)])
+        print(f"| {name} | `{ocr.profile_config(name)}` | {np.median(timings):.0f} | "
+              f"{recall:.1%} | {accuracy:.1%} |")
+
+    zone_count, zone_rows = benchmark_zones(ocr, pages, args.reference)
+    if not zone_count:
+        print("\nℹ️ Aucun montant ni identifiant lu par la référence: zones non évaluées")
+        return
+
+    print(f"\n🔎 {zone_count} zone(s) montants / identifiants\n")
+    print("| Zones | ms/zone (médiane) | Exactitude |")
+    print("|-------|-------------------|------------|")
+    for name, timings, exact in zone_rows:
+        print(f"| {name} | {np.median(timings):.0f} | {exact / zone_count:.1%} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Coût de la détection d'orientation comparé à une passe OCR complète
+
+Chaque page est tournée artificiellement de 0/90/180/270°; on mesure le temps
+de détection (OSD réduit, heuristique des lignes), sa justesse, et le temps
+d'une passe OCR complète (celle qui serait gaspillée sur une page tournée).
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.preprocessing.pdf_processor import PDFProcessor
+from src.preprocessing.orientation import OrientationDetector
+from src.nlp_module.ocr_extractor import OCRExtractor
+
+
+def timed(function, *args):
+    """Exécute function(*args) et retourne (résultat, durée en ms)"""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la détection d'orientation")
+    parser.add_argument('--input', '-i', type=str, default='data/raw',
+                        help="Dossier de PDFs de test")
+    parser.add_argument('--limit', type=int, default=20,
+                        help="Nombre maximal de pages utilisées")
+    args = parser.parse_args()
+
+    processor = PDFProcessor()
+    detector = OrientationDetector()
+    ocr = OCRExtractor()
+
+    pages = []
+    for pdf_file in sorted(Path(args.input).rglob("*.pdf")):
+        pages.extend(processor.pdf_to_images(pdf_file))
+        if len(pages) >= args.limit:
+            break
+    pages = [processor.to_grayscale(page) for page in pages[:args.limit]]
+
+    if not pages:
+        print("❌ Aucun PDF trouvé")
+        return
+
+    timings = {'osd': [], 'text_lines': [], 'ocr': []}
+    correct = {'osd': 0, 'text_lines': 0}
+    trials = {'osd': 0, 'text_lines': 0}
+
+    for gray in pages:
+        for angle in (0, 90, 180, 270):
+            # Page tournée de angle (sens anti-horaire): la correction attendue est angle
+            rotated = detector.rotate(gray, (360 - angle) % 360)
+            small = detector._downscale(rotated)
+
+            osd, elapsed = timed(detector.detect_osd, small)
+            timings['osd'].append(elapsed)
+            if osd is not None:
+                trials['osd'] += 1
+                correct['osd'] += osd[0] == angle
+
+            (lines_angle, _), elapsed = timed(detector.detect_text_lines, small)
+            timings['text_lines'].append(elapsed)
+            trials['text_lines'] += 1
+            # L'heuristique ne distingue que couchée / droite
+            correct['text_lines'] += lines_angle == (90 if angle in (90, 270) else 0)
+
+        ocr_image = processor.preprocess_for_ocr(gray)
+        _, elapsed = timed(ocr.extract_with_confidence, ocr_image)
+        timings['ocr'].append(elapsed)
+
+    ocr_ms = np.median(timings['ocr'])
+
+    print(f"🔬 {len(pages)} page(s), 4 orientations chacune\n")
+    print("| Étape | Médiane (ms) | p95 (ms) | % d'une passe OCR | Justesse |")
+    print("|-------|--------------|----------|-------------------|----------|")
+    for name in ('osd', 'text_lines'):
+        median = np.median(timings[name])
+        accuracy = f"{correct[name] / trials[name]:.0%} ({trials[name]} essais)" if trials[name] else "-"
+        print(f"| {name} | {median:.0f} | {np.percentile(timings[name], 95):.0f} | "
+              f"{median / ocr_ms:.1%} | {accuracy} |")
+    print(f"| OCR complet | {ocr_ms:.0f} | {np.percentile(timings['ocr'], 95):.0f} | 100% | - |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark du transfert de pages entre processus: pickle vs pool en mémoire partagée
+
+Un processus producteur envoie des pages (taille d'une page A4 à 300 dpi)
+à des workers qui les lisent entièrement. Variante "pickle": le tableau
+NumPy traverse une multiprocessing.Queue. Variante "pool": la page est
+écrite dans un slot du SharedPagePool et seul le PageHandle traverse la file.
+Vérifie aussi la récupération des slots d'un worker tué.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import multiprocessing
+
+from src.utils.page_pool import SharedPagePool
+
+
+A4_300DPI = (3508, 2480)
+
+
+def pickle_worker(queue, results):
+    """Reçoit des pages complètes (pickle)"""
+    total = 0
+    while True:
+        page = queue.get()
+        if page is None:
+            break
+        total += int(page[::64, ::64].sum())
+    results.put(total)
+
+
+def pool_worker(queue, pool, results):
+    """Reçoit des handles et lit les pages dans le pool (sans copie)"""
+    total = 0
+    while True:
+        handle = queue.get()
+        if handle is None:
+            break
+        with pool.borrow(handle) as page:
+            total += int(page[::64, ::64].sum())
+    results.put(total)
+
+
+def dying_worker(queue, pool):
+    """Réclame une page puis meurt sans la rendre"""
+    pool.claim(queue.get())
+    os._exit(1)
+
+
+def run(mode, pages, workers, shape, pool=None):
+    """Débit (pages/s) du transfert producteur -> workers"""
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue(maxsize=2 * workers)
+    results = context.Queue()
+
+    if mode == "pickle":
+        processes = [context.Process(target=pickle_worker, args=(queue, results)) for _ in range(workers)]
+    else:
+        processes = [context.Process(target=pool_worker, args=(queue, pool, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    page = np.random.default_rng(0).integers(0, 255, size=shape, dtype=np.uint8)
+    start = time.perf_counter()
+    for _ in range(pages):
+        queue.put(page if mode == "pickle" else pool.put(page))
+    for _ in processes:
+        queue.put(None)
+    for _ in processes:
+        results.get()
+    elapsed = time.perf_counter() - start
+
+    for process in processes:
+        process.join()
+    return pages / elapsed
+
+
+def check_reclaim(pool):
+    """Un worker tué avec une page en main: ses slots doivent revenir au pool"""
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=dying_worker, args=(queue, pool))
+    process.start()
+    queue.put(pool.put(np.zeros((64, 64), dtype=np.uint8)))
+    process.join()
+
+    held = pool.in_use()
+    reclaimed = pool.reclaim(process.pid)
+    return held, reclaimed, pool.in_use()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pickle vs pool de pages partagé")
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rgb', action='store_true', help="Pages RGB (défaut: niveaux de gris)")
+    args = parser.parse_args()
+
+    shape = A4_300DPI + (3,) if args.rgb else A4_300DPI
+    page_mb = np.prod(shape) / 1e6
+
+    pool = SharedPagePool(slots=2 * args.workers, slot_mb=np.prod(shape) * 1.01 / (1024 * 1024))
+    try:
+        pickle_rate = run("pickle", args.pages, args.workers, shape)
+        pool_rate = run("pool", args.pages, args.workers, shape, pool)
+        held, reclaimed, remaining = check_reclaim(pool)
+    finally:
+        pool.close()
+
+    print(f"🔬 {args.pages} page(s) de {page_mb:.1f} Mo, {args.workers} worker(s)\n")
+    print("| Transfert | Pages/s | Mo/s |")
+    print("|-----------|---------|------|")
+    print(f"| pickle (Queue) | {pickle_rate:.1f} | {pickle_rate * page_mb:.0f} |")
+    print(f"| SharedPagePool (handles) | {pool_rate:.1f} | {pool_rate * page_mb:.0f} |")
+    print(f"\n♻️ Worker tué: {held} slot(s) détenu(s), {reclaimed} récupéré(s), {remaining} restant(s)")
+
+
+if __name__ == "__main__":
+    main()
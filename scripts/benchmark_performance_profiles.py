@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark des profils de performance (--profile): débit et précision par profil
+
+Le pipeline complet (rendu, gabarits, OCR, fusion) classe un corpus
+étiqueté avec chaque profil: corpus de charge (manifest.jsonl de
+scripts/generate_load_corpus.py) ou un sous-dossier par classe. La
+précision est mesurée par page face au label du document; une page
+rejetée (a_verifier) compte comme une erreur. Les quasi-doublons ne sont
+pas réutilisés, pour que chaque page soit réellement calculée.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from itertools import zip_longest
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from main import DocumentClassifier
+from src.config.config import PERFORMANCE_PROFILES
+from src.config.profiles import resolve_profile
+from src.utils.input_sources import item_from_name, iter_items
+from src.utils.datasets import class_dirs
+
+
+def load_documents(input_dir, limit):
+    """Documents étiquetés [(InputItem, label)]: manifeste s'il existe, sinon dossiers de classes"""
+    input_dir = Path(input_dir)
+    manifest = input_dir / "manifest.jsonl"
+    documents = []
+
+    if manifest.exists():
+        with open(manifest, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    documents.append((item_from_name(str(input_dir / entry['path'])), entry['label']))
+    else:
+        for class_dir, label in class_dirs(input_dir):
+            if label is not None:
+                documents.extend((item, label) for item in iter_items(class_dir))
+
+    # Classes entrelacées: une limite garde toutes les classes représentées
+    if limit:
+        by_label = {}
+        for document in documents:
+            by_label.setdefault(document[1], []).append(document)
+        interleaved = [d for group in zip_longest(*by_label.values()) for d in group if d is not None]
+        documents = interleaved[:limit]
+    return documents
+
+
+def run_profile(name, documents, models_dir):
+    """Pages/s, précision et taux de rejet du pipeline avec un profil"""
+    classifier = DocumentClassifier(models_dir, performance_profile=name, dedup=False, document_mode=False)
+
+    pages = correct = rejected = 0
+    start = time.perf_counter()
+    for item, label in documents:
+        for result in classifier.classify_document(item)['results']:
+            pages += 1
+            rejected += bool(result['rejected'])
+            correct += not result['rejected'] and result['predicted_class'] == label
+    elapsed = time.perf_counter() - start
+
+    return {
+        'pages': pages,
+        'pages_per_second': pages / elapsed if elapsed else 0.0,
+        'accuracy': correct / pages if pages else 0.0,
+        'reject_rate': rejected / pages if pages else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des profils de performance")
+    parser.add_argument('--input', '-i', type=str, default='data/load_corpus',
+                        help="Corpus étiqueté (manifest.jsonl ou un sous-dossier par classe)")
+    parser.add_argument('--models', '-m', type=str, default='models')
+    parser.add_argument('--profiles', type=str, default="fast,balanced,accurate",
+                        help=f"Profils à comparer parmi: {', '.join(PERFORMANCE_PROFILES)}")
+    parser.add_argument('--limit', type=int, default=50, help="Nombre maximal de documents")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    documents = load_documents(args.input, args.limit)
+    if not documents:
+        print("❌ Aucun document étiqueté trouvé")
+        return
+
+    profiles = args.profiles.split(',')
+    runs = {name: run_profile(name, documents, args.models) for name in profiles}
+
+    print(f"🔬 {len(documents)} document(s), {runs[profiles[0]]['pages']} page(s)\n")
+    print("| Profil | dpi | Débruitage | OCR | Pages/s | Précision | Rejets |")
+    print("|--------|-----|------------|-----|---------|-----------|--------|")
+    for name in profiles:
+        settings, stats = resolve_profile(name), runs[name]
+        denoise = f"h={settings['denoise_strength']}" if settings['denoise'] else "non"
+        ocr = settings['ocr_profile'] + (" + escalade" if settings['ocr_escalation'] else "")
+        print(f"| {name} | {settings['dpi']} | {denoise} | {ocr} | {stats['pages_per_second']:.2f} | "
+              f"{stats['accuracy']:.1%} | {stats['reject_rate']:.1%} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Coût de l'OCR bilingue français/arabe: fra+ara pleine page face aux zones arabes
+
+Trois stratégies par page: (1) fra seul (référence, texte arabe perdu),
+(2) fra+ara sur toute la page, (3) fra sur la page puis ara sur les seules
+zones détectées par ScriptDetector (stratégie du pipeline). On mesure le
+temps par page, les mots-clés arabes retrouvés et la justesse du
+PatternMatcher face au label du dossier de classe (si disponible).
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.config.config import OCR_CONFIG, SCRIPT_CONFIG
+from src.preprocessing.pdf_processor import PDFProcessor
+from src.preprocessing.script_detector import ScriptDetector
+from src.nlp_module.ocr_extractor import OCRExtractor
+from src.nlp_module.pattern_matcher import PatternMatcher
+from src.utils.datasets import resolve_label
+
+
+ARABIC = re.compile(r'[؀-ۿ]')
+
+
+def load_pages(input_dir, limit):
+    """Pages en niveaux de gris [(page, label ou None)], label tiré du dossier de classe"""
+    processor = PDFProcessor()
+    pages = []
+    for pdf_file in sorted(Path(input_dir).rglob("*.pdf")):
+        label = resolve_label(pdf_file.parent.name)
+        pages.extend((processor.to_grayscale(page), label) for page in processor.pdf_to_images(pdf_file))
+        if len(pages) >= limit:
+            break
+    return processor, pages[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'OCR bilingue français/arabe")
+    parser.add_argument('--input', '-i', type=str, default='data/raw',
+                        help="Dossier de PDFs de test (un sous-dossier par classe pour la justesse)")
+    parser.add_argument('--limit', type=int, default=20,
+                        help="Nombre maximal de pages utilisées")
+    args = parser.parse_args()
+
+    processor, pages = load_pages(args.input, args.limit)
+    if not pages:
+        print("❌ Aucun PDF trouvé")
+        return
+
+    detector = ScriptDetector()
+    ocr = OCRExtractor()
+    matcher = PatternMatcher()
+    french, arabic = OCR_CONFIG['lang'], SCRIPT_CONFIG['arabic_lang']
+
+    strategies = (french, f"{french}+{arabic}", "zones arabes")
+    timings = {name: [] for name in strategies}
+    correct = {name: 0 for name in strategies}
+    arabic_hits = {name: 0 for name in strategies}
+    detection_ms, arabic_pages, arabic_blocks = [], 0, 0
+    labelled = sum(1 for _, label in pages if label is not None)
+
+    for gray, label in pages:
+        texts = {}
+
+        start = time.perf_counter()
+        ocr_image = processor.preprocess_for_ocr(gray)
+        preprocess_ms = (time.perf_counter() - start) * 1000
+
+        for lang in strategies[:2]:
+            start = time.perf_counter()
+            texts[lang] = ocr.extract_words(ocr_image, lang=lang).text()
+            timings[lang].append(preprocess_ms + (time.perf_counter() - start) * 1000)
+
+        # Stratégie du pipeline: passe française (réutilisée) + zones arabes seules
+        start = time.perf_counter()
+        scripts = detector.detect(gray)
+        detection_ms.append((time.perf_counter() - start) * 1000)
+        blocks_text = []
+        for x, y, w, h in scripts['blocks']:
+            block = processor.preprocess_for_ocr(gray[y:y + h, x:x + w], mode="light")
+            blocks_text.append(ocr.extract_words(block, lang=arabic).text())
+        texts[strategies[2]] = "\n".join([texts[french]] + blocks_text)
+        timings[strategies[2]].append(timings[french][-1] + (time.perf_counter() - start) * 1000)
+
+        arabic_pages += bool(scripts['blocks'])
+        arabic_blocks += len(scripts['blocks'])
+
+        for name, text in texts.items():
+            found = matcher.extract_keywords(text)
+            arabic_hits[name] += sum(count for keywords in found.values()
+                                     for keyword, count in keywords if ARABIC.search(keyword))
+            if label is not None:
+                correct[name] += matcher.predict(text)[0] == label
+
+    reference_ms = np.median(timings[french])
+
+    print(f"🔬 {len(pages)} page(s), {arabic_pages} avec zones arabes ({arabic_blocks} zone(s)), "
+          f"détection: {np.median(detection_ms):.0f} ms/page (médiane)\n")
+    print("| Stratégie | Médiane (ms) | Moyenne (ms) | vs fra seul | Mots-clés arabes | Justesse motifs |")
+    print("|-----------|--------------|--------------|-------------|------------------|-----------------|")
+    for name in strategies:
+        median = np.median(timings[name])
+        accuracy = f"{correct[name] / labelled:.0%}" if labelled else "-"
+        print(f"| {name} | {median:.0f} | {np.mean(timings[name]):.0f} | {median / reference_ms:.2f}x | "
+              f"{arabic_hits[name]} | {accuracy} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark du débit (pages/s) selon la répartition workers x threads
+
+Chaque configuration lance N processus workers avec un budget de cœurs
+commun; les PDFs sont répartis entre eux et classifiés sans écriture disque.
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.utils.resource_manager import CoreBudget, available_cores
+
+
+def run_worker(worker_index, workers, total_cores, pin, models_dir, pdf_files, results,
+               apply_budget=True):
+    """Processus worker: applique le budget puis classifie sa part des PDFs"""
+    if apply_budget:
+        CoreBudget(total_cores, workers, pin).apply(worker_index)
+
+    from main import DocumentClassifier
+    classifier = DocumentClassifier(models_dir, dedup=False)
+
+    pages = 0
+    for pdf_file in pdf_files:
+        pages += classifier.classify_document(pdf_file)['pages_count']
+    results.put(pages)
+
+
+def run_configuration(workers, total_cores, pin, models_dir, pdf_files, apply_budget=True):
+    """Mesure le débit d'une configuration (temps mur, pages/s)"""
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+
+    # Répartition round-robin des PDFs entre workers
+    shares = [pdf_files[i::workers] for i in range(workers)]
+
+    start = time.perf_counter()
+    processes = [
+        context.Process(
+            target=run_worker,
+            args=(i, workers, total_cores, pin, models_dir, shares[i], results, apply_budget)
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    pages = sum(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    return elapsed, pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark workers x threads")
+    parser.add_argument('--input', '-i', type=str, default='data/raw',
+                        help="Dossier de PDFs de test")
+    parser.add_argument('--models', '-m', type=str, default='models')
+    parser.add_argument('--cores', type=int, default=None,
+                        help="Budget total de cœurs (défaut: tous)")
+    parser.add_argument('--workers', type=str, default=None,
+                        help="Nombres de workers à comparer, ex: 1,2,4,8")
+    parser.add_argument('--pin-cpus', action='store_true',
+                        help="Épingle chaque worker sur ses cœurs")
+    parser.add_argument('--limit', type=int, default=None,
+                        help="Nombre maximal de PDFs utilisés")
+    args = parser.parse_args()
+
+    total_cores = args.cores or available_cores()
+    if args.workers:
+        worker_counts = [int(w) for w in args.workers.split(',')]
+    else:
+        worker_counts = sorted({1, 2, 4, total_cores // 2, total_cores} - {0})
+
+    pdf_files = sorted(Path(args.input).rglob("*.pdf"))[:args.limit]
+    if not pdf_files:
+        print("❌ Aucun PDF trouvé")
+        return
+
+    print(f"🔬 {len(pdf_files)} PDF(s), budget {total_cores} cœur(s)\n")
+    print("| Workers | Threads/worker | Temps (s) | Pages | Pages/s |")
+    print("|---------|----------------|-----------|-------|---------|")
+
+    for workers in worker_counts:
+        threads = CoreBudget(total_cores, workers).threads_per_worker
+        elapsed, pages = run_configuration(
+            workers, total_cores, args.pin_cpus, args.models, pdf_files
+        )
+        print(f"| {workers:7d} | {threads:14d} | {elapsed:9.1f} | {pages:5d} | "
+              f"{pages / elapsed:7.2f} |")
+
+    # Référence: autant de workers, mais chaque bibliothèque garde ses threads par défaut
+    workers = max(worker_counts)
+    elapsed, pages = run_configuration(
+        workers, total_cores, False, args.models, pdf_files, apply_budget=False
+    )
+    print(f"| {workers:7d} | {'défaut':>14} | {elapsed:9.1f} | {pages:5d} | "
+          f"{pages / elapsed:7.2f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Construction de l'index d'empreintes de mise en page
+à partir de pages étiquetées (un sous-dossier par classe)
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.config.config import LAYOUT_INDEX_CONFIG
+from src.preprocessing.pdf_processor import PDFProcessor
+from src.cv_module.layout_index import LayoutFingerprintIndex, compute_layout_fingerprint
+from src.utils.datasets import class_dirs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit l'index d'empreintes de gabarits")
+    parser.add_argument('--input', '-i', type=str, default='data/raw',
+                        help="Dossier de PDFs étiquetés (un sous-dossier par classe)")
+    parser.add_argument('--models', '-m', type=str, default='models',
+                        help="Dossier des modèles (l'index est écrit dans cv/)")
+    parser.add_argument('--dpi', type=int, default=300,
+                        help="Résolution de rendu (identique à la classification)")
+    args = parser.parse_args()
+
+    processor = PDFProcessor()
+    fingerprints = []
+    labels = []
+
+    for class_dir, label in class_dirs(args.input):
+        if label is None:
+            print(f"⚠️ Dossier ignoré (classe inconnue): {class_dir.name}")
+            continue
+
+        pdf_files = sorted(class_dir.rglob("*.pdf"))
+        print(f"📁 {class_dir.name} -> {label}: {len(pdf_files)} PDF(s)")
+
+        for pdf_file in pdf_files:
+            for page in processor.pdf_to_images(pdf_file, dpi=args.dpi, grayscale=True):
+                fingerprints.append(compute_layout_fingerprint(page))
+                labels.append(label)
+
+    if not fingerprints:
+        print("❌ Aucune page étiquetée trouvée")
+        return
+
+    index = LayoutFingerprintIndex.build(fingerprints, labels)
+    index_path = Path(args.models) / LAYOUT_INDEX_CONFIG['index_file']
+    index.save(index_path)
+
+    # Mesure de la latence de recherche sur les pages indexées
+    start = time.perf_counter()
+    for vector, aspect in fingerprints:
+        index.query(vector, aspect)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / len(fingerprints)
+
+    print(f"✅ {len(fingerprints)} page(s) indexée(s) -> {index_path}")
+    print(f"⏱️ Recherche moyenne: {elapsed_ms:.3f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
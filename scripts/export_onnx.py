@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Export ONNX des modèles CV/NLP, contrôle de parité avec torch
+et comparaison latence / débit / mémoire des backends
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.config.config import CV_CONFIG, INFERENCE_CONFIG
+from src.utils.offline_manager import OfflineModelManager
+from src.utils.memory_governor import current_rss_mb
+
+
+SAMPLE_TEXTS = [
+    "Relevé de compte bancaire - solde créditeur au 31/01/2024",
+    "Facture d'électricité: consommation 245 kWh, montant à payer 310,50 DH",
+    "Attestation de salaire délivrée par l'employeur",
+    "Carte nationale d'identité électronique",
+]
+
+
+def model_names(manager):
+    """Modèles comparés: ResNet50, CamemBERT et le modèle CV chargé par HybridCVClassifier"""
+    names = ["resnet50", "camembert"]
+    if manager.cv_checkpoint_path().exists():
+        names.append(f"{CV_CONFIG['model_name']}_documents")
+    return names
+
+
+def sample_inputs(manager, model_name, batch_size):
+    """Entrées de test reproductibles pour un modèle"""
+    if model_name != "camembert":
+        rng = np.random.default_rng(0)
+        return {'pixel_values': rng.standard_normal((batch_size, 3, 224, 224), dtype=np.float32)}
+
+    tokenizer = manager.load_camembert_tokenizer()
+    texts = (SAMPLE_TEXTS * batch_size)[:batch_size]
+    encoded = tokenizer(texts, padding=True, return_tensors='np')
+    return {'input_ids': encoded['input_ids'], 'attention_mask': encoded['attention_mask']}
+
+
+def check_parity(manager, model_name, quantized):
+    """Compare les sorties ONNX aux sorties torch sur les mêmes entrées"""
+    inputs = sample_inputs(manager, model_name, batch_size=4)
+    reference = manager.load_backend(model_name, 'torch').run(inputs)
+    candidate = manager.load_backend(model_name, 'onnx', quantized).run(inputs)
+
+    max_diff = float(np.abs(reference - candidate).max())
+    flat_ref = reference.reshape(len(reference), -1)
+    flat_cand = candidate.reshape(len(candidate), -1)
+    cosine = float(np.mean(
+        np.sum(flat_ref * flat_cand, axis=1)
+        / (np.linalg.norm(flat_ref, axis=1) * np.linalg.norm(flat_cand, axis=1))
+    ))
+
+    label = f"{model_name} onnx{' int8' if quantized else ''}"
+    line = f"  {label:32s} écart max {max_diff:.2e}  cosinus {cosine:.6f}"
+    if model_name != "camembert":
+        top1 = float(np.mean(reference.argmax(axis=1) == candidate.argmax(axis=1)))
+        line += f"  top-1 identique {top1:.0%}"
+
+    # Le graphe int8 n'est pas tenu à la tolérance fp32
+    ok = quantized or max_diff <= INFERENCE_CONFIG['parity_tolerance']
+    print(("✅" if ok else "❌") + line)
+    return ok
+
+
+def benchmark(manager, model_name, backend, quantized, batch_size, iterations):
+    """Latence moyenne, débit et mémoire d'un backend"""
+    rss_before = current_rss_mb()
+    runner = manager.load_backend(model_name, backend, quantized)
+    rss_loaded = current_rss_mb()
+
+    inputs = sample_inputs(manager, model_name, batch_size)
+    runner.run(inputs)  # Échauffement
+
+    latencies = []
+    peak_rss = rss_loaded
+    for _ in range(iterations):
+        start = time.perf_counter()
+        runner.run(inputs)
+        latencies.append(time.perf_counter() - start)
+        peak_rss = max(peak_rss, current_rss_mb())
+
+    mean_latency = float(np.mean(latencies))
+    return {
+        'latency_ms': mean_latency * 1000,
+        'p95_ms': float(np.percentile(latencies, 95)) * 1000,
+        'throughput': batch_size / mean_latency,
+        'load_mb': rss_loaded - rss_before,
+        'peak_rss_mb': peak_rss
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export et évaluation des graphes ONNX")
+    parser.add_argument('--models', '-m', type=str, default='models')
+    parser.add_argument('--quantize', action='store_true', help="Produit aussi des graphes int8")
+    parser.add_argument('--skip-export', action='store_true', help="Réutilise les graphes existants")
+    parser.add_argument('--check', action='store_true', help="Contrôle de parité avec torch")
+    parser.add_argument('--benchmark', action='store_true', help="Compare latence/débit/mémoire")
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    manager = OfflineModelManager(args.models)
+
+    if not args.skip_export:
+        print("📦 Export ONNX...")
+        for path in manager.export_onnx(quantize=args.quantize):
+            print(f"  ✅ {path} ({path.stat().st_size / 1e6:.1f} Mo)")
+
+    variants = [('torch', False), ('onnx', False)]
+    if args.quantize or manager.onnx_path("resnet50", quantized=True).exists():
+        variants.append(('onnx', True))
+
+    if args.check:
+        print("\n🔍 Parité torch / ONNX:")
+        all_ok = all(
+            check_parity(manager, model_name, quantized)
+            for model_name in model_names(manager)
+            for backend, quantized in variants if backend == 'onnx'
+        )
+        if not all_ok:
+            sys.exit(1)
+
+    if args.benchmark:
+        print(f"\n⏱️ Comparaison des backends (batch {args.batch_size}, {args.iterations} itérations)\n")
+        print("| Modèle | Backend | Latence (ms) | p95 (ms) | Débit (éléments/s) | Chargement (Mo) | Pic RSS (Mo) |")
+        print("|--------|---------|--------------|----------|--------------------|-----------------|--------------|")
+        for model_name in model_names(manager):
+            for backend, quantized in variants:
+                stats = benchmark(
+                    manager, model_name, backend, quantized, args.batch_size, args.iterations
+                )
+                label = backend + (" int8" if quantized else "")
+                print(f"| {model_name} | {label} | {stats['latency_ms']:.1f} | {stats['p95_ms']:.1f} | "
+                      f"{stats['throughput']:.1f} | {stats['load_mb']:.0f} | {stats['peak_rss_mb']:.0f} |")
+
+
+if __name__ == "__main__":
+    main()
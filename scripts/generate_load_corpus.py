@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Génération d'un corpus synthétique de charge (milliers de documents, en parallèle)
+
+Chaque document reçoit un label de CLASSES, un nombre de pages variable
+(relevés bancaires longs compris) et une forme:
+- "native": PDF texte (fpdf), comme fake_pdfs_generator_test.py;
+- "scan": pages raster dégradées (bruit, flou, inclinaison, rotation 90/180/270,
+  artefacts JPEG), assemblées en PDF ou en TIFF multipage.
+
+Le manifeste manifest.jsonl (une ligne par document) donne la vérité terrain:
+chemin, label, pages, forme, dégradations par page et graine. Chaque
+document est reproductible à partir de --seed et de son numéro.
+"""
+
+import argparse
+import io
+import json
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+from fpdf import FPDF
+
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import fake_pdfs_generator_test as fake
+from src.config.config import CLASSES, DATASET_LABEL_ALIASES
+
+
+# Noms de classes du générateur historique -> CLASSES
+TEXT_CLASS = {label: name for name, label in DATASET_LABEL_ALIASES.items()}
+
+# Nombre de pages par classe: (min, max) et probabilité d'un document long
+PAGE_COUNTS = {
+    "identite": ((1, 2), 0.0),
+    "releve_bancaire": ((1, 4), 0.25),
+    "facture_electricite": ((1, 3), 0.0),
+    "facture_eau": ((1, 3), 0.0),
+    "document_employeur": ((1, 4), 0.05)
+}
+
+TITLES = {
+    "identite": "CARTE NATIONALE D'IDENTITÉ",
+    "releve_bancaire": "RELEVÉ DE COMPTE",
+    "facture_electricite": "FACTURE D'ÉLECTRICITÉ",
+    "facture_eau": "FACTURE D'EAU",
+    "document_employeur": "ATTESTATION DE TRAVAIL"
+}
+
+FONT_FILE = "DejaVuSans.ttf"
+A4_MM = (210, 297)
+
+
+def page_count(label, rng, max_pages):
+    """Nombre de pages: petit en général, longue traîne pour les relevés"""
+    (low, high), long_probability = PAGE_COUNTS[label]
+    if rng.random() < long_probability:
+        return rng.randint(high + 1, max(high + 1, max_pages))
+    return rng.randint(low, high)
+
+
+def page_lines(label, page_number, rng):
+    """Lignes de texte d'une page (les pages suivantes des relevés sont des opérations)"""
+    random.seed(rng.random())  # generate_fake_text utilise le module random
+    text_class = TEXT_CLASS[label]
+
+    if label == "releve_bancaire" and page_number > 1:
+        lines = [f"Relevé de compte - page {page_number}", "Date  Libellé  Débit  Crédit"]
+        for _ in range(30):
+            amount = f"{rng.uniform(10, 5000):.2f}"
+            debit, credit = (amount, "") if rng.random() < 0.6 else ("", amount)
+            lines.append(f"{fake.generate_random_date(2024, 2025)}  "
+                         f"{rng.choice(['Virement', 'Retrait DAB', 'Prélèvement', 'Dépôt'])}  "
+                         f"{debit}  {credit}")
+        return lines
+
+    return [TITLES[label]] + [fake.generate_fake_text(text_class) for _ in range(18)]
+
+
+def native_pdf(pages, path):
+    """PDF texte (couche texte, pas de raster)"""
+    pdf = FPDF()
+    font = Path("/usr/share/fonts/truetype/dejavu") / FONT_FILE
+    if font.exists():
+        pdf.add_font("DejaVu", "", str(font))
+        pdf.set_font("DejaVu", size=11)
+    else:
+        pdf.set_font("Helvetica", size=11)
+
+    for lines in pages:
+        pdf.add_page()
+        for line in lines:
+            pdf.multi_cell(0, 6, line)
+            pdf.ln(1)
+    pdf.output(str(path))
+
+
+def load_font(size):
+    try:
+        return ImageFont.truetype(FONT_FILE, size)
+    except OSError:
+        return ImageFont.load_default(size)
+
+
+def render_page(lines, dpi):
+    """Page A4 en niveaux de gris, texte dessiné directement (sans poppler)"""
+    width, height = (round(mm / 25.4 * dpi) for mm in A4_MM)
+    page = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(page)
+
+    margin = dpi // 2
+    title_font, font = load_font(dpi // 7), load_font(dpi // 11)
+    y = margin
+    for i, line in enumerate(lines):
+        draw.text((margin, y), line, fill=0, font=title_font if i == 0 else font)
+        y += int((title_font if i == 0 else font).size * 1.6)
+        if y > height - margin:
+            break
+    return page
+
+
+def degrade(page, rng):
+    """Dégradations de numérisation; retourne la page et leurs paramètres"""
+    params = {
+        'rotation': rng.choices([0, 90, 180, 270], weights=[85, 6, 6, 3])[0],
+        'skew': round(rng.uniform(-3.0, 3.0), 2),
+        'blur': round(rng.uniform(0.0, 1.5), 2),
+        'noise': round(rng.uniform(0.0, 18.0), 1),
+        'jpeg_quality': rng.randint(25, 85)
+    }
+
+    page = page.rotate(params['skew'], resample=Image.BILINEAR, fillcolor=255)
+    if params['blur'] > 0.2:
+        page = page.filter(ImageFilter.GaussianBlur(params['blur']))
+
+    pixels = np.asarray(page, dtype=np.float32)
+    noise_rng = np.random.default_rng(rng.getrandbits(32))
+    pixels = pixels + noise_rng.normal(0.0, params['noise'], pixels.shape)
+    page = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+    if params['rotation']:
+        page = page.rotate(params['rotation'], expand=True)
+
+    buffer = io.BytesIO()
+    page.save(buffer, "JPEG", quality=params['jpeg_quality'])
+    buffer.seek(0)
+    return Image.open(buffer), params
+
+
+def generate_document(index, output_dir, seed, max_pages, scan_ratio, tiff_ratio, dpi, flat):
+    """Génère un document et retourne son entrée de manifeste"""
+    rng = random.Random(seed * 1_000_003 + index)
+    label = CLASSES[index % len(CLASSES)]
+    pages = [page_lines(label, n + 1, rng) for n in range(page_count(label, rng, max_pages))]
+
+    kind = "scan" if rng.random() < scan_ratio else "native"
+    suffix = ".tif" if kind == "scan" and rng.random() < tiff_ratio else ".pdf"
+    folder = output_dir if flat else output_dir / label
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"doc_{index:06d}{suffix}"
+
+    degradations = []
+    if kind == "native":
+        native_pdf(pages, path)
+    else:
+        images = []
+        for lines in pages:
+            image, params = degrade(render_page(lines, dpi), rng)
+            images.append(image)
+            degradations.append(params)
+        if suffix == ".tif":
+            images[0].save(path, "TIFF", save_all=True, append_images=images[1:],
+                           compression="tiff_lzw", dpi=(dpi, dpi))
+        else:
+            images[0].save(path, "PDF", save_all=True, append_images=images[1:], resolution=dpi)
+
+    return {
+        'path': str(path.relative_to(output_dir)),
+        'label': label,
+        'pages': len(pages),
+        'kind': kind,
+        'format': suffix[1:],
+        'degradations': degradations,
+        'seed': seed,
+        'index': index
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère un corpus synthétique de charge")
+    parser.add_argument('--output', '-o', type=str, default='data/load_corpus')
+    parser.add_argument('--documents', '-n', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=None, help="Processus (défaut: tous les cœurs)")
+    parser.add_argument('--max-pages', type=int, default=40, help="Pages max d'un document long")
+    parser.add_argument('--scan-ratio', type=float, default=0.6, help="Part de documents scannés")
+    parser.add_argument('--tiff-ratio', type=float, default=0.15, help="Part des scans livrés en TIFF")
+    parser.add_argument('--dpi', type=int, default=200, help="Résolution des pages scannées")
+    parser.add_argument('--flat', action='store_true',
+                        help="Tous les documents dans un seul dossier (labels dans le manifeste seulement)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / "manifest.jsonl"
+
+    start = time.perf_counter()
+    entries = []
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(generate_document, i, output_dir, args.seed, args.max_pages,
+                            args.scan_ratio, args.tiff_ratio, args.dpi, args.flat)
+            for i in range(args.documents)
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            entries.append(future.result())
+            if done % 100 == 0:
+                print(f"  {done}/{args.documents} document(s)")
+
+    entries.sort(key=lambda entry: entry['index'])
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    elapsed = time.perf_counter() - start
+    pages = sum(entry['pages'] for entry in entries)
+    kinds = Counter(f"{entry['kind']}/{entry['format']}" for entry in entries)
+    print(f"\n✅ {len(entries)} document(s), {pages} page(s) en {elapsed:.0f}s -> {output_dir}")
+    print(f"   Formes: {dict(kinds)}")
+    print(f"   Labels: {dict(Counter(entry['label'] for entry in entries))}")
+    print(f"📄 Manifeste: {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Entraînement et comparaison des backbones CV sur nos pages de documents
+
+Pour chaque backbone: fine-tuning sur les pages étiquetées (un sous-dossier
+par classe), puis rapport précision / pages par seconde / mémoire.
+Le modèle entraîné est sauvegardé dans models/cv/<backbone>_documents.pth.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import torch
+import torch.nn as nn
+
+from src.config.config import CLASSES, CV_CONFIG
+from src.preprocessing.pdf_processor import PDFProcessor
+from src.utils.offline_manager import OfflineModelManager
+from src.utils.memory_governor import current_rss_mb
+from src.utils.datasets import class_dirs, stratified_split
+from src.cv_module.backbones import BACKBONES, build_backbone, replace_head, has_pretrained_weights
+
+
+def load_dataset(input_dir, dpi):
+    """Rend chaque page étiquetée et la prépare comme dans le pipeline (gris, 224x224)"""
+    processor = PDFProcessor()
+    tensors, labels = [], []
+
+    for class_dir, label in class_dirs(input_dir):
+        if label is None:
+            print(f"⚠️ Dossier ignoré (classe inconnue): {class_dir.name}")
+            continue
+
+        for pdf_file in sorted(class_dir.rglob("*.pdf")):
+            for page in processor.pdf_to_images(pdf_file, dpi=dpi):
+                # Le pipeline donne au CNN la page en niveaux de gris (répliquée sur 3 canaux)
+                gray = processor.to_grayscale(page)
+                tensors.append(processor.preprocess_for_cv(gray, CV_CONFIG['image_size']).astype(np.float32))
+                labels.append(CLASSES.index(label))
+
+    return np.stack(tensors), np.array(labels, dtype=np.int64)
+
+
+def build_model(manager, name):
+    """Backbone avec poids ImageNet locaux (si disponibles) et tête à len(CLASSES) sorties"""
+    if has_pretrained_weights(name):
+        model = manager.load_pretrained_backbone(name)
+        return replace_head(model, len(CLASSES))
+    return build_backbone(name, num_classes=len(CLASSES))
+
+
+def train(model, x_train, y_train, epochs, batch_size, lr, seed):
+    """Fine-tuning complet (Adam, entropie croisée)"""
+    torch.manual_seed(seed)
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+    criterion = nn.CrossEntropyLoss()
+    x_train = torch.from_numpy(x_train)
+    y_train = torch.from_numpy(y_train)
+
+    model.train()
+    for epoch in range(epochs):
+        permutation = torch.randperm(len(x_train))
+        total_loss = 0.0
+        for start in range(0, len(x_train), batch_size):
+            batch = permutation[start:start + batch_size]
+            optimizer.zero_grad()
+            loss = criterion(model(x_train[batch]), y_train[batch])
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item() * len(batch)
+        print(f"    époque {epoch + 1}/{epochs} - perte {total_loss / len(x_train):.4f}")
+    model.eval()
+
+
+def evaluate(model, x_val, y_val):
+    """Précision, pages/s (une page à la fois, comme le pipeline) et mémoire"""
+    rss_before = current_rss_mb()
+    peak_rss = rss_before
+    predictions = []
+
+    with torch.inference_mode():
+        model(torch.from_numpy(x_val[:1]))  # Échauffement
+        start = time.perf_counter()
+        for page in x_val:
+            logits = model(torch.from_numpy(page[np.newaxis]))
+            predictions.append(int(logits.argmax(dim=1)))
+            peak_rss = max(peak_rss, current_rss_mb())
+        elapsed = time.perf_counter() - start
+
+    params_mb = sum(p.numel() * p.element_size() for p in model.parameters()) / 1e6
+    return {
+        'accuracy': float(np.mean(np.array(predictions) == y_val)),
+        'pages_per_s': len(x_val) / elapsed,
+        'params_mb': params_mb,
+        'inference_rss_mb': peak_rss - rss_before
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entraîne et compare les backbones CV")
+    parser.add_argument('--input', '-i', type=str, default='data/raw',
+                        help="Pages étiquetées (un sous-dossier par classe)")
+    parser.add_argument('--models', '-m', type=str, default='models')
+    parser.add_argument('--backbones', type=str, default="resnet50,resnet18,mobilenet_v3_small,tiny_cnn",
+                        help=f"Backbones à comparer parmi: {', '.join(BACKBONES)}")
+    parser.add_argument('--dpi', type=int, default=300, help="Résolution de rendu (celle du pipeline)")
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--val-ratio', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    manager = OfflineModelManager(args.models)
+
+    print("📄 Préparation des pages...")
+    x, y = load_dataset(args.input, args.dpi)
+    train_idx, val_idx = stratified_split(y, args.val_ratio, args.seed)
+    print(f"  {len(train_idx)} page(s) d'entraînement, {len(val_idx)} de validation")
+
+    rows = []
+    for name in args.backbones.split(','):
+        print(f"\n🧠 {name}")
+        model = build_model(manager, name)
+        lr = 1e-4 if has_pretrained_weights(name) else 1e-3
+
+        start = time.perf_counter()
+        train(model, x[train_idx], y[train_idx], args.epochs, args.batch_size, lr, args.seed)
+        train_time = time.perf_counter() - start
+
+        stats = evaluate(model, x[val_idx], y[val_idx])
+        stats['train_s'] = train_time
+        rows.append((name, stats))
+
+        checkpoint_path = manager.cv_checkpoint_path(name)
+        checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        torch.save({
+            'backbone': name,
+            'classes': CLASSES,
+            'state_dict': model.state_dict(),
+            'val_accuracy': stats['accuracy']
+        }, checkpoint_path)
+        print(f"  ✅ Sauvegardé: {checkpoint_path}")
+
+    print("\n| Backbone | Précision | Pages/s | Paramètres (Mo) | RSS inférence (Mo) | Entraînement (s) |")
+    print("|----------|-----------|---------|-----------------|--------------------|------------------|")
+    for name, stats in rows:
+        print(f"| {name} | {stats['accuracy']:.1%} | {stats['pages_per_s']:.1f} | "
+              f"{stats['params_mb']:.1f} | {stats['inference_rss_mb']:.0f} | {stats['train_s']:.0f} |")
+
+    print(f"\n➡️ Choisir le backbone via CV_CONFIG['model_name'] (actuel: {CV_CONFIG['model_name']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Entraînement du classifieur de texte TF-IDF (n-grammes de caractères + SVM linéaire)
+
+Les pages étiquetées (un sous-dossier par classe: PDFs générés par
+fake_pdfs_generator_test.py, vrais documents, archives ou scans) sont
+OCRisées comme dans le pipeline; les textes sont mis en cache (JSONL) pour
+ré-entraîner sans refaire l'OCR. Rapport sur la validation: précision,
+calibration (log-loss, ECE), temps par page unitaire et par lot, face à
+PatternMatcher seul. Le modèle final, entraîné sur toutes les pages, est
+sauvegardé dans models/nlp/.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.config.config import CLASSES
+from src.preprocessing.pdf_processor import PDFProcessor
+from src.nlp_module.ocr_extractor import OCRExtractor
+from src.nlp_module.pattern_matcher import PatternMatcher
+from src.nlp_module.text_classifier import TextClassifier
+from src.utils.input_sources import iter_items
+from src.utils.datasets import class_dirs, stratified_split
+from src.utils.offline_manager import OfflineModelManager
+
+
+def ocr_pages(input_dir, limit):
+    """Texte OCR de chaque page étiquetée: [(texte, label)]"""
+    processor = PDFProcessor()
+    ocr = OCRExtractor()
+    pages = []
+
+    for class_dir, label in class_dirs(input_dir):
+        if label is None:
+            print(f"⚠️ Dossier ignoré (classe inconnue): {class_dir.name}")
+            continue
+
+        count = 0
+        for item in iter_items(class_dir):
+            if item.kind == 'image':
+                images = processor.image_to_pages(item.source())
+            else:
+                images = processor.pdf_to_images(item.source())
+            for image in images:
+                text, _ = ocr.extract_with_confidence(processor.preprocess_for_ocr(image))
+                pages.append((text, label))
+                count += 1
+            if limit and count >= limit:
+                break
+        print(f"  {label}: {count} page(s)")
+
+    return pages
+
+
+def load_pages(args):
+    """Pages depuis le cache JSONL, sinon OCR puis écriture du cache"""
+    cache = Path(args.cache) if args.cache else None
+    if cache is not None and cache.exists() and not args.refresh:
+        with open(cache, encoding='utf-8') as f:
+            pages = [json.loads(line) for line in f if line.strip()]
+        print(f"📄 {len(pages)} page(s) lue(s) depuis {cache}")
+        return [(page['text'], page['label']) for page in pages]
+
+    print("📄 OCR des pages étiquetées...")
+    pages = ocr_pages(args.input, args.limit)
+    if cache is not None:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache, 'w', encoding='utf-8') as f:
+            for text, label in pages:
+                f.write(json.dumps({'text': text, 'label': label}, ensure_ascii=False) + "\n")
+        print(f"💾 Cache des textes: {cache}")
+    return pages
+
+
+def expected_calibration_error(probabilities, targets, bins=10):
+    """ECE: écart moyen entre confiance et précision, par tranche de confiance"""
+    confidence = probabilities.max(axis=1)
+    correct = probabilities.argmax(axis=1) == targets
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    ece = 0.0
+    for low, high in zip(edges[:-1], edges[1:]):
+        in_bin = (confidence > low) & (confidence <= high)
+        if in_bin.any():
+            ece += in_bin.mean() * abs(correct[in_bin].mean() - confidence[in_bin].mean())
+    return ece
+
+
+def evaluate(classifier, matcher, texts, labels):
+    """Précision, calibration et temps par page du modèle, face aux mots-clés"""
+    targets = np.array([CLASSES.index(label) for label in labels])
+
+    start = time.perf_counter()
+    for text in texts:
+        classifier.predict(text)
+    single_us = (time.perf_counter() - start) / len(texts) * 1e6
+
+    start = time.perf_counter()
+    probabilities = classifier.predict_proba_batch(texts)
+    batch_us = (time.perf_counter() - start) / len(texts) * 1e6
+
+    start = time.perf_counter()
+    keyword_predictions = [matcher.predict(text)[0] for text in texts]
+    keyword_us = (time.perf_counter() - start) / len(texts) * 1e6
+
+    picked = np.clip(probabilities[np.arange(len(targets)), targets], 1e-12, 1.0)
+    return {
+        'accuracy': float(np.mean(probabilities.argmax(axis=1) == targets)),
+        'log_loss': float(-np.mean(np.log(picked))),
+        'ece': expected_calibration_error(probabilities, targets),
+        'single_us': single_us,
+        'batch_us': batch_us,
+        'keyword_accuracy': float(np.mean([p == label for p, label in zip(keyword_predictions, labels)])),
+        'keyword_us': keyword_us
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entraîne le classifieur de texte TF-IDF")
+    parser.add_argument('--input', '-i', type=str, default='data/raw',
+                        help="Pages étiquetées (un sous-dossier par classe)")
+    parser.add_argument('--models', '-m', type=str, default='models')
+    parser.add_argument('--cache', type=str, default='data/text_pages.jsonl',
+                        help="Cache JSONL des textes OCR (vide pour désactiver)")
+    parser.add_argument('--refresh', action='store_true', help="Refait l'OCR malgré le cache")
+    parser.add_argument('--limit', type=int, default=0, help="Pages maximum par classe (0 = toutes)")
+    parser.add_argument('--val-ratio', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    pages = load_pages(args)
+    if not pages:
+        print("❌ Aucune page étiquetée trouvée")
+        return
+
+    texts = [text for text, _ in pages]
+    labels = [label for _, label in pages]
+    train_idx, val_idx = stratified_split(labels, args.val_ratio, args.seed)
+    print(f"  {len(train_idx)} page(s) d'entraînement, {len(val_idx)} de validation")
+
+    start = time.perf_counter()
+    classifier = TextClassifier.train([texts[i] for i in train_idx], [labels[i] for i in train_idx])
+    train_s = time.perf_counter() - start
+
+    stats = evaluate(classifier, PatternMatcher(),
+                     [texts[i] for i in val_idx], [labels[i] for i in val_idx])
+
+    print("\n| Modèle | Précision | Log-loss | ECE | µs/page (unitaire) | µs/page (lot) |")
+    print("|--------|-----------|----------|-----|--------------------|---------------|")
+    print(f"| TF-IDF + SVM calibré | {stats['accuracy']:.1%} | {stats['log_loss']:.3f} | "
+          f"{stats['ece']:.3f} | {stats['single_us']:.0f} | {stats['batch_us']:.0f} |")
+    print(f"| PatternMatcher (mots-clés) | {stats['keyword_accuracy']:.1%} | - | - | "
+          f"{stats['keyword_us']:.0f} | - |")
+    print(f"\nEntraînement: {train_s:.1f}s, {classifier.meta['features']} n-grammes")
+
+    # Modèle final sur toutes les pages
+    classifier = TextClassifier.train(texts, labels)
+    classifier.meta['val_accuracy'] = stats['accuracy']
+    model_path = classifier.save(OfflineModelManager(args.models).text_classifier_path())
+    print(f"✅ Sauvegardé: {model_path}")
+
+
+if __name__ == "__main__":
+    main()
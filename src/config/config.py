@@ -17,63 +17,322 @@ CLASSES = [
 
 # Configuration CV
 CV_CONFIG = {
-    "model_name": "resnet50",
+    "model_name": "resnet50",  # resnet50, resnet18, mobilenet_v3_small, mobilenet_v3_large, tiny_cnn
     "image_size": (224, 224),
     "batch_size": 32,
-    "confidence_threshold": 0.8
+    "confidence_threshold": 0.8,
+    "use_cnn": True,           # Utilise models/cv/<model_name>_documents.pth (.onnx en backend ONNX) s'il existe
+    "cnn_weight": 0.6          # Poids du CNN face aux gabarits dans le score CV
 }
 
 # Configuration NLP
 NLP_CONFIG = {
-    "ocr_lang": "fra",
     "camembert_model": "camembert-base",
     "max_length": 512,
     "confidence_threshold": 0.8
 }
 
-# Configuration Gabarits
-TEMPLATE_FEATURES = {
-    "identite": {
-        "aspect_ratio": (1.5, 1.7),  # Format carte
-        "has_photo": True,
-        "text_density": (0.3, 0.6)
-    },
-    "releve_bancaire": {
-        "aspect_ratio": (1.3, 1.5),  # Format A4
-        "has_table": True,
-        "text_density": (0.4, 0.7)
+# Configuration du classifieur de texte TF-IDF (entre les mots-clés et CamemBERT)
+TEXT_CLASSIFIER_CONFIG = {
+    "enabled": True,                    # Utilisé si models/nlp/<model_file> existe
+    "model_file": "tfidf_text.joblib",
+    "ngram_range": (2, 5),              # N-grammes de caractères (dans les mots)
+    "max_features": 200000,
+    "min_df": 2,
+    "C": 1.0,                           # Régularisation du SVM linéaire
+    "calibration_folds": 3,             # Calibration sigmoïde des probabilités
+    "min_text_length": 20,              # Texte plus court: mots-clés seuls
+    "weight": 0.6                       # Poids du modèle face aux mots-clés dans le score NLP
+}
+
+# Mots-clés, gabarits et seuils de fusion: src/config/rules.yaml (source unique,
+# voir RULES_CONFIG et src/config/rules.py)
+
+# Configuration Pipeline (API de streaming)
+PIPELINE_CONFIG = {
+    "max_in_flight": 4,  # Documents traités simultanément par classify_many
+    "ordered": True      # True = ordre d'entrée, False = ordre de complétion
+}
+
+# Configuration Mémoire
+MEMORY_CONFIG = {
+    # Rendu PDF en niveaux de gris (3x moins de mémoire par page). Désactivé
+    # par défaut: les JPEG exportés deviendraient gris et la variance de la
+    # zone de signature (gabarits) serait calculée sur une autre entrée
+    "grayscale_render": False,
+    "budget_mb": None,         # Budget RSS du processus en Mo (None = illimité)
+    "high_watermark": 0.9,     # Fraction du budget à partir de laquelle on freine
+    "low_memory_range_pages": 2,  # Budget dépassé: PDFs suivants rendus par plages de N pages
+    "poll_interval": 0.05      # Période d'échantillonnage du RSS (s)
+}
+
+# Configuration du pool de pages en mémoire partagée (pages transmises entre processus sans copie)
+PAGE_POOL_CONFIG = {
+    "slots": 8,              # Pages en vol au maximum (anneau de slots)
+    "slot_mb": 27,           # Taille d'un slot: page A4 RGB à 300 dpi (~26 Mo)
+    "acquire_timeout": 120,  # Attente max d'un slot libre (s)
+    "claim_timeout": 300,    # Page publiée jamais réclamée par un worker: slot libéré (s)
+    "render_batch": 4        # Pages rendues par appel poppler dans render_to_pool
+}
+
+# Features de mise en page dérivées des boîtes de mots Tesseract
+# (pages OCRisées: remplacent les passes OpenCV de densité, tableau et signature)
+# text_density y est la surface couverte par les mots (et non la part d'encre):
+# les gabarits la comparent à leurs plages word_text_density
+WORD_LAYOUT_CONFIG = {
+    "enabled": True,
+    "min_word_confidence": 60,     # Mots retenus dans le texte OCR
+    "column_tolerance": 0.01,      # Écart max entre bords gauches alignés (fraction de largeur)
+    "min_column_rows": 4,          # Lignes alignées pour former une colonne
+    "min_table_columns": 3,        # Colonnes alignées pour une structure tabulaire
+    "header_fraction": 0.12,       # Bandeau d'en-tête (fraction de hauteur)
+    "footer_fraction": 0.10,       # Bandeau de pied de page
+    "signature_keywords": ["signature", "cachet", "signé", "lu et approuvé", "le directeur"],
+    "min_signature_gap": 0.06      # Zone vide sous la mention de signature (fraction de hauteur)
+}
+
+# Configuration Mode document (PDF multi-pages)
+DOCUMENT_MODE_CONFIG = {
+    "enabled": False,                 # Activé aussi par --document-mode
+    "min_pages": 4,                   # En dessous, toutes les pages sont traitées
+    "middle_samples": 2,              # Pages échantillons entre la première et la dernière
+    "agreement_confidence": 0.8,      # Confiance minimale de chaque échantillon
+    "template_verify_threshold": 0.6  # Score gabarit minimal pour propager sans OCR
+}
+
+# Configuration Gros documents: plages de pages rendues et classées en parallèle
+# (les threads du worker sont alors partagés entre les instances de Tesseract et OpenCV)
+LARGE_DOCUMENT_CONFIG = {
+    "enabled": True,
+    "min_pages": 40,      # PDFs découpés à partir de ce nombre de pages
+    "range_pages": 10     # Pages par plage (rendu pdf2image first_page/last_page)
+}
+
+# Configuration Quasi-doublons (hash perceptuel)
+DEDUP_CONFIG = {
+    "enabled": True,
+    "hash_size": 8,            # dHash 8x8 = 64 bits
+    "max_hamming": 4,          # Distance de Hamming maximale pour un quasi-doublon
+    "verify_thumb_size": 32,   # Vignette de vérification (pixels)
+    "verify_max_diff": 6.0,    # Écart absolu moyen maximal entre vignettes (0-255)
+    "max_entries": 100000      # Taille maximale de l'index par lot
+}
+
+# Correspondance noms de dossiers du jeu de données -> classes
+DATASET_LABEL_ALIASES = {
+    "identity_card": "identite",
+    "bank_statement": "releve_bancaire",
+    "electricity_bill": "facture_electricite",
+    "water_bill": "facture_eau",
+    "employer_doc": "document_employeur"
+}
+
+# Configuration Index d'empreintes de mise en page
+LAYOUT_INDEX_CONFIG = {
+    "index_file": "cv/layout_index.npz",  # Relatif au dossier des modèles
+    "work_width": 256,                    # Largeur de la page réduite (pixels)
+    "grid": (32, 24),                     # Grille de densité d'encre (lignes, colonnes)
+    "k": 5,                               # Nombre de voisins consultés
+    "aspect_tolerance": 0.15,             # Écart de ratio maximal avec un voisin
+    "exact_distance": 1e-3,               # Distance cosinus d'une page identique (vote seule)
+    "short_circuit_similarity": 0.97,     # Similarité minimale pour court-circuiter l'OCR
+    "short_circuit_agreement": 1.0        # Part minimale des votes pour la classe retenue
+}
+
+# Configuration Règles (fichier YAML rechargé à chaud)
+RULES_CONFIG = {
+    "path": BASE_DIR / "src" / "config" / "rules.yaml",           # Fichier surveillé (--rules)
+    "builtin_path": BASE_DIR / "src" / "config" / "rules.yaml",   # Règles par défaut livrées
+    "check_interval": 2.0  # Secondes entre deux vérifications du fichier (-1 = jamais)
+}
+
+# Configuration File de travail (multi-workers, multi-machines)
+QUEUE_CONFIG = {
+    "visibility_timeout": 600,   # Durée d'un bail (s) avant remise en file
+    "heartbeat_interval": 60,    # Prolongation du bail pendant le traitement (s)
+    "max_attempts": 3,           # Tentatives avant échec définitif
+    "poll_interval": 5,          # Attente quand tous les PDFs restants sont en cours (s)
+    "busy_timeout": 60,          # Attente du verrou SQLite (s)
+    "journal_mode": "DELETE"     # WAL est plus rapide mais incompatible avec un stockage réseau
+}
+
+# Configuration Ressources CPU (évite la sursouscription de threads)
+RESOURCE_CONFIG = {
+    "total_cores": None,        # Budget total (None = cœurs disponibles)
+    "pin_cpus": False,          # Épinglage de chaque worker sur ses cœurs
+    "tesseract_threads": None   # OMP_THREAD_LIMIT pour Tesseract (None = threads par worker)
+}
+
+# Configuration Inférence (backends des modèles CV/NLP)
+INFERENCE_CONFIG = {
+    "backend": "torch",        # "torch" ou "onnx" (ONNX Runtime, CPU)
+    "quantized": False,        # Graphes int8 pour le backend ONNX
+    "onnx_opset": 17,
+    "intra_op_threads": None,  # Threads ONNX Runtime (None = budget CoreBudget appliqué, sinon défaut)
+    "parity_tolerance": 1e-3   # Écart absolu max accepté entre torch et ONNX fp32
+}
+
+# Configuration de l'escalade OCR (passe rapide, puis réglages plus coûteux si besoin)
+OCR_ESCALATION_CONFIG = {
+    "enabled": True,
+    "min_confidence": 0.75,        # Confiance OCR moyenne en dessous de laquelle on escalade
+    "min_pattern_strength": 0.2,   # Signal PatternMatcher minimal pour accepter la passe
+    # Échelons essayés dans l'ordre; scale s'applique au rendu (dpi du profil de performance),
+    # preprocess "light" = binarisation Otsu seule, "full" = enhance_image + correct_skew
+    "ladder": [
+        # profile: voir OCR_PROFILES ("default" = profil du run); psm remplace celui du profil
+        {"name": "fast", "scale": 0.5, "preprocess": "light", "profile": "fast"},
+        {"name": "standard", "scale": 1.0, "preprocess": "full", "profile": "default"},
+        {"name": "sparse", "scale": 1.0, "preprocess": "full", "profile": "default", "psm": 11},
+        {"name": "auto", "scale": 1.0, "preprocess": "full", "profile": "default", "psm": 3}
+    ]
+}
+
+# Configuration de la détection d'orientation (avant OCR et gabarits)
+ORIENTATION_CONFIG = {
+    "enabled": True,
+    "max_side": 1024,          # Plus grand côté (px) de la page réduite analysée
+    "retry_max_side": 2048,    # Nouvel essai OSD sur une page jugée couchée par l'heuristique
+    # Confiance minimale par méthode (seul OSD applique une rotation)
+    "min_confidence": {
+        "osd": 2.0,            # orientation_conf de Tesseract OSD
+        "text_lines": 1.5      # Contraste colonnes/lignes déclenchant le nouvel essai OSD
+    }
+}
+
+# Configuration de l'OCR selon l'écriture (documents bilingues français/arabe)
+# La page entière est OCRisée avec OCR_CONFIG["lang"]; seules les zones détectées
+# comme arabes sont OCRisées en plus avec arabic_lang (pas de fra+ara pleine page)
+SCRIPT_CONFIG = {
+    "enabled": True,
+    "arabic_lang": "ara",
+    "max_side": 1600,            # Plus grand côté (px) de la page réduite analysée
+    "word_gap": 15,              # Fusion des mots en segments de ligne (px, page réduite)
+    "min_line_height": 6,        # Hauteur minimale d'un segment (px, page réduite)
+    "chunk_heights": 6,          # Largeur des tronçons mesurés (en hauteurs de ligne)
+    "min_baseline_peak": 2.2,    # Pic du profil horizontal / moyenne (ligne de base arabe)
+    "min_run_heights": 0.5,      # Segment continu "long" sur la ligne de base (en hauteurs)
+    "min_baseline_runs": 0.3,    # Part de l'encre de la ligne de base en segments longs
+    "block_gap": 1.0,            # Fusion des lignes arabes voisines en blocs (en hauteurs)
+    "max_blocks": 8              # Au-delà: un seul bloc englobant
+}
+
+# Configuration de l'export des pages classées
+EXPORT_CONFIG = {
+    "format": "jpeg",   # "jpeg" (raster 300 dpi par page) ou "pdf" (copie des pages d'origine)
+    "flush_every": 20   # PDFs sources par lot écrit (mode "pdf")
+}
+
+# Configuration OCR (Tesseract)
+OCR_CONFIG = {
+    "lang": "fra",              # Langue(s) Tesseract de la page entière
+    "profile": "default",       # Profil par défaut (voir OCR_PROFILES, --ocr-profile)
+    # Dossiers tessdata_fast / tessdata_best (None = tessdata installé, avec avertissement)
+    "tessdata_dirs": {
+        "fast": os.environ.get("TESSDATA_FAST_PREFIX"),
+        "best": os.environ.get("TESSDATA_BEST_PREFIX")
     },
-    "facture_electricite": {
-        "aspect_ratio": (1.3, 1.5),
-        "has_table": True,
-        "text_density": (0.3, 0.6)
+    "user_words_file": MODELS_DIR / "ocr" / "keywords.user-words"
+}
+
+# Profils OCR nommés: oem/psm, modèles fast/best, mots du domaine, listes blanches
+OCR_PROFILES = {
+    "default": {"oem": 3, "psm": 6},                        # Comportement historique
+    "lstm": {"oem": 1, "psm": 6},                           # LSTM seul
+    "fast": {"oem": 1, "psm": 6, "tessdata": "fast"},       # Modèles LSTM rapides (entiers)
+    "best": {"oem": 1, "psm": 6, "tessdata": "best"},       # Modèles LSTM précis (float)
+    "keywords": {"oem": 1, "psm": 6, "user_words": True},   # + mots-clés des règles
+    # Zones ciblées (une ligne): montants, numéros, identifiants (CIN, RIB)
+    "amounts": {"oem": 1, "psm": 7, "whitelist": "0123456789,.-DHMAdhma€"},
+    "digits": {"oem": 1, "psm": 7, "whitelist": "0123456789"},
+    "id": {"oem": 1, "psm": 7, "whitelist": "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"}
+}
+
+# Profils de performance (--profile): réglages de coût cohérents entre modules
+# "balanced" reproduit le comportement historique. Profil personnalisé: ajouter
+# une entrée avec "extends" (profil de base) et les seules clés modifiées, ex.
+#   "scans_bruites": {"extends": "balanced", "denoise_strength": 7}
+PERFORMANCE_CONFIG = {
+    "profile": "balanced"          # Profil par défaut (--profile)
+}
+
+PERFORMANCE_PROFILES = {
+    "fast": {
+        "dpi": 200,                # Résolution du rendu PDF / des scans
+        "denoise": False,          # fastNlMeansDenoising avant l'OCR
+        "denoise_strength": 3,     # Paramètre h du débruitage
+        "photo_scale_factor": 1.3, # Pas de la pyramide du détecteur de visages
+        "photo_min_neighbors": 4,
+        # Hough en pixels de la page rendue (proportionnels au dpi)
+        "hough_threshold": 70,
+        "hough_min_line_length": 65,
+        "hough_max_line_gap": 7,
+        "ocr_profile": "fast",     # Voir OCR_PROFILES (--ocr-profile le remplace)
+        "ocr_escalation": False    # Une seule passe OCR
     },
-    "facture_eau": {
-        "aspect_ratio": (1.3, 1.5),
-        "has_table": True,
-        "text_density": (0.3, 0.6)
+    "balanced": {
+        "dpi": 300,
+        "denoise": True,
+        "denoise_strength": 3,
+        "photo_scale_factor": 1.1,
+        "photo_min_neighbors": 5,
+        "hough_threshold": 100,
+        "hough_min_line_length": 100,
+        "hough_max_line_gap": 10,
+        "ocr_profile": "default",
+        "ocr_escalation": True
     },
-    "document_employeur": {
-        "aspect_ratio": (1.3, 1.5),
-        "has_signature": True,
-        "text_density": (0.5, 0.8)
+    "accurate": {
+        "dpi": 400,
+        "denoise": True,
+        "denoise_strength": 5,
+        "photo_scale_factor": 1.05,
+        "photo_min_neighbors": 5,
+        "hough_threshold": 130,
+        "hough_min_line_length": 135,
+        "hough_max_line_gap": 13,
+        "ocr_profile": "best",
+        "ocr_escalation": True
     }
 }
 
-# Mots-clés par classe
-KEYWORDS = {
-    "identite": ["identité", "nationale", "cin", "carte", "né(e)", "nationalité", "date"],
-    "releve_bancaire": ["solde", "débit", "crédit", "compte", "banque", "opération", "RIB"],
-    "facture_electricite": ["kwh", "électricité", "puissance", "abonnement", "consommation", "ONE", "LYDEC"],
-    "facture_eau": ["m³", "eau", "consommation", "index", "RADEEMA", "AMENDIS"],
-    "document_employeur": ["salaire", "employeur", "embauche", "cotisations", "bulletin", "attestation"]
+# Configuration du modèle de coût (ordonnancement longest-first, --estimate)
+COST_MODEL_CONFIG = {
+    "model_file": "cost_model.json",       # Relatifs au dossier des modèles
+    "history_file": "cost_history.jsonl",
+    # secondes = a + b*pages + c*taille_Mo + d*pages_avec_couche_texte
+    "default_coefficients": [1.0, 6.0, 0.0, 0.0],
+    "min_samples": 10,        # Mesures nécessaires avant d'ajuster le modèle
+    "max_history": 5000,      # Mesures les plus récentes utilisées
+    "min_seconds": 0.1,
+    "text_probe_pages": 3     # Pages inspectées pour détecter une couche texte
+}
+
+# Configuration des délais (latence de queue) et du watchdog
+DEADLINE_CONFIG = {
+    "enabled": True,
+    "page_seconds": 180,          # Budget total d'une page (au-delà: a_verifier)
+    # Budgets par étape (s); Tesseract et poppler sont interrompus au délai
+    "stage_seconds": {
+        "render": 600,            # Rendu d'un PDF complet
+        "orientation": 15,
+        "template": 30,
+        "cnn": 30,
+        "ocr": 60                 # Par appel Tesseract (chaque échelon d'escalade)
+    },
+    "watchdog_interval": 1.0,
+    "worker_stall_seconds": 900,  # Worker sans progression -> tué et relancé
+    "max_restarts": 10            # Redémarrages de workers au maximum par run
 }
 
-# Configuration Fusion
-FUSION_CONFIG = {
-    "perfect_agreement_threshold": 0.8,
-    "strong_cv_threshold": 0.9,
-    "strong_nlp_threshold": 0.9,
-    "template_validation_threshold": 0.7,
-    "rejection_threshold": 0.6
-}
\ No newline at end of file
+# Configuration des sources d'entrée (dossiers, archives, images scannées)
+INPUT_CONFIG = {
+    "pdf_extensions": [".pdf"],
+    "image_extensions": [".tif", ".tiff", ".jpg", ".jpeg", ".png"],
+    "archive_extensions": [".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz"],
+    # Dossier des membres extraits des TAR compressés (None = dossier temporaire du système)
+    "spill_dir": None,
+    # True: pré-analyse de tout le lot puis ordre longest-first;
+    # False: documents traités au fil du parcours (gros arbres, pas de liste complète)
+    "schedule": True
+}
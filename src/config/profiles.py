@@ -0,0 +1,37 @@
+from src.config.config import PERFORMANCE_CONFIG, PERFORMANCE_PROFILES
+
+
+def resolve_profile(name=None, profiles=None):
+    """
+    Réglages complets d'un profil de performance (PERFORMANCE_PROFILES)
+
+    Un profil personnalisé hérite de son profil "extends" et ne redéfinit
+    que les clés qui changent; lève ValueError pour un profil inconnu,
+    une clé inconnue ou un héritage circulaire.
+    """
+    profiles = profiles or PERFORMANCE_PROFILES
+    name = name or PERFORMANCE_CONFIG['profile']
+
+    chain = []
+    while name is not None:
+        if name not in profiles:
+            raise ValueError(f"Profil de performance inconnu: {name} (choix: {', '.join(profiles)})")
+        if name in chain:
+            raise ValueError(f"Héritage circulaire des profils: {' -> '.join(chain + [name])}")
+        chain.append(name)
+        name = profiles[name].get('extends')
+
+    settings = {}
+    for base in reversed(chain):
+        settings.update({k: v for k, v in profiles[base].items() if k != 'extends'})
+
+    # Les clés attendues sont celles du profil historique
+    expected = set(PERFORMANCE_PROFILES['balanced'])
+    unknown, missing = set(settings) - expected, expected - set(settings)
+    if unknown or missing:
+        raise ValueError(
+            f"Profil {chain[0]}: clé(s) inconnue(s) {sorted(unknown)}, manquante(s) {sorted(missing)}"
+        )
+
+    settings['name'] = chain[0]
+    return settings
@@ -0,0 +1,197 @@
+import hashlib
+import re
+import threading
+import time
+from pathlib import Path
+import logging
+
+import yaml
+
+from src.config.config import CLASSES, RULES_CONFIG
+
+
+# Seuils de fusion attendus dans tout fichier de règles
+FUSION_KEYS = (
+    'perfect_agreement_threshold', 'strong_cv_threshold', 'strong_nlp_threshold',
+    'template_validation_threshold', 'rejection_threshold'
+)
+
+
+class CompiledRules:
+    """Jeu de règles validé et compilé (immuable, partagé entre threads)"""
+
+    def __init__(self, keywords, template_features, fusion, version):
+        self.version = version
+        self.keywords = {cls: tuple(keywords[cls]) for cls in CLASSES}
+        self.template_features = template_features
+        self.fusion = dict(fusion)
+
+        # Une seule regex pour tous les mots-clés (les plus longs d'abord),
+        # puis correspondance mot-clé -> [(classe, mot-clé original)]
+        self.keyword_index = {}
+        for cls in CLASSES:
+            for keyword in self.keywords[cls]:
+                self.keyword_index.setdefault(keyword.lower(), []).append((cls, keyword))
+
+        alternatives = sorted(self.keyword_index, key=len, reverse=True)
+        self.keyword_regex = re.compile(
+            r'\b(' + '|'.join(re.escape(k) for k in alternatives) + r')\b'
+        ) if alternatives else None
+
+        # Gabarits: tuples (plage ratio, photo, table, plage densité OpenCV,
+        # plage densité des boîtes de mots, poids hors densité)
+        self.templates = {}
+        for cls, template in template_features.items():
+            aspect = tuple(template['aspect_ratio']) if 'aspect_ratio' in template else None
+            density = tuple(template['text_density']) if 'text_density' in template else None
+            word_density = tuple(template['word_text_density']) \
+                if 'word_text_density' in template else None
+            has_photo = bool(template.get('has_photo', False))
+            has_table = bool(template.get('has_table', False))
+            base_weight = (
+                (0.3 if aspect else 0.0) + (0.3 if has_photo else 0.0)
+                + (0.2 if has_table else 0.0)
+            )
+            self.templates[cls] = (aspect, has_photo, has_table, density, word_density, base_weight)
+
+
+def validate_rules(data):
+    """Vérifie la structure d'un fichier de règles (lève ValueError)"""
+    if not isinstance(data, dict):
+        raise ValueError("Le fichier de règles doit contenir un dictionnaire")
+
+    keywords = data.get('keywords', {})
+    for cls in CLASSES:
+        if not isinstance(keywords.get(cls), list) or \
+                not all(isinstance(k, str) and k for k in keywords[cls]):
+            raise ValueError(f"keywords.{cls}: liste de chaînes attendue")
+    unknown = set(keywords) - set(CLASSES)
+    if unknown:
+        raise ValueError(f"keywords: classes inconnues {sorted(unknown)}")
+
+    templates = data.get('template_features', {})
+    unknown = set(templates) - set(CLASSES)
+    if unknown:
+        raise ValueError(f"template_features: classes inconnues {sorted(unknown)}")
+    for cls, template in templates.items():
+        for key in ('aspect_ratio', 'text_density', 'word_text_density'):
+            if key in template:
+                bounds = template[key]
+                if not (isinstance(bounds, (list, tuple)) and len(bounds) == 2
+                        and bounds[0] <= bounds[1]):
+                    raise ValueError(f"template_features.{cls}.{key}: plage [min, max] attendue")
+
+    fusion = data.get('fusion', {})
+    for key in FUSION_KEYS:
+        value = fusion.get(key)
+        if not isinstance(value, (int, float)) or not 0.0 <= value <= 1.0:
+            raise ValueError(f"fusion.{key}: nombre entre 0 et 1 attendu")
+
+
+def compile_rules(data, version):
+    """Valide puis compile un dictionnaire de règles"""
+    validate_rules(data)
+    return CompiledRules(
+        data['keywords'], data.get('template_features', {}), data['fusion'], version
+    )
+
+
+def read_rules(path):
+    """Lit, valide et compile un fichier de règles YAML (lève une exception si invalide)"""
+    content = Path(path).read_bytes()
+    data = yaml.safe_load(content)
+    digest = hashlib.sha256(content).hexdigest()[:8]
+    version = f"{data.get('version', 0)}+{digest}" if isinstance(data, dict) else digest
+    return compile_rules(data, version)
+
+
+_builtin = None
+_builtin_lock = threading.Lock()
+
+
+def builtin_rules():
+    """Règles par défaut: le rules.yaml livré avec le code (RULES_CONFIG['builtin_path'])"""
+    global _builtin
+    with _builtin_lock:
+        if _builtin is None:
+            _builtin = read_rules(RULES_CONFIG['builtin_path'])
+        return _builtin
+
+
+class RuleStore:
+    """
+    Règles chargées depuis un fichier YAML et rechargées à chaud
+
+    Le fichier est surveillé (mtime) au plus toutes les check_interval
+    secondes. Un nouveau jeu n'est publié qu'une fois validé et compilé:
+    le remplacement est un simple échange de référence, donc atomique pour
+    les lecteurs. En cas d'erreur, les règles précédentes restent actives.
+    """
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path=None, check_interval=None):
+        self.path = Path(path) if path is not None else Path(RULES_CONFIG['path'])
+        self.check_interval = check_interval if check_interval is not None \
+            else RULES_CONFIG['check_interval']
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._mtime = None
+        self._last_check = 0.0
+        self._rules = builtin_rules()
+        self.reload()
+
+    @classmethod
+    def default(cls):
+        """Instance partagée par les composants créés sans RuleStore explicite"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def subscribe(self, callback):
+        """Appelle callback(rules) à chaque nouveau jeu de règles publié"""
+        self._listeners.append(callback)
+
+    def current(self):
+        """Règles en vigueur (rechargement si le fichier a changé)"""
+        if self.check_interval >= 0 and \
+                time.monotonic() - self._last_check >= self.check_interval:
+            self.reload()
+        return self._rules
+
+    def reload(self, force=False):
+        """Recharge le fichier s'il a été modifié"""
+        with self._lock:
+            self._last_check = time.monotonic()
+
+            try:
+                mtime = self.path.stat().st_mtime_ns
+            except OSError:
+                return self._rules
+
+            if mtime == self._mtime and not force:
+                return self._rules
+
+            try:
+                rules = read_rules(self.path)
+            except Exception as e:
+                self._mtime = mtime
+                self.logger.error(f"❌ Règles invalides ({self.path}), conservation de la version "
+                                  f"{self._rules.version}: {e}")
+                return self._rules
+
+            self._mtime = mtime
+            self._rules = rules
+            self.logger.info(f"✅ Règles chargées: {self.path.name} (version {rules.version})")
+
+            # Dérivés des règles (ex. vocabulaire --user-words de Tesseract)
+            for callback in self._listeners:
+                try:
+                    callback(rules)
+                except Exception as e:
+                    self.logger.error(f"❌ Mise à jour après rechargement des règles: {e}")
+            return rules
@@ -0,0 +1,84 @@
+import torch
+import torch.nn as nn
+import torchvision.models as models
+
+
+class TinyDocCNN(nn.Module):
+    """
+    Petit CNN pour la mise en page (~0.1 GFLOP à 224x224)
+
+    Suffisant pour séparer quelques classes de documents à la structure
+    très différente; entraîné uniquement sur nos pages.
+    """
+
+    def __init__(self, num_classes=1000, width=16):
+        super().__init__()
+
+        def block(c_in, c_out):
+            return nn.Sequential(
+                nn.Conv2d(c_in, c_out, 3, stride=2, padding=1, bias=False),
+                nn.BatchNorm2d(c_out),
+                nn.ReLU(inplace=True)
+            )
+
+        self.features = nn.Sequential(
+            block(3, width),               # 112
+            block(width, width * 2),       # 56
+            block(width * 2, width * 4),   # 28
+            block(width * 4, width * 8),   # 14
+            block(width * 8, width * 8),   # 7
+        )
+        self.pool = nn.AdaptiveAvgPool2d(1)
+        self.classifier = nn.Linear(width * 8, num_classes)
+
+    def forward(self, x):
+        x = self.pool(self.features(x)).flatten(1)
+        return self.classifier(x)
+
+
+# nom -> (constructeur torchvision/local, poids ImageNet disponibles)
+BACKBONES = {
+    "resnet50": (models.resnet50, True),
+    "resnet18": (models.resnet18, True),
+    "mobilenet_v3_small": (models.mobilenet_v3_small, True),
+    "mobilenet_v3_large": (models.mobilenet_v3_large, True),
+    "tiny_cnn": (TinyDocCNN, False),
+}
+
+
+def build_backbone(name, num_classes=None):
+    """Construit un backbone (sans poids) et remplace sa tête si num_classes est fourni"""
+    if name not in BACKBONES:
+        raise ValueError(f"Backbone inconnu: {name} (choix: {', '.join(BACKBONES)})")
+
+    model = BACKBONES[name][0]()
+
+    if num_classes is not None:
+        replace_head(model, num_classes)
+
+    return model
+
+
+def replace_head(model, num_classes):
+    """Remplace la couche de classification finale par num_classes sorties"""
+    if hasattr(model, 'fc'):                         # ResNet
+        model.fc = nn.Linear(model.fc.in_features, num_classes)
+    elif isinstance(model, TinyDocCNN):
+        model.classifier = nn.Linear(model.classifier.in_features, num_classes)
+    else:                                            # MobileNetV3
+        last = model.classifier[-1]
+        model.classifier[-1] = nn.Linear(last.in_features, num_classes)
+    return model
+
+
+def has_pretrained_weights(name):
+    """Vrai si des poids ImageNet existent pour ce backbone"""
+    return BACKBONES[name][1]
+
+
+def download_pretrained(name):
+    """Télécharge un backbone avec ses poids ImageNet (nécessite internet)"""
+    constructor, pretrained = BACKBONES[name]
+    if not pretrained:
+        raise ValueError(f"Pas de poids pré-entraînés pour {name}")
+    return constructor(pretrained=True)
@@ -0,0 +1,27 @@
+import numpy as np
+import logging
+
+from src.config.config import CLASSES, CV_CONFIG
+
+
+class HybridCVClassifier:
+    """Classifieur CV par CNN entraîné sur nos documents (backbone configurable)"""
+    
+    def __init__(self, model_manager, pdf_processor, backbone=None):
+        self.logger = logging.getLogger(__name__)
+        self.backbone = backbone or CV_CONFIG['model_name']
+        self.pdf_processor = pdf_processor
+        
+        # Backend torch ou ONNX selon INFERENCE_CONFIG
+        self.runner = model_manager.load_backend(f"{self.backbone}_documents")
+    
+    def predict_proba(self, image):
+        """Probabilités par classe pour une page"""
+        tensor = self.pdf_processor.preprocess_for_cv(image, CV_CONFIG['image_size'])
+        logits = self.runner.run({'pixel_values': tensor[np.newaxis].astype(np.float32)})[0]
+        
+        # Softmax numériquement stable
+        exp = np.exp(logits - logits.max())
+        probabilities = exp / exp.sum()
+        
+        return {cls: float(p) for cls, p in zip(CLASSES, probabilities)}
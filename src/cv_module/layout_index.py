@@ -0,0 +1,164 @@
+import cv2
+import numpy as np
+from pathlib import Path
+import logging
+
+from src.config.config import CLASSES, LAYOUT_INDEX_CONFIG
+
+
+def compute_layout_fingerprint(gray, work_width=None, grid=None):
+    """
+    Empreinte de mise en page d'une page en niveaux de gris
+
+    Concatène une grille de densité d'encre et les profils des lignes
+    horizontales/verticales, le tout calculé sur une version réduite de la
+    page. Le vecteur est centré et normalisé: le produit scalaire entre deux
+    empreintes est une corrélation.
+
+    Returns:
+        (vecteur float32, ratio hauteur/largeur)
+    """
+    work_width = work_width or LAYOUT_INDEX_CONFIG['work_width']
+    rows, cols = grid or LAYOUT_INDEX_CONFIG['grid']
+
+    h, w = gray.shape[:2]
+    work_height = max(1, int(round(h * work_width / w)))
+    small = cv2.resize(gray, (work_width, work_height), interpolation=cv2.INTER_AREA)
+
+    # Carte d'encre (texte, traits, cadres)
+    _, ink = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+    # Densité d'encre par cellule de la grille
+    density = cv2.resize(ink, (cols, rows), interpolation=cv2.INTER_AREA)
+
+    # Traits longs: ouverture morphologique horizontale et verticale
+    h_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(1, work_width // 8), 1))
+    v_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(1, work_height // 8)))
+    h_lines = cv2.morphologyEx(ink, cv2.MORPH_OPEN, h_kernel)
+    v_lines = cv2.morphologyEx(ink, cv2.MORPH_OPEN, v_kernel)
+
+    h_profile = cv2.resize(
+        h_lines.mean(axis=1, dtype=np.float32).reshape(-1, 1), (1, rows),
+        interpolation=cv2.INTER_AREA
+    )
+    v_profile = cv2.resize(
+        v_lines.mean(axis=0, dtype=np.float32).reshape(1, -1), (cols, 1),
+        interpolation=cv2.INTER_AREA
+    )
+
+    vector = np.concatenate([
+        density.ravel().astype(np.float32),
+        h_profile.ravel(),
+        v_profile.ravel()
+    ]) / 255.0
+
+    vector -= vector.mean()
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+
+    return vector.astype(np.float32), h / w if w > 0 else 0.0
+
+
+class LayoutFingerprintIndex:
+    """Index d'empreintes de mise en page étiquetées (recherche des plus proches voisins)"""
+
+    def __init__(self, vectors=None, labels=None, aspects=None, classes=None):
+        self.classes = list(classes or CLASSES)
+        self.vectors = np.asarray(vectors, dtype=np.float32) if vectors is not None else None
+        self.labels = np.asarray(labels, dtype=np.int32) if labels is not None else None
+        self.aspects = np.asarray(aspects, dtype=np.float32) if aspects is not None else None
+        self.logger = logging.getLogger(__name__)
+
+    def __len__(self):
+        return 0 if self.vectors is None else len(self.vectors)
+
+    @classmethod
+    def build(cls, fingerprints, class_names):
+        """Construit l'index à partir de [(vecteur, ratio)] et des classes associées"""
+        classes = list(CLASSES)
+        vectors = np.stack([vector for vector, _ in fingerprints])
+        aspects = np.array([aspect for _, aspect in fingerprints], dtype=np.float32)
+        labels = np.array([classes.index(name) for name in class_names], dtype=np.int32)
+        return cls(vectors, labels, aspects, classes)
+
+    def save(self, path):
+        """Sauvegarde l'index (npz compressé)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            vectors=self.vectors,
+            labels=self.labels,
+            aspects=self.aspects,
+            classes=np.array(self.classes),
+            grid=np.array(LAYOUT_INDEX_CONFIG['grid']),
+            work_width=np.array(LAYOUT_INDEX_CONFIG['work_width'])
+        )
+        self.logger.info(f"✅ Index de gabarits sauvegardé: {path} ({len(self)} pages)")
+
+    @classmethod
+    def load(cls, path):
+        """Charge un index sauvegardé par save()"""
+        with np.load(path) as data:
+            grid = tuple(int(v) for v in data['grid'])
+            if grid != tuple(LAYOUT_INDEX_CONFIG['grid']) or \
+                    int(data['work_width']) != LAYOUT_INDEX_CONFIG['work_width']:
+                raise ValueError(
+                    f"Index de gabarits incompatible avec la configuration: {path}"
+                )
+            return cls(
+                data['vectors'], data['labels'], data['aspects'],
+                [str(c) for c in data['classes']]
+            )
+
+    def query(self, vector, aspect_ratio, k=None):
+        """
+        Recherche vectorisée des k plus proches voisins
+
+        Returns:
+            dict (predicted_class, agreement, similarity, neighbours) ou None
+        """
+        if not len(self):
+            return None
+
+        k = min(k or LAYOUT_INDEX_CONFIG['k'], len(self))
+
+        similarities = self.vectors @ vector
+        # Voisins au format trop différent écartés (carte vs A4)
+        aspect_gap = np.abs(self.aspects - aspect_ratio)
+        similarities[aspect_gap > LAYOUT_INDEX_CONFIG['aspect_tolerance']] = -np.inf
+
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.isfinite(similarities[top])]
+        if len(top) == 0:
+            return None
+        top = top[np.argsort(-similarities[top])]
+
+        # Distance cosinus: une page identique à une page indexée tranche seule,
+        # sinon les votes sont pondérés par l'inverse de la distance (des
+        # voisins plus éloignés ne l'emportent pas par leur seul nombre)
+        distances = 1.0 - np.clip(similarities[top], 0.0, 1.0)
+        if distances[0] <= LAYOUT_INDEX_CONFIG['exact_distance']:
+            return {
+                'predicted_class': self.classes[self.labels[top[0]]],
+                'agreement': 1.0,
+                'similarity': float(similarities[top[0]]),
+                'neighbours': int(len(top))
+            }
+
+        weights = 1.0 / (distances + LAYOUT_INDEX_CONFIG['exact_distance'])
+        weights[similarities[top] <= 0] = 0.0
+        votes = np.bincount(self.labels[top], weights=weights, minlength=len(self.classes))
+        if votes.sum() <= 0:
+            return None
+
+        best = int(np.argmax(votes))
+        best_similarity = float(similarities[top][self.labels[top] == best].max())
+
+        return {
+            'predicted_class': self.classes[best],
+            'agreement': float(votes[best] / votes.sum()),
+            'similarity': best_similarity,
+            'neighbours': int(len(top))
+        }
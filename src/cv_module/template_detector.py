@@ -1,15 +1,59 @@
 import cv2
 import numpy as np
-from src.config.config import TEMPLATE_FEATURES
+from pathlib import Path
+import logging
+from src.config.config import LAYOUT_INDEX_CONFIG
+from src.config.rules import RuleStore
+from src.config.profiles import resolve_profile
+from src.cv_module.layout_index import LayoutFingerprintIndex, compute_layout_fingerprint
 
 class TemplateDetector:
     """Détecteur de features structurelles pour gabarits"""
     
-    def __init__(self):
+    def __init__(self, layout_index_path=None, rule_store=None, performance=None):
+        self.logger = logging.getLogger(__name__)
+        self.rule_store = rule_store or RuleStore.default()
+        
+        # Paramètres des détecteurs (pyramide de visages, Hough) du profil de performance
+        self.performance = performance or resolve_profile()
+        
         # Chargement du détecteur de visages pour photos
         self.face_cascade = cv2.CascadeClassifier(
             cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
         )
+        
+        # Index d'empreintes de mise en page (optionnel, construit hors ligne)
+        self.layout_index = None
+        if layout_index_path is not None and Path(layout_index_path).exists():
+            self.load_layout_index(layout_index_path)
+    
+    def load_layout_index(self, path):
+        """Charge l'index d'empreintes construit par scripts/build_layout_index.py"""
+        try:
+            self.layout_index = LayoutFingerprintIndex.load(path)
+            self.logger.info(f"✅ Index de gabarits chargé: {len(self.layout_index)} pages")
+        except Exception as e:
+            self.logger.error(f"❌ Erreur chargement index de gabarits: {e}")
+            self.layout_index = None
+    
+    def lookup_layout(self, image):
+        """Recherche la page la plus proche dans l'index d'empreintes (avant tout OCR)"""
+        if self.layout_index is None:
+            return None
+        
+        if len(image.shape) == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        
+        vector, aspect_ratio = compute_layout_fingerprint(image)
+        match = self.layout_index.query(vector, aspect_ratio)
+        
+        if match is not None:
+            match['short_circuit'] = (
+                match['similarity'] >= LAYOUT_INDEX_CONFIG['short_circuit_similarity']
+                and match['agreement'] >= LAYOUT_INDEX_CONFIG['short_circuit_agreement']
+            )
+        
+        return match
     
     def compute_aspect_ratio(self, image):
         """Calcule le ratio hauteur/largeur"""
@@ -24,7 +68,10 @@ class TemplateDetector:
             gray = image
         
         faces = self.face_cascade.detectMultiScale(
-            gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30)
+            gray,
+            scaleFactor=self.performance['photo_scale_factor'],
+            minNeighbors=self.performance['photo_min_neighbors'],
+            minSize=(30, 30)
         )
         
         return len(faces) > 0, len(faces)
@@ -36,17 +83,22 @@ class TemplateDetector:
         else:
             gray = image
         
+        # Seuils en pixels de la page rendue (proportionnels au dpi du profil)
+        threshold = self.performance['hough_threshold']
+        min_length = self.performance['hough_min_line_length']
+        max_gap = self.performance['hough_max_line_gap']
+        
         # Détection de lignes horizontales
         edges = cv2.Canny(gray, 50, 150, apertureSize=3)
         lines_h = cv2.HoughLinesP(
-            edges, 1, np.pi/180, 100, 
-            minLineLength=100, maxLineGap=10
+            edges, 1, np.pi/180, threshold, 
+            minLineLength=min_length, maxLineGap=max_gap
         )
         
         # Détection de lignes verticales
         lines_v = cv2.HoughLinesP(
-            edges, 1, np.pi/2, 100,
-            minLineLength=100, maxLineGap=10
+            edges, 1, np.pi/2, threshold,
+            minLineLength=min_length, maxLineGap=max_gap
         )
         
         h_count = len(lines_h) if lines_h is not None else 0
@@ -83,69 +135,91 @@ class TemplateDetector:
             gray = image
         
         # Recherche de zones avec texture particulière (signature manuscrite)
-        # Utilisation de la variance locale
-        kernel_size = 15
-        mean = cv2.blur(gray, (kernel_size, kernel_size))
-        sqr_mean = cv2.blur(gray**2, (kernel_size, kernel_size))
-        variance = sqr_mean - mean**2
+        # Utilisation de la variance locale, calculée en float32 dans deux
+        # buffers seulement (moyenne et moyenne des carrés) réutilisés sur place
+        kernel_size = (15, 15)
+        mean = cv2.boxFilter(gray, cv2.CV_32F, kernel_size)
+        variance = cv2.sqrBoxFilter(gray, cv2.CV_32F, kernel_size)
+        np.multiply(mean, mean, out=mean)
+        np.subtract(variance, mean, out=variance)
+        del mean
         
         # Zones à forte variance = potentiellement manuscrites
         threshold = np.percentile(variance, 95)
-        signature_mask = variance > threshold
-        
-        signature_ratio = np.sum(signature_mask) / signature_mask.size
+        signature_ratio = np.count_nonzero(variance > threshold) / variance.size
         
         return signature_ratio > 0.05, signature_ratio
     
-    def extract_features(self, image):
-        """Extrait toutes les features structurelles"""
+    def extract_features(self, image, layout=None):
+        """
+        Extrait toutes les features structurelles
+        
+        layout: features déjà dérivées des boîtes de mots OCR
+        (WordBoxes.layout_features); les passes OpenCV correspondantes
+        (tableau, densité, signature) sont alors sautées.
+        """
+        # Conversion en niveaux de gris une seule fois pour tous les détecteurs
+        if len(image.shape) == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        
+        has_photo, photo_count = self.detect_photo(image)
+        
         features = {
             'aspect_ratio': self.compute_aspect_ratio(image),
-            'has_photo': self.detect_photo(image)[0],
-            'photo_count': self.detect_photo(image)[1],
-            'has_table': self.detect_table_structure(image)[0],
-            'horizontal_lines': self.detect_table_structure(image)[1],
-            'vertical_lines': self.detect_table_structure(image)[2],
-            'text_density': self.compute_text_density(image),
-            'has_signature': self.detect_signature_zone(image)[0],
-            'signature_ratio': self.detect_signature_zone(image)[1]
+            'has_photo': has_photo,
+            'photo_count': photo_count,
+            'word_layout': False
         }
         
+        if layout is not None:
+            features.update(layout)
+            return features
+        
+        has_table, h_count, v_count = self.detect_table_structure(image)
+        has_signature, signature_ratio = self.detect_signature_zone(image)
+        
+        features.update({
+            'has_table': has_table,
+            'horizontal_lines': h_count,
+            'vertical_lines': v_count,
+            'text_density': self.compute_text_density(image),
+            'has_signature': has_signature,
+            'signature_ratio': signature_ratio
+        })
+        
         return features
     
-    def match_template(self, features, class_name):
+    def match_template(self, features, class_name, rules=None):
         """Calcule le score de correspondance avec un gabarit"""
-        if class_name not in TEMPLATE_FEATURES:
+        rules = rules or self.rule_store.current()
+        if class_name not in rules.templates:
             return 0.0
         
-        template = TEMPLATE_FEATURES[class_name]
+        aspect_range, has_photo, has_table, density_range, word_density_range, base_weight = \
+            rules.templates[class_name]
         score = 0.0
-        total_weight = 0.0
+        
+        # Densité issue des boîtes de mots: plage propre (surface des mots, pas l'encre)
+        if features.get('word_layout'):
+            density_range = word_density_range
+        total_weight = base_weight + (0.2 if density_range is not None else 0.0)
         
         # Vérification aspect ratio
-        if 'aspect_ratio' in template:
-            min_r, max_r = template['aspect_ratio']
-            if min_r <= features['aspect_ratio'] <= max_r:
+        if aspect_range is not None:
+            if aspect_range[0] <= features['aspect_ratio'] <= aspect_range[1]:
                 score += 0.3
-            total_weight += 0.3
         
         # Vérification photo
-        if template.get('has_photo', False):
-            if features['has_photo']:
-                score += 0.3
-            total_weight += 0.3
+        if has_photo and features['has_photo']:
+            score += 0.3
         
         # Vérification table
-        if template.get('has_table', False):
-            if features['has_table']:
-                score += 0.2
-            total_weight += 0.2
+        if has_table and features['has_table']:
+            score += 0.2
         
         # Vérification densité texte
-        if 'text_density' in template:
-            min_d, max_d = template['text_density']
-            if min_d <= features['text_density'] <= max_d:
+        if density_range is not None:
+            if density_range[0] <= features['text_density'] <= density_range[1]:
                 score += 0.2
-            total_weight += 0.2
         
-        return score / total_weight if total_weight > 0 else 0.0
\ No newline at end of file
+        return score / total_weight if total_weight > 0 else 0.0
@@ -1,28 +1,36 @@
 import numpy as np
-from src.config.config import FUSION_CONFIG, CLASSES
+from src.config.config import CLASSES
+from src.config.rules import RuleStore
 import logging
 
 class MultimodalFusion:
     """Fusion intelligente des prédictions CV et NLP"""
     
-    def __init__(self):
-        self.config = FUSION_CONFIG
+    def __init__(self, rule_store=None):
+        self.rule_store = rule_store or RuleStore.default()
         self.logger = logging.getLogger(__name__)
     
-    def perfect_agreement(self, cv_pred, nlp_pred, cv_conf, nlp_conf):
+    @property
+    def config(self):
+        """Seuils de fusion des règles en vigueur"""
+        return self.rule_store.current().fusion
+    
+    def perfect_agreement(self, cv_pred, nlp_pred, cv_conf, nlp_conf, config=None):
         """Vérifie si CV et NLP sont d'accord"""
+        config = config or self.config
         if cv_pred == nlp_pred:
-            threshold = self.config['perfect_agreement_threshold']
+            threshold = config['perfect_agreement_threshold']
             if cv_conf > threshold and nlp_conf > threshold:
                 avg_conf = (cv_conf + nlp_conf) / 2
                 return True, cv_pred, avg_conf
         
         return False, None, 0.0
     
-    def strong_cv_decision(self, cv_pred, cv_conf, template_score):
+    def strong_cv_decision(self, cv_pred, cv_conf, template_score, config=None):
         """CV très confiant + gabarits valident"""
-        cv_threshold = self.config['strong_cv_threshold']
-        template_threshold = self.config['template_validation_threshold']
+        config = config or self.config
+        cv_threshold = config['strong_cv_threshold']
+        template_threshold = config['template_validation_threshold']
         
         if cv_conf > cv_threshold and template_score > template_threshold:
             # Confiance combinée
@@ -31,9 +39,10 @@ class MultimodalFusion:
         
         return False, None, 0.0
     
-    def strong_nlp_decision(self, nlp_pred, nlp_conf, pattern_strength):
+    def strong_nlp_decision(self, nlp_pred, nlp_conf, pattern_strength, config=None):
         """NLP très confiant + motifs textuels forts"""
-        nlp_threshold = self.config['strong_nlp_threshold']
+        config = config or self.config
+        nlp_threshold = config['strong_nlp_threshold']
         
         if nlp_conf > nlp_threshold and pattern_strength > 0.7:
             combined_conf = (nlp_conf * 0.8 + pattern_strength * 0.2)
@@ -93,7 +102,7 @@ class MultimodalFusion:
         
         return len(violations) == 0, violations
     
-    def fuse(self, cv_result, nlp_result, template_features, text_patterns):
+    def fuse(self, cv_result, nlp_result, template_features, text_patterns, rules=None):
         """
         Fonction principale de fusion
         
@@ -102,6 +111,7 @@ class MultimodalFusion:
             nlp_result: (predicted_class, confidence, pattern_strength)
             template_features: dict des features de gabarits
             text_patterns: dict des patterns textuels extraits
+            rules: règles compilées à utiliser (par défaut celles en vigueur)
         
         Returns:
             (final_class, final_confidence, decision_path, should_reject)
@@ -110,11 +120,16 @@ class MultimodalFusion:
         cv_pred, cv_conf = cv_result
         nlp_pred, nlp_conf, pattern_strength = nlp_result
         
+        # Instantané des seuils: une décision n'utilise qu'une seule version des règles
+        config = (rules or self.rule_store.current()).fusion
+        
         # Score du gabarit pour la classe prédite par CV
         template_score = template_features.get('template_scores', {}).get(cv_pred, 0.0)
         
         # 1. Accord parfait
-        is_perfect, pred, conf = self.perfect_agreement(cv_pred, nlp_pred, cv_conf, nlp_conf)
+        is_perfect, pred, conf = self.perfect_agreement(
+            cv_pred, nlp_pred, cv_conf, nlp_conf, config
+        )
         if is_perfect:
             valid, violations = self.apply_business_rules(pred, template_features, text_patterns)
             
@@ -125,7 +140,9 @@ class MultimodalFusion:
                 return pred, conf * 0.7, "perfect_agreement_with_violations", False
         
         # 2. CV fort + gabarits
-        is_strong_cv, pred, conf = self.strong_cv_decision(cv_pred, cv_conf, template_score)
+        is_strong_cv, pred, conf = self.strong_cv_decision(
+            cv_pred, cv_conf, template_score, config
+        )
         if is_strong_cv:
             valid, violations = self.apply_business_rules(pred, template_features, text_patterns)
             
@@ -136,7 +153,9 @@ class MultimodalFusion:
                 return pred, conf * 0.6, "strong_cv_with_violations", False
         
         # 3. NLP fort + patterns
-        is_strong_nlp, pred, conf = self.strong_nlp_decision(nlp_pred, nlp_conf, pattern_strength)
+        is_strong_nlp, pred, conf = self.strong_nlp_decision(
+            nlp_pred, nlp_conf, pattern_strength, config
+        )
         if is_strong_nlp:
             valid, violations = self.apply_business_rules(pred, template_features, text_patterns)
             
@@ -152,7 +171,7 @@ class MultimodalFusion:
         )
         
         # 5. Décision de rejet
-        rejection_threshold = self.config['rejection_threshold']
+        rejection_threshold = config['rejection_threshold']
         should_reject = conf < rejection_threshold
         
         if should_reject:
@@ -1,25 +1,124 @@
+import os
+import re
+import threading
+from pathlib import Path
 import pytesseract
 import cv2
 import numpy as np
 import logging
+from src.config.config import OCR_CONFIG, OCR_PROFILES
+from src.config.rules import builtin_rules
+from src.utils.watchdog import StageTimeout
+from src.nlp_module.word_boxes import WordBoxes
+
+
+def write_user_words(path, keywords):
+    """
+    Écrit un fichier --user-words Tesseract à partir des mots-clés par classe
+    
+    Un mot par ligne (les expressions sont découpées), en minuscules,
+    capitalisé et en majuscules comme sur les en-têtes de documents.
+    """
+    words = set()
+    for class_keywords in keywords.values():
+        for keyword in class_keywords:
+            for word in keyword.split():
+                if len(word) > 1:
+                    words.update({word.lower(), word.capitalize(), word.upper()})
+    
+    # Remplacement atomique: un Tesseract en cours ne lit jamais un fichier partiel
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text('\n'.join(sorted(words)) + '\n', encoding='utf-8')
+    os.replace(tmp_path, path)
+    return path
+
 
 class OCRExtractor:
     """Extraction de texte via Tesseract OCR"""
     
-    def __init__(self, lang='fra'):
-        self.lang = lang
+    def __init__(self, lang=None, profile=None, keywords=None, rule_store=None):
+        """
+        keywords: mots-clés du fichier --user-words (défaut: règles livrées, rules.yaml)
+        rule_store: RuleStore dont les mots-clés alimentent --user-words,
+                    régénéré à chaque rechargement des règles
+        """
+        self.lang = lang or OCR_CONFIG['lang']
         self.logger = logging.getLogger(__name__)
         
-        # Configuration Tesseract
-        self.config = '--oem 3 --psm 6'  # LSTM + assume uniform block of text
+        # Options Tesseract construites une fois par profil
+        self._profile_configs = {}
+        self._lock = threading.Lock()
+        self._user_words_written = False
+        
+        if rule_store is not None:
+            keywords = rule_store.current().keywords
+            rule_store.subscribe(self.update_keywords)
+        self.keywords = keywords or builtin_rules().keywords
+        
+        # Configuration Tesseract du profil choisi pour ce run
+        self.profile = profile or OCR_CONFIG['profile']
+        self.config = self.profile_config(self.profile)
     
-    def extract_text(self, image):
-        """Extrait le texte d'une image"""
+    def profile_config(self, name, psm=None):
+        """
+        Options Tesseract d'un profil nommé (OCR_PROFILES)
+        
+        Args:
+            name: nom du profil
+            psm: mode de segmentation remplaçant celui du profil
+        """
+        key = (name, psm)
+        with self._lock:
+            if key in self._profile_configs:
+                return self._profile_configs[key]
+            
+            if name not in OCR_PROFILES:
+                raise ValueError(f"Profil OCR inconnu: {name} (choix: {', '.join(OCR_PROFILES)})")
+            profile = OCR_PROFILES[name]
+            
+            options = [f"--oem {profile['oem']}", f"--psm {psm or profile['psm']}"]
+            
+            if profile.get('tessdata'):
+                tessdata_dir = OCR_CONFIG['tessdata_dirs'].get(profile['tessdata'])
+                if tessdata_dir:
+                    options.append(f"--tessdata-dir {tessdata_dir}")
+                else:
+                    self.logger.warning(
+                        f"⚠️ Modèles tessdata_{profile['tessdata']} non configurés "
+                        f"(profil {name}): tessdata installé utilisé"
+                    )
+            
+            if profile.get('user_words'):
+                user_words = OCR_CONFIG['user_words_file']
+                if not self._user_words_written:
+                    write_user_words(user_words, self.keywords)
+                    self._user_words_written = True
+                options.append(f"--user-words {user_words}")
+            
+            if profile.get('whitelist'):
+                options.append(f"-c tessedit_char_whitelist={profile['whitelist']}")
+            
+            config = ' '.join(options)
+            self._profile_configs[key] = config
+            return config
+    
+    def update_keywords(self, rules):
+        """Nouveaux mots-clés (règles rechargées): fichier --user-words régénéré s'il est utilisé"""
+        with self._lock:
+            self.keywords = rules.keywords
+            if self._user_words_written:
+                write_user_words(OCR_CONFIG['user_words_file'], self.keywords)
+                self.logger.info(f"🔄 Vocabulaire Tesseract régénéré (règles {rules.version})")
+    
+    def extract_text(self, image, config=None, lang=None):
+        """Extrait le texte d'une image (config Tesseract et langue optionnelles)"""
         try:
             text = pytesseract.image_to_string(
                 image, 
-                lang=self.lang, 
-                config=self.config
+                lang=lang or self.lang, 
+                config=config or self.config
             )
             
             self.logger.info(f"✅ Texte extrait: {len(text)} caractères")
@@ -29,43 +128,64 @@ class OCRExtractor:
             self.logger.error(f"❌ Erreur OCR: {e}")
             return ""
     
-    def extract_with_confidence(self, image):
-        """Extrait le texte avec scores de confiance"""
+    def extract_words(self, image, config=None, timeout=0, lang=None):
+        """
+        Mots reconnus avec leur géométrie et leur confiance (WordBoxes)
+        
+        timeout: secondes avant d'interrompre Tesseract (0 = illimité);
+        un dépassement lève StageTimeout au lieu de retourner un résultat vide
+        lang: modèles Tesseract de cet appel (défaut: langue de l'extracteur)
+        """
         try:
             data = pytesseract.image_to_data(
                 image, 
-                lang=self.lang, 
-                config=self.config,
-                output_type=pytesseract.Output.DICT
+                lang=lang or self.lang, 
+                config=config or self.config,
+                output_type=pytesseract.Output.DICT,
+                timeout=timeout
             )
-            
-            # Filtrer les mots avec confiance > 60
-            text_parts = []
-            confidences = []
-            
-            for i, conf in enumerate(data['conf']):
-                if int(conf) > 60:
-                    text = data['text'][i]
-                    if text.strip():
-                        text_parts.append(text)
-                        confidences.append(int(conf))
-            
-            full_text = ' '.join(text_parts)
-            avg_confidence = np.mean(confidences) if confidences else 0
-            
-            return full_text, avg_confidence / 100.0
+            return WordBoxes.from_tesseract(data, image.shape)
+        
+        except RuntimeError as e:
+            # pytesseract tue le processus et lève "Tesseract process timeout"
+            if timeout and 'timeout' in str(e).lower():
+                raise StageTimeout('ocr', timeout) from e
+            self.logger.error(f"❌ Erreur OCR avec confiance: {e}")
+            return WordBoxes.empty()
         
         except Exception as e:
             self.logger.error(f"❌ Erreur OCR avec confiance: {e}")
-            return "", 0.0
+            return WordBoxes.empty()
+    
+    def extract_with_confidence(self, image, config=None, timeout=0):
+        """
+        Extrait le texte avec scores de confiance (config Tesseract optionnelle)
+        
+        Seuls les mots de confiance > 60 sont retenus (voir extract_words
+        pour la géométrie des mots).
+        """
+        words = self.extract_words(image, config=config, timeout=timeout)
+        return words.text(), words.mean_confidence()
     
-    def extract_from_regions(self, image, regions):
-        """Extrait le texte de régions spécifiques"""
+    def extract_from_regions(self, image, regions, profile=None, lang=None):
+        """
+        Extrait le texte de régions spécifiques
+        
+        Args:
+            regions: liste de (x, y, w, h) ou (x, y, w, h, profil) pour
+                     choisir un profil par zone (ex. "amounts", "id")
+            profile: profil par défaut des régions (défaut: celui du run)
+            lang: modèles Tesseract des régions (ex. "ara" pour les zones arabes)
+        """
         texts = []
         
-        for x, y, w, h in regions:
+        for region in regions:
+            x, y, w, h = region[:4]
+            region_profile = region[4] if len(region) > 4 else profile
+            config = self.profile_config(region_profile) if region_profile else None
+            
             roi = image[y:y+h, x:x+w]
-            text = self.extract_text(roi)
+            text = self.extract_text(roi, config, lang)
             texts.append(text)
         
         return texts
@@ -1,20 +1,35 @@
 import re
 from collections import Counter
 import numpy as np
-from src.config.config import KEYWORDS, CLASSES
+from src.config.config import CLASSES
+from src.config.rules import RuleStore
+
+# Normalisation de l'arabe: voyelles brèves et tatweel supprimés, alifs unifiés
+# (les mots-clés arabes des règles sont écrits sous cette forme)
+ARABIC_DIACRITICS = re.compile(r'[\u064B-\u0652\u0640]')
+ARABIC_ALIFS = str.maketrans('أإآ', 'ااا')
 
 class PatternMatcher:
     """Classification par motifs sémantiques"""
     
-    def __init__(self):
-        self.keywords = KEYWORDS
+    def __init__(self, rule_store=None):
+        self.rule_store = rule_store or RuleStore.default()
         self.classes = CLASSES
     
+    @property
+    def keywords(self):
+        """Mots-clés par classe des règles en vigueur"""
+        return self.rule_store.current().keywords
+    
     def preprocess_text(self, text):
         """Nettoie et normalise le texte"""
         # Minuscules
         text = text.lower()
         
+        # Arabe (zones OCRisées avec le modèle arabe): avant la ponctuation,
+        # les voyelles brèves n'étant pas des caractères de mot
+        text = ARABIC_DIACRITICS.sub('', text).translate(ARABIC_ALIFS)
+        
         # Suppression de la ponctuation excessive
         text = re.sub(r'[^\w\s€°³]', ' ', text)
         
@@ -23,25 +38,27 @@ class PatternMatcher:
         
         return text.strip()
     
-    def extract_keywords(self, text):
+    def extract_keywords(self, text, rules=None):
         """Extrait les mots-clés trouvés par classe"""
+        rules = rules or self.rule_store.current()
         text = self.preprocess_text(text)
         
         found_keywords = {cls: [] for cls in self.classes}
+        if rules.keyword_regex is None:
+            return found_keywords
         
-        for cls in self.classes:
-            for keyword in self.keywords[cls]:
-                keyword_lower = keyword.lower()
-                # Compte les occurrences
-                count = len(re.findall(r'\b' + re.escape(keyword_lower) + r'\b', text))
-                if count > 0:
-                    found_keywords[cls].append((keyword, count))
+        # Un seul passage de la regex compilée pour tous les mots-clés
+        counts = Counter(rules.keyword_regex.findall(text))
+        
+        for keyword_lower, count in counts.items():
+            for cls, keyword in rules.keyword_index[keyword_lower]:
+                found_keywords[cls].append((keyword, count))
         
         return found_keywords
     
-    def compute_class_scores(self, text):
+    def compute_class_scores(self, text, rules=None):
         """Calcule un score pour chaque classe"""
-        found = self.extract_keywords(text)
+        found = self.extract_keywords(text, rules)
         
         scores = {}
         
@@ -63,9 +80,9 @@ class PatternMatcher:
         return scores
     
     
-    def predict(self, text):
+    def predict(self, text, rules=None):
         """Prédit la classe et retourne la confiance + scores détaillés"""
-        scores = self.compute_class_scores(text)
+        scores = self.compute_class_scores(text, rules)
         
         # Vérifie si tous les scores sont nuls
         if not scores or max(scores.values()) == 0:
@@ -0,0 +1,130 @@
+import re
+import logging
+import unicodedata
+from pathlib import Path
+import numpy as np
+from src.config.config import CLASSES, TEXT_CLASSIFIER_CONFIG
+
+# scikit-learn / joblib sont importés à la demande: sans modèle entraîné,
+# le pipeline n'utilise que les mots-clés.
+
+def normalize_text(text):
+    """
+    Normalisation avant les n-grammes: minuscules, sans accents, chiffres -> 0
+    
+    Les montants, dates et index varient d'une page à l'autre: seule leur
+    forme (00/00/0000, 000,00 dh) est utile au classifieur.
+    """
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r'\d', '0', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class TextClassifier:
+    """
+    Classification rapide du texte OCR: TF-IDF de n-grammes de caractères + SVM linéaire
+    
+    Les n-grammes de caractères (char_wb) tolèrent les erreurs d'OCR que les
+    mots-clés exacts ratent. Les probabilités sont calibrées (sigmoïde, par
+    validation croisée) pour être combinées aux scores des mots-clés.
+    """
+    
+    def __init__(self, pipeline=None, classes=None, meta=None):
+        self.pipeline = pipeline
+        self.classes = list(classes or [])
+        self.meta = meta or {}
+        self.logger = logging.getLogger(__name__)
+        
+        # Colonnes du modèle -> colonnes de CLASSES (classes absentes: probabilité 0)
+        self._columns = [CLASSES.index(cls) for cls in self.classes]
+    
+    @staticmethod
+    def build_pipeline(calibration_folds):
+        """Pipeline scikit-learn non entraîné (TF-IDF + SVM linéaire calibré)"""
+        from sklearn.pipeline import Pipeline
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.svm import LinearSVC
+        from sklearn.calibration import CalibratedClassifierCV
+        
+        config = TEXT_CLASSIFIER_CONFIG
+        vectorizer = TfidfVectorizer(
+            analyzer='char_wb',
+            preprocessor=normalize_text,
+            ngram_range=tuple(config['ngram_range']),
+            max_features=config['max_features'],
+            min_df=config['min_df'],
+            sublinear_tf=True,
+            dtype=np.float32
+        )
+        classifier = CalibratedClassifierCV(
+            LinearSVC(C=config['C']), method='sigmoid', cv=calibration_folds
+        )
+        return Pipeline([('tfidf', vectorizer), ('clf', classifier)])
+    
+    @classmethod
+    def train(cls, texts, labels):
+        """Entraîne un classifieur sur des textes de pages étiquetés"""
+        counts = {label: labels.count(label) for label in set(labels)}
+        unknown = set(counts) - set(CLASSES)
+        if unknown:
+            raise ValueError(f"Classes inconnues: {sorted(unknown)}")
+        
+        folds = min(TEXT_CLASSIFIER_CONFIG['calibration_folds'], min(counts.values()))
+        if len(counts) < 2 or folds < 2:
+            raise ValueError("Il faut au moins 2 classes et 2 pages par classe pour calibrer")
+        
+        pipeline = cls.build_pipeline(folds)
+        pipeline.fit(texts, labels)
+        
+        meta = {
+            'pages': len(texts),
+            'pages_per_class': counts,
+            'features': len(pipeline.named_steps['tfidf'].vocabulary_)
+        }
+        return cls(pipeline, list(pipeline.classes_), meta)
+    
+    @classmethod
+    def load(cls, path):
+        """Charge un classifieur sauvegardé par save()"""
+        import joblib
+        
+        data = joblib.load(path)
+        unknown = set(data['classes']) - set(CLASSES)
+        if unknown:
+            raise ValueError(f"Classifieur entraîné sur des classes inconnues: {sorted(unknown)}")
+        
+        classifier = cls(data['pipeline'], data['classes'], data.get('meta'))
+        classifier.logger.info(
+            f"✅ Classifieur TF-IDF chargé ({classifier.meta.get('features', '?')} n-grammes)"
+        )
+        return classifier
+    
+    def save(self, path):
+        """Sérialise le pipeline et ses classes (joblib)"""
+        import joblib
+        
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump({'pipeline': self.pipeline, 'classes': self.classes, 'meta': self.meta}, path)
+        return path
+    
+    def predict_proba_batch(self, texts):
+        """Probabilités calibrées (n_textes, len(CLASSES)), colonnes dans l'ordre de CLASSES"""
+        probabilities = np.zeros((len(texts), len(CLASSES)), dtype=np.float64)
+        if len(texts):
+            probabilities[:, self._columns] = self.pipeline.predict_proba(texts)
+        return probabilities
+    
+    def predict_batch(self, texts):
+        """Prédictions d'un lot de pages: [(classe, confiance, probabilités)]"""
+        predictions = []
+        for row in self.predict_proba_batch(texts):
+            scores = {cls: float(p) for cls, p in zip(CLASSES, row)}
+            predicted_class = CLASSES[int(row.argmax())]
+            predictions.append((predicted_class, scores[predicted_class], scores))
+        return predictions
+    
+    def predict(self, text):
+        """Prédit la classe d'une page (même forme que PatternMatcher.predict)"""
+        return self.predict_batch([text])[0]
@@ -0,0 +1,173 @@
+import numpy as np
+from src.config.config import WORD_LAYOUT_CONFIG
+
+
+class WordBoxes:
+    """
+    Mots reconnus par Tesseract avec leur géométrie (colonnes NumPy)
+    
+    Coordonnées normalisées par la taille de l'image OCRisée (0..1): les
+    features ne dépendent pas de l'échelle de la passe OCR. Une ligne
+    Tesseract est identifiée par (bloc, paragraphe, ligne).
+    """
+    
+    def __init__(self, words, left, top, width, height, confidence, line):
+        self.words = words            # Liste des mots (str)
+        self.left = left              # float32, fractions de la largeur
+        self.top = top                # float32, fractions de la hauteur
+        self.width = width
+        self.height = height
+        self.confidence = confidence  # float32, 0..100
+        self.line = line              # int64, identifiant de ligne
+    
+    @classmethod
+    def from_tesseract(cls, data, image_shape):
+        """Construit les colonnes depuis image_to_data (Output.DICT), mots non vides seulement"""
+        image_height, image_width = image_shape[:2]
+        
+        confidence = np.asarray(data['conf'], dtype=np.float32)
+        keep = np.flatnonzero(
+            (confidence >= 0) & np.fromiter((bool(t.strip()) for t in data['text']), dtype=bool,
+                                            count=len(data['text']))
+        )
+        
+        column = lambda name: np.asarray(data[name], dtype=np.float32)[keep]
+        line = (np.asarray(data['block_num'], dtype=np.int64)[keep] * 1_000_000
+                + np.asarray(data['par_num'], dtype=np.int64)[keep] * 1_000
+                + np.asarray(data['line_num'], dtype=np.int64)[keep])
+        
+        return cls(
+            words=[data['text'][i] for i in keep],
+            left=column('left') / max(image_width, 1),
+            top=column('top') / max(image_height, 1),
+            width=column('width') / max(image_width, 1),
+            height=column('height') / max(image_height, 1),
+            confidence=confidence[keep],
+            line=line
+        )
+    
+    @classmethod
+    def empty(cls):
+        empty = np.empty(0, dtype=np.float32)
+        return cls([], empty, empty, empty, empty, empty, np.empty(0, dtype=np.int64))
+    
+    def __len__(self):
+        return len(self.words)
+    
+    def _confident(self, min_confidence=None):
+        if min_confidence is None:
+            min_confidence = WORD_LAYOUT_CONFIG['min_word_confidence']
+        return self.confidence > min_confidence
+    
+    def text(self, min_confidence=None):
+        """Texte des mots au-dessus du seuil de confiance, dans l'ordre de lecture"""
+        mask = self._confident(min_confidence)
+        return ' '.join(word for word, keep in zip(self.words, mask) if keep)
+    
+    def mean_confidence(self, min_confidence=None):
+        """Confiance moyenne (0..1) des mots retenus"""
+        mask = self._confident(min_confidence)
+        return float(self.confidence[mask].mean()) / 100.0 if mask.any() else 0.0
+    
+    def text_density(self):
+        """Part de la page couverte par des boîtes de mots"""
+        return float(min(np.sum(self.width * self.height), 1.0))
+    
+    def lines(self):
+        """Boîtes des lignes: (identifiants, haut, bas, texte), triées de haut en bas"""
+        if not len(self):
+            return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), []
+        
+        line_ids, inverse = np.unique(self.line, return_inverse=True)
+        tops = np.full(len(line_ids), np.inf, dtype=np.float32)
+        bottoms = np.zeros(len(line_ids), dtype=np.float32)
+        np.minimum.at(tops, inverse, self.top)
+        np.maximum.at(bottoms, inverse, self.top + self.height)
+        
+        texts = [[] for _ in line_ids]
+        for word, index in zip(self.words, inverse):
+            texts[index].append(word)
+        
+        order = np.argsort(tops, kind='stable')
+        return line_ids[order], tops[order], bottoms[order], [' '.join(texts[i]) for i in order]
+    
+    def column_alignment(self):
+        """
+        Structure tabulaire par alignement des bords gauches des mots
+        
+        Les bords gauches proches (column_tolerance) forment une colonne si
+        ils sont partagés par min_column_rows lignes; une ligne de tableau
+        a au moins deux mots dans ces colonnes.
+        
+        Returns:
+            (colonnes alignées, lignes de tableau)
+        """
+        config = WORD_LAYOUT_CONFIG
+        if len(self) < 2:
+            return 0, 0
+        
+        order = np.argsort(self.left, kind='stable')
+        lefts = self.left[order]
+        lines = self.line[order]
+        clusters = np.concatenate([[0], np.cumsum(np.diff(lefts) > config['column_tolerance'])])
+        
+        # Nombre de lignes distinctes par groupe de bords gauches
+        pairs = np.unique(np.stack([clusters, lines], axis=1), axis=0)
+        cluster_ids, line_counts = np.unique(pairs[:, 0], return_counts=True)
+        columns = cluster_ids[line_counts >= config['min_column_rows']]
+        
+        in_columns = np.isin(clusters, columns)
+        _, words_per_line = np.unique(lines[in_columns], return_counts=True)
+        return len(columns), int(np.count_nonzero(words_per_line >= 2))
+    
+    def header_footer(self):
+        """Textes des bandeaux d'en-tête et de pied de page"""
+        config = WORD_LAYOUT_CONFIG
+        bottoms = self.top + self.height
+        header = bottoms <= config['header_fraction']
+        footer = self.top >= 1.0 - config['footer_fraction']
+        return {
+            'header': ' '.join(w for w, keep in zip(self.words, header) if keep),
+            'footer': ' '.join(w for w, keep in zip(self.words, footer) if keep)
+        }
+    
+    def signature_gap(self):
+        """
+        Zone vide sous la dernière mention de signature (fraction de hauteur)
+        
+        Une signature manuscrite ou un cachet n'est pas reconnu comme texte:
+        la zone de signature apparaît comme un espace vide sous la mention
+        ("signature", "cachet", ...), jusqu'à la ligne suivante ou au pied de page.
+        """
+        keywords = WORD_LAYOUT_CONFIG['signature_keywords']
+        _, tops, bottoms, texts = self.lines()
+        
+        gap = 0.0
+        for i, text in enumerate(texts):
+            text = text.lower()
+            if tops[i] < 0.4 or not any(keyword in text for keyword in keywords):
+                continue
+            next_top = tops[i + 1] if i + 1 < len(texts) else 1.0 - WORD_LAYOUT_CONFIG['footer_fraction']
+            gap = max(gap, float(next_top - bottoms[i]))
+        return gap
+    
+    def layout_features(self):
+        """
+        Features de gabarits calculables sans OpenCV (mêmes clés que TemplateDetector)
+        
+        horizontal_lines / vertical_lines comptent ici les lignes et colonnes
+        alignées du tableau, et non des traits détectés par Hough; word_layout
+        fait comparer text_density aux plages word_text_density des gabarits.
+        """
+        columns, rows = self.column_alignment()
+        gap = self.signature_gap()
+        return {
+            'has_table': columns >= WORD_LAYOUT_CONFIG['min_table_columns']
+                         and rows >= WORD_LAYOUT_CONFIG['min_column_rows'],
+            'horizontal_lines': rows,
+            'vertical_lines': columns,
+            'text_density': self.text_density(),
+            'has_signature': gap >= WORD_LAYOUT_CONFIG['min_signature_gap'],
+            'signature_ratio': gap,
+            'word_layout': True
+        }
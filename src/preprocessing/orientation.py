@@ -0,0 +1,132 @@
+import cv2
+import numpy as np
+import logging
+import pytesseract
+
+from src.config.config import ORIENTATION_CONFIG
+
+
+# Rotation horaire (degrés) -> opération cv2 équivalente, sans interpolation
+_ROTATIONS = {
+    90: cv2.ROTATE_90_CLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_COUNTERCLOCKWISE
+}
+
+
+class OrientationDetector:
+    """
+    Détection rapide de l'orientation d'une page (0/90/180/270°)
+
+    Tesseract OSD (--psm 0) tourne sur une version réduite de la page. Seul
+    OSD décide d'une rotation: s'il échoue (trop peu de texte), une
+    heuristique sur la direction des lignes de texte repère les pages
+    probablement couchées, pour lesquelles OSD est relancé sur une version
+    moins réduite. Si OSD échoue encore, la page est laissée telle quelle et
+    signalée (suspect): l'heuristique ne distingue ni 90° de 270°, ni une
+    page couchée d'une page à colonnes très marquées (relevés).
+    """
+
+    def __init__(self, max_side=None, min_confidence=None, retry_max_side=None):
+        self.max_side = max_side or ORIENTATION_CONFIG['max_side']
+        self.retry_max_side = retry_max_side or ORIENTATION_CONFIG['retry_max_side']
+        self.min_confidence = (ORIENTATION_CONFIG['min_confidence']
+                               if min_confidence is None else min_confidence)
+        self.logger = logging.getLogger(__name__)
+
+    def _downscale(self, gray, max_side=None):
+        """Réduit la page pour que son plus grand côté vaille max_side"""
+        scale = (max_side or self.max_side) / max(gray.shape[:2])
+        if scale >= 1.0:
+            return gray
+        return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    def detect_osd(self, small):
+        """Orientation par Tesseract OSD -> (rotation horaire, confiance) ou None"""
+        try:
+            osd = pytesseract.image_to_osd(
+                small, config='--psm 0', output_type=pytesseract.Output.DICT
+            )
+        except Exception as e:
+            # Typiquement "Too few characters" sur une page peu textuelle
+            self.logger.debug(f"OSD indisponible: {e}")
+            return None
+
+        return int(osd['rotate']) % 360, float(osd['orientation_conf'])
+
+    def detect_text_lines(self, small):
+        """
+        Heuristique de direction des lignes de texte -> (0 ou 90, confiance)
+
+        Les lignes horizontales donnent un profil de projection par lignes très
+        contrasté (alternance texte/interligne); sur une page couchée, c'est le
+        profil par colonnes qui l'est. Ne distingue pas 0° de 180°.
+        """
+        _, ink = cv2.threshold(small, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        if not ink.any():
+            return 0, 0.0
+
+        row_profile = ink.sum(axis=1, dtype=np.float32)
+        col_profile = ink.sum(axis=0, dtype=np.float32)
+
+        # Variance normalisée (coefficient de variation) de chaque profil
+        row_cv = row_profile.std() / (row_profile.mean() + 1e-6)
+        col_cv = col_profile.std() / (col_profile.mean() + 1e-6)
+
+        if col_cv > row_cv:
+            return 90, float(col_cv / (row_cv + 1e-6))
+        return 0, float(row_cv / (col_cv + 1e-6))
+
+    def detect(self, gray):
+        """
+        Détecte l'orientation d'une page en niveaux de gris
+
+        Returns:
+            dict: rotate (rotation horaire à appliquer), confidence, method,
+            suspect (page probablement couchée mais non redressée)
+        """
+        small = self._downscale(gray)
+
+        osd = self.detect_osd(small)
+        if osd is None:
+            lines_angle, lines_confidence = self.detect_text_lines(small)
+            lying = lines_angle == 90 and lines_confidence >= self.min_confidence['text_lines']
+            if not lying:
+                return {'rotate': 0, 'confidence': lines_confidence, 'method': "text_lines",
+                        'suspect': False}
+
+            # Page probablement couchée: OSD relancé avec des caractères plus grands
+            osd = self.detect_osd(self._downscale(gray, self.retry_max_side))
+            if osd is None:
+                return {'rotate': 0, 'confidence': lines_confidence, 'method': "text_lines",
+                        'suspect': True}
+
+        rotate, confidence = osd
+        # Confiance insuffisante: on ne touche pas à la page
+        if confidence < self.min_confidence['osd']:
+            rotate = 0
+
+        return {'rotate': rotate, 'confidence': confidence, 'method': "osd", 'suspect': False}
+
+    @staticmethod
+    def rotate(image, angle):
+        """Applique une rotation horaire multiple de 90° (copie sans interpolation)"""
+        if angle not in _ROTATIONS:
+            return image
+        return cv2.rotate(image, _ROTATIONS[angle])
+
+    def correct(self, gray):
+        """Détecte puis corrige l'orientation -> (page redressée, orientation)"""
+        orientation = self.detect(gray)
+        if orientation['suspect']:
+            self.logger.warning(
+                f"  ⚠️ Page probablement couchée, orientation non confirmée par OSD "
+                f"(lignes, confiance {orientation['confidence']:.1f})"
+            )
+        if orientation['rotate']:
+            self.logger.info(
+                f"  🔄 Page tournée de {orientation['rotate']}° "
+                f"({orientation['method']}, confiance {orientation['confidence']:.1f})"
+            )
+            gray = self.rotate(gray, orientation['rotate'])
+        return gray, orientation
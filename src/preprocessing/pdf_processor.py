@@ -1,25 +1,163 @@
-from pdf2image import convert_from_path
+import io
+import os
+import tempfile
+from contextlib import contextmanager
+from pdf2image import convert_from_bytes, convert_from_path, pdfinfo_from_bytes, pdfinfo_from_path
+from pdf2image.exceptions import PDFPopplerTimeoutError
 import cv2
 import numpy as np
-from PIL import Image
+from PIL import Image, ImageSequence
 import logging
+from src.config.config import MEMORY_CONFIG, PAGE_POOL_CONFIG
+from src.config.profiles import resolve_profile
+from src.utils.watchdog import StageTimeout
+
+@contextmanager
+def _pdf_file(pdf_path):
+    """Chemin d'un PDF donné par chemin ou contenu (bytes écrits une fois en fichier temporaire)"""
+    if not isinstance(pdf_path, (bytes, bytearray)):
+        yield str(pdf_path)
+        return
+    
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(pdf_path)
+        yield path
+    finally:
+        os.unlink(path)
 
 class PDFProcessor:
     """Conversion et prétraitement des PDFs"""
     
-    def __init__(self):
+    def __init__(self, performance=None):
+        """performance: réglages d'un profil (resolve_profile), défaut: profil configuré"""
         self.logger = logging.getLogger(__name__)
+        self.performance = performance or resolve_profile()
+        self.dpi = self.performance['dpi']
     
-    def pdf_to_images(self, pdf_path, dpi=300):
-        """Convertit un PDF en liste d'images"""
+    def pdf_to_images(self, pdf_path, dpi=None, grayscale=None, timeout=None,
+                      first_page=None, last_page=None):
+        """
+        Convertit un PDF en liste d'images
+        
+        pdf_path: chemin du PDF, ou son contenu (bytes, membre d'archive)
+        dpi: résolution du rendu (défaut: celle du profil de performance)
+        timeout: secondes avant d'interrompre poppler (StageTimeout levée)
+        first_page, last_page: plage de pages à rendre (numérotées à partir de 1)
+        """
+        dpi = dpi or self.dpi
+        if grayscale is None:
+            grayscale = MEMORY_CONFIG['grayscale_render']
+        
+        # Contenu en mémoire: pdf2image le confie à poppler via un fichier temporaire
+        convert = convert_from_bytes if isinstance(pdf_path, (bytes, bytearray)) else convert_from_path
+        
         try:
-            images = convert_from_path(pdf_path, dpi=dpi)
+            # Rendu direct en niveaux de gris: 3x moins de mémoire par page
+            images = convert(pdf_path, dpi=dpi, grayscale=grayscale, timeout=timeout,
+                             first_page=first_page, last_page=last_page)
             self.logger.info(f"✅ PDF converti: {len(images)} page(s)")
-            return [np.array(img) for img in images]
+            
+            # np.asarray évite la seconde copie de np.array; chaque image PIL
+            # est libérée dès sa conversion
+            pages = []
+            while images:
+                pages.append(np.asarray(images.pop(0)))
+            return pages
+        except PDFPopplerTimeoutError as e:
+            raise StageTimeout('render', timeout) from e
         except Exception as e:
             self.logger.error(f"❌ Erreur conversion PDF: {e}")
             return []
     
+    def page_count(self, pdf_path):
+        """Nombre de pages d'un PDF (chemin ou contenu), sans rendu"""
+        if isinstance(pdf_path, (bytes, bytearray)):
+            return int(pdfinfo_from_bytes(pdf_path)['Pages'])
+        return int(pdfinfo_from_path(pdf_path)['Pages'])
+    
+    def render_to_pool(self, pdf_path, pool, dpi=None, grayscale=None, timeout=None, batch=None):
+        """
+        Rendu par lots de pages dans un SharedPagePool (générateur de PageHandle)
+        
+        poppler ne sait pas écrire dans un tampon fourni: chaque appel rend un
+        lot de `batch` pages (PAGE_POOL_CONFIG['render_batch']), le PDF n'est
+        donc analysé qu'une fois par lot, puis chaque page est copiée dans un
+        slot et son image PIL libérée aussitôt. Au plus un lot de pages en
+        mémoire privée; le rendu attend qu'un slot se libère quand l'anneau
+        est plein. Un PDF en mémoire (bytes) est écrit une seule fois dans un
+        fichier temporaire, partagé par tous les lots.
+        """
+        dpi = dpi or self.dpi
+        batch = batch or PAGE_POOL_CONFIG['render_batch']
+        if grayscale is None:
+            grayscale = MEMORY_CONFIG['grayscale_render']
+        
+        with _pdf_file(pdf_path) as path:
+            try:
+                page_count = self.page_count(path)
+            except Exception as e:
+                self.logger.error(f"❌ Erreur lecture PDF: {e}")
+                return
+            
+            for first_page in range(1, page_count + 1, batch):
+                last_page = min(page_count, first_page + batch - 1)
+                try:
+                    images = convert_from_path(path, dpi=dpi, grayscale=grayscale, timeout=timeout,
+                                               first_page=first_page, last_page=last_page)
+                except PDFPopplerTimeoutError as e:
+                    raise StageTimeout('render', timeout) from e
+                except Exception as e:
+                    self.logger.error(f"❌ Erreur conversion pages {first_page}-{last_page}: {e}")
+                    return
+                
+                while images:
+                    image = images.pop(0)
+                    handle = pool.put(image)
+                    image.close()
+                    yield handle
+    
+    def image_to_pages(self, image_source, dpi=None, grayscale=None):
+        """
+        Pages d'une image scannée (TIFF multipage, JPEG, PNG), sans passer par un PDF
+        
+        Chaque trame est ramenée à la résolution du rendu PDF (dpi) quand
+        l'image déclare la sienne, pour que les gabarits restent comparables.
+        
+        image_source: chemin de l'image ou son contenu (bytes, membre d'archive)
+        """
+        dpi = dpi or self.dpi
+        if grayscale is None:
+            grayscale = MEMORY_CONFIG['grayscale_render']
+        mode = "L" if grayscale else "RGB"
+        
+        if isinstance(image_source, (bytes, bytearray)):
+            image_source = io.BytesIO(image_source)
+        
+        try:
+            pages = []
+            with Image.open(image_source) as image:
+                for frame in ImageSequence.Iterator(image):
+                    page = frame.convert(mode)
+                    source_dpi = frame.info.get('dpi', (dpi, dpi))[0] or dpi
+                    scale = dpi / float(source_dpi)
+                    if abs(scale - 1.0) > 0.05:
+                        size = (round(page.width * scale), round(page.height * scale))
+                        page = page.resize(size, Image.LANCZOS)
+                    pages.append(np.asarray(page))
+            self.logger.info(f"✅ Image chargée: {len(pages)} page(s)")
+            return pages
+        except Exception as e:
+            self.logger.error(f"❌ Erreur lecture image: {e}")
+            return []
+    
+    def to_grayscale(self, image):
+        """Convertit en niveaux de gris (sans copie si l'image l'est déjà)"""
+        if len(image.shape) == 3:
+            return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        return image
+    
     def enhance_image(self, image):
         """Améliore la qualité de l'image pour l'OCR"""
         # Conversion en niveaux de gris
@@ -28,27 +166,34 @@ class PDFProcessor:
         else:
             gray = image
         
-        # Débruitage
-        denoised = cv2.fastNlMeansDenoising(gray)
+        # Débruitage (le plus coûteux du prétraitement, désactivé en profil rapide)
+        if self.performance['denoise']:
+            denoised = cv2.fastNlMeansDenoising(gray, h=self.performance['denoise_strength'])
+        else:
+            denoised = gray
         
         # Amélioration du contraste (CLAHE)
         clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
         enhanced = clahe.apply(denoised)
         
-        # Binarisation adaptative
+        # Binarisation adaptative (sur place, dans le buffer CLAHE)
         binary = cv2.adaptiveThreshold(
             enhanced, 255, 
             cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-            cv2.THRESH_BINARY, 11, 2
+            cv2.THRESH_BINARY, 11, 2,
+            dst=enhanced
         )
         
         return binary
     
     def correct_skew(self, image):
         """Corrige l'inclinaison de l'image"""
-        coords = np.column_stack(np.where(image > 0))
-        if len(coords) == 0:
+        # Points (ligne, colonne) non nuls en int32, sans les tableaux
+        # intermédiaires int64 de np.where
+        points = cv2.findNonZero(image)
+        if points is None:
             return image
+        coords = np.ascontiguousarray(points.reshape(-1, 2)[:, ::-1])
         
         angle = cv2.minAreaRect(coords)[-1]
         
@@ -69,8 +214,24 @@ class PDFProcessor:
         
         return rotated
     
-    def preprocess_for_ocr(self, image):
-        """Pipeline complet de prétraitement pour OCR"""
+    def preprocess_for_ocr(self, image, mode="full", scale=1.0):
+        """
+        Prétraitement pour OCR
+        
+        Args:
+            image: page (niveaux de gris ou RGB)
+            mode: "full" (débruitage, CLAHE, binarisation adaptative, redressement)
+                  ou "light" (binarisation Otsu seule, pour la passe rapide)
+            scale: facteur de réduction appliqué avant le prétraitement
+        """
+        if scale != 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
+        if mode == "light":
+            gray = self.to_grayscale(image)
+            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            return binary
+        
         enhanced = self.enhance_image(image)
         corrected = self.correct_skew(enhanced)
         return corrected
@@ -0,0 +1,126 @@
+import cv2
+import numpy as np
+
+from src.config.config import SCRIPT_CONFIG
+
+
+def _long_run_fraction(row, min_length):
+    """Part de l'encre d'une ligne de pixels dans des segments d'au moins min_length"""
+    edges = np.diff(np.concatenate([[0], row, [0]]))
+    runs = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+    return float(runs[runs >= min_length].sum()) / max(int(runs.sum()), 1)
+
+
+class ScriptDetector:
+    """
+    Détection rapide des zones de texte arabe d'une page (sans OCR)
+
+    Sur la page réduite, les mots sont fusionnés en segments de ligne. Les
+    lettres arabes étant liées sur une ligne de base commune, un segment
+    arabe a (1) un profil de projection horizontale dominé par la ligne de
+    base et (2) sur cette ligne, de longs segments d'encre continus, là où
+    les lettres latines ne laissent que des pieds de glyphes séparés. Les
+    deux mesures sont prises par tronçons courts (insensibles à une légère
+    inclinaison). Les segments arabes voisins sont regroupés en blocs, à
+    OCRiser seuls avec le modèle arabe.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or SCRIPT_CONFIG
+
+    def _segments(self, ink):
+        """Boîtes (x, y, w, h) des segments de ligne (mots voisins fusionnés)"""
+        config = self.config
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (config['word_gap'], 1))
+        merged = cv2.dilate(ink, kernel)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(merged)
+
+        boxes = stats[1:, :4]
+        heights, widths = boxes[:, 3], boxes[:, 2]
+        keep = (heights >= config['min_line_height']) & (widths >= 3 * heights)
+        return boxes[keep]
+
+    def is_arabic(self, segment):
+        """Mesures du segment (binaire 0/1) -> (arabe?, ratio ligne de base, part de longs segments)"""
+        config = self.config
+        height = segment.shape[0]
+        step = config['chunk_heights'] * height
+
+        peaks, runs = [], []
+        for start in range(0, segment.shape[1], step):
+            chunk = segment[:, start:start + step]
+            profile = chunk.sum(axis=1)
+            if profile.sum() < 2 * height:
+                continue
+            baseline = int(np.argmax(profile))
+            peaks.append(profile[baseline] / profile[profile > 0].mean())
+            runs.append(_long_run_fraction(chunk[baseline], config['min_run_heights'] * height))
+
+        if not peaks:
+            return False, 0.0, 0.0
+
+        peak, run = float(np.median(peaks)), float(np.median(runs))
+        return (peak >= config['min_baseline_peak'] and run >= config['min_baseline_runs']), peak, run
+
+    def detect(self, gray):
+        """
+        Zones arabes d'une page en niveaux de gris
+
+        Returns:
+            dict: blocks (boîtes x, y, w, h en pixels de la page, triées de
+            haut en bas), segments et arabic_segments (segments de ligne
+            analysés / reconnus arabes), arabic_area (part de leur surface)
+        """
+        config = self.config
+        scale = min(1.0, config['max_side'] / max(gray.shape[:2]))
+        small = gray if scale >= 1.0 else cv2.resize(
+            gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+        )
+
+        # Pas d'ouverture morphologique: les traits fins (1 px) de la page réduite disparaîtraient
+        _, ink = cv2.threshold(small, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+        segments = self._segments(ink)
+        arabic = [
+            (x, y, w, h) for x, y, w, h in segments
+            if self.is_arabic(ink[y:y + h, x:x + w])[0]
+        ]
+
+        text_area = float(sum(w * h for _, _, w, h in segments))
+        result = {
+            'blocks': [],
+            'segments': len(segments),
+            'arabic_segments': len(arabic),
+            'arabic_area': float(sum(w * h for _, _, w, h in arabic) / text_area) if text_area else 0.0
+        }
+        if not arabic:
+            return result
+
+        # Blocs: segments arabes fusionnés avec leurs voisins (lignes successives)
+        mask = np.zeros_like(ink)
+        for x, y, w, h in arabic:
+            mask[y:y + h, x:x + w] = 1
+        line_height = int(np.median([h for _, _, _, h in arabic]))
+        gap = max(1, int(config['block_gap'] * line_height))
+        mask = cv2.dilate(mask, cv2.getStructuringElement(cv2.MORPH_RECT, (2 * gap + 1, 2 * gap + 1)))
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+
+        # Retour aux pixels de la page (la dilatation tient lieu de marge)
+        page_h, page_w = gray.shape[:2]
+        blocks = []
+        for x, y, w, h in stats[1:, :4].tolist():
+            x0, y0 = int(x / scale), int(y / scale)
+            x1, y1 = min(page_w, int((x + w) / scale)), min(page_h, int((y + h) / scale))
+            blocks.append((x0, y0, x1 - x0, y1 - y0))
+
+        blocks.sort(key=lambda box: (box[1], box[0]))
+        if len(blocks) > config['max_blocks']:
+            # Trop de blocs épars: un seul bloc englobant (un appel Tesseract)
+            x0 = min(b[0] for b in blocks)
+            y0 = min(b[1] for b in blocks)
+            x1 = max(b[0] + b[2] for b in blocks)
+            y1 = max(b[1] + b[3] for b in blocks)
+            blocks = [(x0, y0, x1 - x0, y1 - y0)]
+
+        result['blocks'] = blocks
+        return result
@@ -0,0 +1,141 @@
+import heapq
+import json
+import os
+import logging
+from pathlib import Path
+
+import numpy as np
+from PyPDF2 import PdfReader
+
+from src.config.config import COST_MODEL_CONFIG, MODELS_DIR
+
+
+def prescan(pdf_path, stream=None, size_bytes=None):
+    """
+    Lecture rapide d'un PDF sans rendu: nombre de pages, taille, couche texte
+
+    La couche texte est détectée par la présence de polices dans les
+    ressources des premières pages (PDF natif vs scan).
+
+    Args:
+        pdf_path: chemin du PDF (ou nom d'un PDF d'archive si stream est fourni)
+        stream: flux binaire du PDF (lu à la place du fichier)
+        size_bytes: taille du PDF lorsque pdf_path n'est pas un fichier
+    """
+    if size_bytes is None:
+        size_bytes = Path(pdf_path).stat().st_size
+    scan = {
+        'path': str(pdf_path),
+        'pages': 0,
+        'size_mb': size_bytes / 1e6,
+        'has_text': False
+    }
+
+    try:
+        reader = PdfReader(stream if stream is not None else str(pdf_path))
+        scan['pages'] = len(reader.pages)
+        for page in reader.pages[:COST_MODEL_CONFIG['text_probe_pages']]:
+            resources = page.get('/Resources') or {}
+            if hasattr(resources, 'get_object'):
+                resources = resources.get_object()
+            if '/Font' in resources:
+                scan['has_text'] = True
+                break
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"⚠️ Pré-analyse impossible pour {pdf_path}: {e}")
+
+    return scan
+
+
+def _design_row(scan):
+    """Variables explicatives: constante, pages, taille, pages avec couche texte"""
+    return [1.0, scan['pages'], scan['size_mb'], scan['pages'] * float(scan['has_text'])]
+
+
+class CostModel:
+    """
+    Modèle linéaire du temps de traitement d'un PDF
+
+    secondes ≈ a + b·pages + c·taille_Mo + d·pages_avec_texte, ajusté par
+    moindres carrés sur l'historique des runs précédents (un JSON par ligne);
+    coefficients par défaut de la configuration tant que l'historique est court.
+    """
+
+    def __init__(self, models_dir=None):
+        models_dir = Path(models_dir) if models_dir else MODELS_DIR
+        self.model_file = models_dir / COST_MODEL_CONFIG['model_file']
+        self.history_file = models_dir / COST_MODEL_CONFIG['history_file']
+        self.logger = logging.getLogger(__name__)
+
+        self.coefficients = np.array(COST_MODEL_CONFIG['default_coefficients'], dtype=np.float64)
+        self.samples = 0
+
+        if self.model_file.exists():
+            with open(self.model_file, encoding='utf-8') as f:
+                data = json.load(f)
+            self.coefficients = np.array(data['coefficients'], dtype=np.float64)
+            self.samples = data['samples']
+
+    def predict(self, scan):
+        """Temps prévu (secondes) pour un PDF pré-analysé"""
+        cost = float(np.dot(self.coefficients, _design_row(scan)))
+        return max(cost, COST_MODEL_CONFIG['min_seconds'])
+
+    def record(self, scan, seconds):
+        """Ajoute une mesure à l'historique (ajout en fin de fichier, sûr entre processus)"""
+        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps({
+            'pages': scan['pages'],
+            'size_mb': scan['size_mb'],
+            'has_text': scan['has_text'],
+            'seconds': seconds
+        }) + "\n"
+        with open(self.history_file, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+    def fit(self):
+        """Réajuste les coefficients sur l'historique et les sauvegarde"""
+        if not self.history_file.exists():
+            return False
+
+        with open(self.history_file, encoding='utf-8') as f:
+            samples = [json.loads(line) for line in f if line.strip()]
+        samples = samples[-COST_MODEL_CONFIG['max_history']:]
+
+        if len(samples) < COST_MODEL_CONFIG['min_samples']:
+            return False
+
+        X = np.array([_design_row(s) for s in samples], dtype=np.float64)
+        y = np.array([s['seconds'] for s in samples], dtype=np.float64)
+        self.coefficients = np.linalg.lstsq(X, y, rcond=None)[0]
+        self.samples = len(samples)
+
+        self.model_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.model_file.with_suffix(".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'coefficients': self.coefficients.tolist(), 'samples': self.samples}, f)
+        os.replace(tmp_file, self.model_file)
+
+        self.logger.info(
+            f"📈 Modèle de coût ajusté sur {self.samples} PDF(s): "
+            f"{self.coefficients[1]:.2f}s/page"
+        )
+        return True
+
+
+def schedule(scans, cost_model, workers=1):
+    """
+    Ordonnancement longest-first (LPT) et estimation du temps mur
+
+    Returns:
+        (scans triés par coût décroissant, coûts prévus, temps mur prévu)
+    """
+    costs = {scan['path']: cost_model.predict(scan) for scan in scans}
+    ordered = sorted(scans, key=lambda s: costs[s['path']], reverse=True)
+
+    # Chaque PDF va au worker le moins chargé
+    loads = [0.0] * max(1, workers)
+    for scan in ordered:
+        heapq.heapreplace(loads, loads[0] + costs[scan['path']])
+
+    return ordered, costs, max(loads)
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+import numpy as np
+
+from src.config.config import CLASSES, DATASET_LABEL_ALIASES
+
+
+def resolve_label(folder_name):
+    """Nom de dossier -> classe (ou None si inconnue)"""
+    if folder_name in CLASSES:
+        return folder_name
+    return DATASET_LABEL_ALIASES.get(folder_name)
+
+
+def class_dirs(input_dir):
+    """Sous-dossiers d'un jeu étiqueté, triés: [(dossier, classe ou None si inconnue)]"""
+    return [
+        (class_dir, resolve_label(class_dir.name))
+        for class_dir in sorted(p for p in Path(input_dir).iterdir() if p.is_dir())
+    ]
+
+
+def stratified_split(labels, val_ratio, seed):
+    """Indices train/validation stratifiés par classe (au moins une page de validation par classe)"""
+    rng = np.random.default_rng(seed)
+    labels = np.asarray(labels)
+    train_idx, val_idx = [], []
+    for cls in np.unique(labels):
+        idx = rng.permutation(np.flatnonzero(labels == cls))
+        n_val = max(1, int(round(len(idx) * val_ratio)))
+        val_idx.extend(idx[:n_val])
+        train_idx.extend(idx[n_val:])
+    return np.array(train_idx, dtype=np.int64), np.array(val_idx, dtype=np.int64)
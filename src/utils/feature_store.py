@@ -0,0 +1,215 @@
+import json
+import threading
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from src.config.config import CLASSES
+
+
+# Colonnes du vecteur de features de gabarits (ordre fixe)
+TEMPLATE_FEATURE_NAMES = (
+    'aspect_ratio', 'has_photo', 'photo_count', 'has_table', 'horizontal_lines',
+    'vertical_lines', 'text_density', 'has_signature', 'signature_ratio', 'word_layout'
+)
+
+# Motifs spécifiques comptés (PatternMatcher.extract_specific_patterns)
+PATTERN_NAMES = ('montants', 'kwh', 'm3', 'dates', 'cin', 'rib')
+
+# Features entières / booléennes, restaurées avec leur type d'origine
+_BOOL_FEATURES = {'has_photo', 'has_table', 'has_signature', 'word_layout'}
+_INT_FEATURES = {'photo_count', 'horizontal_lines', 'vertical_lines'}
+
+STORE_VERSION = 2
+
+
+def skip_reason(result):
+    """Raison pour laquelle une page n'a pas d'intermédiaires à stocker"""
+    if 'duplicate_of' in result:
+        return 'duplicate'
+    if result.get('inferred'):
+        return 'inferred'
+    if 'timeout' in result:
+        return 'timeout'
+    if result.get('decision_path') == 'layout_index_match':
+        return 'layout_index'
+    return 'no_features'
+
+
+class FeatureStoreWriter:
+    """
+    Écriture des intermédiaires par page dans un magasin colonnaire (.npy)
+
+    Le texte OCR est écrit au fil de l'eau dans text.bin (UTF-8 concaténé,
+    délimité par text_offsets.npy); les colonnes numériques sont écrites à
+    la fermeture. Une ligne par page ayant traversé OCR et fusion; les autres
+    (quasi-doublons, pages inférées, index de gabarits, délais) sont listées
+    dans meta.json avec leur provenance et leur classe.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+        self.lock = threading.Lock()
+
+        self.text_file = open(self.path / "text.bin", 'wb')
+        self.text_offsets = [0]
+
+        self.sources = {}
+        self.pages = []
+        self.template = []
+        self.cnn = []
+        self.ocr_confidence = []
+        self.pattern_counts = []
+        self.predicted = []
+        self.rejected = []
+        self.rules_versions = set()
+        self.skipped = []
+
+    def add(self, source, page_number, features, result):
+        """Ajoute une page (features = result['_features'] du pipeline)"""
+        template = features['template']
+        cnn = features['cnn']
+        patterns = features['text_patterns']
+        encoded = features['text'].encode('utf-8')
+
+        with self.lock:
+            source_index = self.sources.setdefault(str(source), len(self.sources))
+            self.pages.append((source_index, page_number))
+
+            self.template.append([float(template[name]) for name in TEMPLATE_FEATURE_NAMES])
+            self.cnn.append(
+                [cnn[cls] for cls in CLASSES] if cnn is not None else [np.nan] * len(CLASSES)
+            )
+            self.ocr_confidence.append(features['ocr_confidence'])
+            self.pattern_counts.append([
+                len(patterns[name]) if isinstance(patterns[name], list) else patterns[name]
+                for name in PATTERN_NAMES
+            ])
+
+            self.text_file.write(encoded)
+            self.text_offsets.append(self.text_offsets[-1] + len(encoded))
+
+            self.predicted.append(CLASSES.index(result['predicted_class']))
+            self.rejected.append(result['rejected'])
+            self.rules_versions.add(result['rules_version'])
+
+    def skip(self, source, page_number, result):
+        """Enregistre une page classée sans intermédiaires (provenance et classe retenue)"""
+        with self.lock:
+            self.skipped.append({
+                'source': str(source),
+                'page_number': page_number,
+                'reason': skip_reason(result),
+                'predicted_class': result['predicted_class'],
+                'rejected': bool(result['rejected'])
+            })
+
+    def close(self):
+        """Écrit les colonnes et le schéma; retourne le nombre de lignes"""
+        with self.lock:
+            self.text_file.close()
+            rows = len(self.pages)
+
+            columns = {
+                'pages': np.array(self.pages, dtype=np.int32).reshape(rows, 2),
+                'template': np.array(self.template, dtype=np.float32).reshape(
+                    rows, len(TEMPLATE_FEATURE_NAMES)),
+                'cnn': np.array(self.cnn, dtype=np.float32).reshape(rows, len(CLASSES)),
+                'ocr_confidence': np.array(self.ocr_confidence, dtype=np.float32),
+                'pattern_counts': np.array(self.pattern_counts, dtype=np.int32).reshape(
+                    rows, len(PATTERN_NAMES)),
+                'text_offsets': np.array(self.text_offsets, dtype=np.int64),
+                'predicted': np.array(self.predicted, dtype=np.int8),
+                'rejected': np.array(self.rejected, dtype=bool)
+            }
+            for name, column in columns.items():
+                np.save(self.path / f"{name}.npy", column)
+
+            meta = {
+                'version': STORE_VERSION,
+                'rows': rows,
+                'classes': CLASSES,
+                'template_features': list(TEMPLATE_FEATURE_NAMES),
+                'patterns': list(PATTERN_NAMES),
+                'sources': list(self.sources),
+                'rules_versions': sorted(self.rules_versions, key=str),
+                'skipped': self.skipped
+            }
+            with open(self.path / "meta.json", 'w', encoding='utf-8') as f:
+                json.dump(meta, f, indent=2, ensure_ascii=False)
+
+        self.logger.info(f"💾 Magasin de features: {rows} page(s) dans {self.path}"
+                         f"{f' ({len(self.skipped)} sans features)' if self.skipped else ''}")
+        return rows
+
+
+class FeatureStore:
+    """Lecture d'un magasin de features (colonnes projetées en mémoire, mmap)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+        with open(self.path / "meta.json", encoding='utf-8') as f:
+            self.meta = json.load(f)
+
+        if self.meta['version'] != STORE_VERSION:
+            raise ValueError(f"Version de magasin non supportée: {self.meta['version']}")
+        if self.meta['classes'] != CLASSES or \
+                self.meta['template_features'] != list(TEMPLATE_FEATURE_NAMES):
+            raise ValueError("Magasin incompatible avec les classes/features actuelles")
+
+        load = lambda name: np.load(self.path / f"{name}.npy", mmap_mode='r')
+        self.pages = load('pages')
+        self.template = load('template')
+        self.cnn = load('cnn')
+        self.ocr_confidence = load('ocr_confidence')
+        self.pattern_counts = load('pattern_counts')
+        self.text_offsets = load('text_offsets')
+        self.predicted = load('predicted')
+        self.rejected = load('rejected')
+
+        text_size = int(self.text_offsets[-1]) if len(self.text_offsets) else 0
+        self.text_bytes = (np.memmap(self.path / "text.bin", dtype=np.uint8, mode='r')
+                           if text_size else np.empty(0, dtype=np.uint8))
+
+        self.sources = self.meta['sources']
+        self.skipped = self.meta.get('skipped', [])
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def source(self, row):
+        """(pdf source, numéro de page) d'une ligne"""
+        source_index, page_number = self.pages[row]
+        return self.sources[source_index], int(page_number)
+
+    def text(self, row):
+        """Texte OCR d'une ligne"""
+        start, end = self.text_offsets[row], self.text_offsets[row + 1]
+        return self.text_bytes[start:end].tobytes().decode('utf-8')
+
+    def template_features(self, row):
+        """Dict de features de gabarits, comme TemplateDetector.extract_features"""
+        features = {}
+        for name, value in zip(TEMPLATE_FEATURE_NAMES, self.template[row]):
+            if name in _BOOL_FEATURES:
+                features[name] = bool(value)
+            elif name in _INT_FEATURES:
+                features[name] = int(value)
+            else:
+                features[name] = float(value)
+        return features
+
+    def cnn_probabilities(self, row):
+        """Probabilités du CNN, ou None si le CNN n'était pas utilisé"""
+        values = self.cnn[row]
+        if np.isnan(values).any():
+            return None
+        return {cls: float(v) for cls, v in zip(CLASSES, values)}
+
+    def text_patterns(self, row):
+        """Compteurs de motifs spécifiques (même clés que extract_specific_patterns)"""
+        return {name: int(count) for name, count in zip(PATTERN_NAMES, self.pattern_counts[row])}
@@ -0,0 +1,75 @@
+import numpy as np
+import logging
+
+from src.config.config import INFERENCE_CONFIG
+from src.utils.resource_manager import applied_threads
+
+
+class TorchBackend:
+    """Inférence eager PyTorch sur CPU (référence)"""
+
+    name = "torch"
+
+    def __init__(self, model, output_key=None):
+        import torch
+
+        self.torch = torch
+        self.model = model.eval()
+        self.output_key = output_key
+
+    def run(self, inputs):
+        """
+        Exécute le modèle
+
+        Args:
+            inputs: dict nom -> tableau NumPy (pixel_values ou input_ids/attention_mask)
+
+        Returns:
+            première sortie du modèle en tableau NumPy
+        """
+        tensors = {name: self.torch.from_numpy(np.ascontiguousarray(value))
+                   for name, value in inputs.items()}
+
+        with self.torch.inference_mode():
+            if 'pixel_values' in tensors:
+                output = self.model(tensors['pixel_values'])
+            else:
+                output = self.model(**tensors)
+
+        if self.output_key is not None:
+            output = output[self.output_key]
+        return output.numpy()
+
+
+class OnnxRuntimeBackend:
+    """Inférence ONNX Runtime sur CPU (ne nécessite pas torch)"""
+
+    name = "onnx"
+
+    def __init__(self, model_path, intra_op_threads=None):
+        import onnxruntime as ort
+
+        self.logger = logging.getLogger(__name__)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # Par défaut, threads du budget de cœurs du worker (comme torch et OpenCV)
+        threads = intra_op_threads or INFERENCE_CONFIG['intra_op_threads'] or applied_threads()
+        if threads:
+            options.intra_op_num_threads = threads
+
+        self.session = ort.InferenceSession(
+            str(model_path), sess_options=options, providers=['CPUExecutionProvider']
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def run(self, inputs):
+        """Exécute le graphe (mêmes entrées/sorties que TorchBackend.run)"""
+        feed = {}
+        for name in self.input_names:
+            value = inputs[name]
+            # Les graphes exportés attendent float32 / int64
+            dtype = np.int64 if np.issubdtype(value.dtype, np.integer) else np.float32
+            feed[name] = np.ascontiguousarray(value, dtype=dtype)
+
+        return self.session.run(None, feed)[0]
@@ -0,0 +1,356 @@
+import atexit
+import hashlib
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import zipfile
+import logging
+from pathlib import Path
+
+from PIL import Image
+
+from src.config.config import INPUT_CONFIG
+from src.utils.cost_model import prescan
+
+
+# Séparateur archive / membre dans les noms de documents: "lot.zip!dossier/a.pdf"
+MEMBER_SEPARATOR = "!"
+
+logger = logging.getLogger(__name__)
+
+
+def _has_suffix(name, suffixes):
+    name = name.lower()
+    return any(name.endswith(suffix) for suffix in suffixes)
+
+
+def is_archive(name):
+    """Vrai pour les archives ZIP/TAR (éventuellement compressées)"""
+    return _has_suffix(str(name), INPUT_CONFIG['archive_extensions'])
+
+
+def document_kind(name):
+    """'pdf', 'image' ou None selon l'extension"""
+    if _has_suffix(str(name), INPUT_CONFIG['pdf_extensions']):
+        return 'pdf'
+    if _has_suffix(str(name), INPUT_CONFIG['image_extensions']):
+        return 'image'
+    return None
+
+
+class _FileSection(io.RawIOBase):
+    """Vue en lecture seule (seekable) d'une plage d'octets d'un fichier: membre d'un TAR non compressé"""
+
+    def __init__(self, path, offset, size):
+        super().__init__()
+        self._file = open(path, 'rb')
+        self._offset = offset
+        self._size = size
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, position, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            position += self._position
+        elif whence == io.SEEK_END:
+            position += self._size
+        self._position = max(0, position)
+        return self._position
+
+    def readinto(self, buffer):
+        count = max(0, min(len(buffer), self._size - self._position))
+        if count == 0:
+            return 0
+        self._file.seek(self._offset + self._position)
+        count = self._file.readinto(memoryview(buffer)[:count])
+        self._position += count
+        return count
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+# Index des archives du processus: chemin -> {membre: localisation}. Une
+# archive est parcourue une seule fois par processus (workers de la file),
+# puis chaque membre est relu directement:
+#   ('zip',)                  membre lu par la ZipFile ouverte du processus
+#   ('tar', décalage, taille) TAR non compressé: lecture à la position du membre
+#   ('file', chemin)          TAR compressé: membre extrait dans le dossier temporaire
+_archives_lock = threading.Lock()
+_archives_pid = None
+_archive_indexes = {}
+_open_zips = {}
+_spill_root = None
+
+
+def _process_caches():
+    """Caches du processus courant (remis à zéro dans un processus forké)"""
+    global _archives_pid, _spill_root
+    if _archives_pid != os.getpid():
+        _archives_pid = os.getpid()
+        _archive_indexes.clear()
+        _open_zips.clear()
+        _spill_root = None
+
+
+def _spill_path(archive, member):
+    """Fichier temporaire d'un membre de TAR compressé (supprimé à la fin du processus)"""
+    global _spill_root
+    with _archives_lock:
+        _process_caches()
+        if _spill_root is None:
+            _spill_root = Path(tempfile.mkdtemp(prefix="adc_archive_", dir=INPUT_CONFIG['spill_dir']))
+            atexit.register(shutil.rmtree, _spill_root, ignore_errors=True)
+    # Nom dérivé d'une empreinte: un nom de membre ("../x") ne sort jamais du dossier
+    digest = hashlib.sha1(f"{archive}{MEMBER_SEPARATOR}{member}".encode('utf-8')).hexdigest()
+    return _spill_root / f"{digest}{Path(member).suffix}"
+
+
+def _spill_member(archive, stream, info):
+    """Copie un membre lu en flux vers son fichier temporaire -> localisation ('file', chemin)"""
+    target = _spill_path(archive, info.name)
+    with stream.extractfile(info) as source, open(target, 'wb') as f:
+        shutil.copyfileobj(source, f)
+    return ('file', str(target))
+
+
+def _zip_file(path):
+    """ZipFile ouverte une fois par processus (lectures concurrentes sérialisées par zipfile)"""
+    with _archives_lock:
+        _process_caches()
+        if path not in _open_zips:
+            _open_zips[path] = zipfile.ZipFile(path)
+        return _open_zips[path]
+
+
+def _iter_tar(path):
+    """
+    Parcours d'un TAR en une passe -> (TarInfo, localisation) des documents
+
+    TAR non compressé: seuls les en-têtes sont lus, chaque membre sera relu
+    à sa position. TAR compressé (pas d'accès direct): lecture en flux et
+    extraction des documents dans le dossier temporaire.
+    """
+    try:
+        archive = tarfile.open(path, mode='r:')
+    except tarfile.ReadError:
+        archive = None
+
+    if archive is not None:
+        with archive:
+            for info in archive:
+                if info.isfile() and document_kind(info.name):
+                    yield info, ('tar', info.offset_data, info.size)
+        return
+
+    with tarfile.open(path, mode='r|*') as archive:
+        for info in archive:
+            if info.isfile() and document_kind(info.name):
+                yield info, _spill_member(path, archive, info)
+
+
+def _archive_index(path):
+    """Localisation des membres d'une archive (construite une fois par processus)"""
+    path = str(path)
+    with _archives_lock:
+        _process_caches()
+        index = _archive_indexes.get(path)
+    if index is not None:
+        return index
+
+    if zipfile.is_zipfile(path):
+        index = {name: ('zip',) for name in _zip_file(path).namelist()}
+    else:
+        index = {info.name: location for info, location in _iter_tar(path)}
+
+    with _archives_lock:
+        _archive_indexes[path] = index
+    return index
+
+
+class InputItem:
+    """
+    Un document à classifier: PDF ou image, sur disque ou membre d'archive
+
+    Un membre d'archive n'est jamais gardé en mémoire: il est relu à la
+    demande dans la ZipFile du processus, à sa position dans un TAR non
+    compressé, ou depuis le fichier temporaire où un TAR compressé a été
+    extrait en une seule passe (INPUT_CONFIG['spill_dir']).
+    """
+
+    def __init__(self, name, kind, path, member=None, size=None, location=None):
+        self.name = name        # Identifiant du document dans les rapports et la file
+        self.kind = kind        # 'pdf' ou 'image'
+        self.path = Path(path)  # Fichier sur disque (le document ou son archive)
+        self.member = member    # Nom du membre dans l'archive (None: fichier simple)
+        self._location = location
+        self._size = size
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return f"InputItem({self.name!r}, {self.kind!r})"
+
+    @property
+    def stem(self):
+        return Path(self.member or self.path).stem
+
+    @property
+    def output_stem(self):
+        """Préfixe des fichiers exportés: nom court + empreinte du nom complet
+        (deux documents de même nom, ex. a/scan.pdf et b/scan.pdf, ne s'écrasent pas)"""
+        return f"{self.stem}_{hashlib.sha1(self.name.encode('utf-8')).hexdigest()[:8]}"
+
+    @property
+    def location(self):
+        """Localisation du membre dans son archive (index de l'archive au besoin)"""
+        if self._location is None:
+            location = _archive_index(self.path).get(self.member)
+            if location is None:
+                raise FileNotFoundError(f"Membre introuvable: {self.name}")
+            self._location = location
+        return self._location
+
+    @property
+    def size(self):
+        """Taille du document en octets"""
+        if self._size is None:
+            if self.member is None:
+                self._size = self.path.stat().st_size
+            elif self.location[0] == 'zip':
+                self._size = _zip_file(str(self.path)).getinfo(self.member).file_size
+            elif self.location[0] == 'tar':
+                self._size = self.location[2]
+            else:
+                self._size = os.path.getsize(self.location[1])
+        return self._size
+
+    def read_bytes(self):
+        """Contenu du document (membre relu dans son archive si besoin)"""
+        if self.member is not None and self.location[0] == 'zip':
+            return _zip_file(str(self.path)).read(self.member)
+        with self.open() as stream:
+            return stream.read()
+
+    def open(self):
+        """Flux binaire seekable du document (membre TAR lu à sa position, sans copie en mémoire)"""
+        if self.member is None:
+            return open(self.path, 'rb')
+        location = self.location
+        if location[0] == 'zip':
+            # Membre compressé: un seek de ZipExtFile relit depuis le début,
+            # le membre (seul) est donc décompressé en mémoire
+            return io.BytesIO(_zip_file(str(self.path)).read(self.member))
+        if location[0] == 'tar':
+            return io.BufferedReader(_FileSection(self.path, location[1], location[2]))
+        return open(location[1], 'rb')
+
+    def source(self):
+        """Chemin (fichier simple, membre extrait) ou octets (membre ZIP/TAR) pour le rendu"""
+        if self.member is None:
+            return str(self.path)
+        if self.location[0] == 'file':
+            return self.location[1]
+        return self.read_bytes()
+
+    def prescan(self):
+        """Pré-analyse sans rendu pour le modèle de coût (mêmes clés que prescan)"""
+        if self.kind == 'pdf':
+            if self.member is None:
+                return prescan(self.name)
+            with self.open() as stream:
+                return prescan(self.name, stream=stream, size_bytes=self.size)
+
+        scan = {'path': self.name, 'pages': 0, 'size_mb': self.size / 1e6, 'has_text': False}
+        try:
+            with self.open() as stream, Image.open(stream) as image:
+                scan['pages'] = getattr(image, 'n_frames', 1)
+        except Exception as e:
+            logger.warning(f"⚠️ Pré-analyse impossible pour {self.name}: {e}")
+        return scan
+
+
+def item_from_name(name):
+    """Reconstruit un élément depuis son nom (chemin ou "archive!membre")"""
+    name = str(name)
+    archive, separator, member = name.partition(MEMBER_SEPARATOR)
+    if separator and is_archive(archive) and os.path.isfile(archive):
+        return InputItem(name, document_kind(member) or 'pdf', archive, member=member)
+    return InputItem(name, document_kind(name) or 'pdf', name)
+
+
+def _iter_archive(path):
+    """
+    Documents contenus dans une archive (les archives imbriquées sont ignorées)
+
+    Les membres sont produits au fil du parcours, sans leur contenu; l'index
+    de l'archive est enregistré pour les relectures du processus.
+    """
+    def member_item(name, size, location):
+        return InputItem(f"{path}{MEMBER_SEPARATOR}{name}", document_kind(name), path,
+                         member=name, size=size, location=location)
+
+    try:
+        if zipfile.is_zipfile(path):
+            for info in _zip_file(path).infolist():
+                if document_kind(info.filename) and not info.is_dir():
+                    yield member_item(info.filename, info.file_size, ('zip',))
+            return
+
+        locations = {}
+        for info, location in _iter_tar(path):
+            locations[info.name] = location
+            yield member_item(info.name, info.size, location)
+
+        with _archives_lock:
+            _process_caches()
+            _archive_indexes.setdefault(path, locations)
+    except (zipfile.BadZipFile, tarfile.TarError, OSError) as e:
+        logger.error(f"❌ Archive illisible {path}: {e}")
+
+
+def _iter_files(directory):
+    """Parcours récursif paresseux (os.scandir): les fichiers sont produits au fil de l'eau"""
+    pending = [str(directory)]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file():
+                        yield entry.path
+        except OSError as e:
+            logger.warning(f"⚠️ Dossier illisible: {e}")
+
+
+def iter_items(root):
+    """
+    Énumère les documents d'une entrée: dossier (récursif), archive, PDF ou image
+
+    Générateur: rien n'est listé à l'avance, les gros arbres sont parcourus
+    au fur et à mesure du traitement.
+    """
+    root = Path(root)
+    paths = [str(root)] if root.is_file() else _iter_files(root)
+
+    for path in paths:
+        if is_archive(path):
+            yield from _iter_archive(path)
+            continue
+        kind = document_kind(path)
+        if kind is not None:
+            yield InputItem(path, kind, path)
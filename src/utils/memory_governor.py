@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+import logging
+
+try:
+    import psutil
+except ImportError:  # psutil est optionnel: repli sur /proc ou resource
+    psutil = None
+
+from src.config.config import MEMORY_CONFIG
+
+
+def current_rss_mb():
+    """Retourne le RSS courant du processus en Mo"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+
+    try:
+        # Linux: deuxième champ de statm = pages résidentes
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        # Dernier recours: pic du processus (Ko sous Linux, octets sous macOS)
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        return 0.0
+
+
+class MemoryGovernor:
+    """
+    Budget mémoire: freine la concurrence des pages et mesure le pic par étape
+
+    En série (une page en vol), page_slot n'attend jamais: le freinage passe
+    alors par le rendu des documents suivants en petites plages de pages
+    (DocumentClassifier._page_ranges, throttled_documents).
+    """
+
+    def __init__(self, budget_mb=None, high_watermark=None, poll_interval=None):
+        self.budget_mb = budget_mb if budget_mb is not None else MEMORY_CONFIG['budget_mb']
+        self.high_watermark = high_watermark or MEMORY_CONFIG['high_watermark']
+        self.poll_interval = poll_interval or MEMORY_CONFIG['poll_interval']
+        self.logger = logging.getLogger(__name__)
+
+        self._condition = threading.Condition()
+        self._in_flight = 0
+
+        self._stats_lock = threading.Lock()
+        self._active_stages = {}
+        self._sampler = None
+        self.reset()
+
+    def reset(self):
+        """Réinitialise les statistiques (début d'un nouveau lot)"""
+        with self._stats_lock:
+            self.stage_peaks = {}
+            self.peak_rss_mb = current_rss_mb()
+            self.throttled_pages = 0
+            self.throttled_documents = 0
+
+    def over_budget(self):
+        """Vrai si le RSS dépasse le seuil haut du budget"""
+        if not self.budget_mb:
+            return False
+        return current_rss_mb() > self.budget_mb * self.high_watermark
+
+    @contextmanager
+    def page_slot(self):
+        """
+        Réserve un créneau de traitement pour une page
+
+        Tant que le RSS dépasse le budget, les nouvelles pages attendent la fin
+        des pages en cours. Une page est toujours admise si aucune n'est en vol
+        pour garantir la progression.
+        """
+        with self._condition:
+            throttled = False
+            while self._in_flight > 0 and self.over_budget():
+                if not throttled:
+                    throttled = True
+                    self.throttled_pages += 1
+                    self.logger.debug("⏳ Budget mémoire atteint, page mise en attente")
+                self._condition.wait(self.poll_interval)
+            self._in_flight += 1
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def throttle_document(self):
+        """Compte un document rendu par petites plages faute de mémoire"""
+        with self._stats_lock:
+            self.throttled_documents += 1
+
+    @contextmanager
+    def track(self, stage):
+        """Mesure le pic de RSS observé pendant une étape du pipeline"""
+        token = object()
+        with self._stats_lock:
+            self._active_stages[token] = stage
+            self._ensure_sampler()
+
+        self._record(current_rss_mb())
+        try:
+            yield
+        finally:
+            self._record(current_rss_mb())
+            with self._stats_lock:
+                del self._active_stages[token]
+
+    def _record(self, rss_mb):
+        """Attribue un échantillon RSS à toutes les étapes actives"""
+        with self._stats_lock:
+            self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+            for stage in set(self._active_stages.values()):
+                self.stage_peaks[stage] = max(self.stage_peaks.get(stage, 0.0), rss_mb)
+
+    def _ensure_sampler(self):
+        """Démarre le thread d'échantillonnage (appelé sous _stats_lock)"""
+        if self._sampler is None or not self._sampler.is_alive():
+            self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+            self._sampler.start()
+
+    def _sample_loop(self):
+        """Échantillonne le RSS tant qu'au moins une étape est active"""
+        while True:
+            with self._stats_lock:
+                if not self._active_stages:
+                    self._sampler = None
+                    return
+            self._record(current_rss_mb())
+            time.sleep(self.poll_interval)
+
+    def report(self):
+        """Résumé mémoire du lot pour le rapport de classification"""
+        with self._stats_lock:
+            return {
+                'budget_mb': self.budget_mb,
+                'peak_rss_mb': round(self.peak_rss_mb, 1),
+                'stage_peak_rss_mb': {
+                    stage: round(peak, 1) for stage, peak in self.stage_peaks.items()
+                },
+                'throttled_pages': self.throttled_pages,
+                'throttled_documents': self.throttled_documents
+            }
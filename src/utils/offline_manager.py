@@ -1,10 +1,12 @@
 import os
-import torch
-import torchvision.models as models
-from transformers import CamembertModel, CamembertTokenizer
 from pathlib import Path
 import logging
 
+from src.config.config import INFERENCE_CONFIG, CV_CONFIG, CLASSES, TEXT_CLASSIFIER_CONFIG
+
+# torch / transformers sont importés à la demande: un déploiement qui
+# n'utilise que les graphes ONNX n'a pas besoin de ces dépendances.
+
 class OfflineModelManager:
     """Gestionnaire de modèles fonctionnant 100% offline"""
     
@@ -16,6 +18,10 @@ class OfflineModelManager:
         
     def download_and_save_models(self):
         """Télécharge et sauvegarde tous les modèles une seule fois"""
+        import torch
+        import torchvision.models as models
+        from transformers import CamembertModel, CamembertTokenizer
+        
         print("📥 Téléchargement des modèles...")
         
         # 1. Télécharger ResNet50
@@ -26,6 +32,13 @@ class OfflineModelManager:
         resnet = models.resnet50(pretrained=True)
         torch.save(resnet.state_dict(), cv_path / "resnet50.pth")
         
+        # Backbone configuré, s'il diffère de ResNet50 (ex: mobilenet_v3_small)
+        from src.cv_module.backbones import has_pretrained_weights
+        backbone = CV_CONFIG['model_name']
+        if backbone != "resnet50" and has_pretrained_weights(backbone):
+            print(f"  - {backbone}...")
+            self.download_backbone(backbone)
+        
         # 2. Télécharger CamemBERT
         nlp_path = self.models_dir / "nlp"
         nlp_path.mkdir(exist_ok=True)
@@ -41,6 +54,9 @@ class OfflineModelManager:
         
     def load_resnet50(self):
         """Charge ResNet50 depuis le stockage local"""
+        import torch
+        import torchvision.models as models
+        
         if 'resnet50' in self.loaded_models:
             return self.loaded_models['resnet50']
         
@@ -56,10 +72,83 @@ class OfflineModelManager:
         self.logger.info("✅ ResNet50 chargé depuis le stockage local")
         return model
     
+    def download_backbone(self, name):
+        """Télécharge les poids ImageNet d'un backbone CV (nécessite internet)"""
+        import torch
+        from src.cv_module.backbones import download_pretrained
+        
+        cv_path = self.models_dir / "cv"
+        cv_path.mkdir(exist_ok=True)
+        
+        model = download_pretrained(name)
+        torch.save(model.state_dict(), cv_path / f"{name}.pth")
+        self.logger.info(f"✅ {name} sauvegardé: {cv_path / f'{name}.pth'}")
+    
+    def load_pretrained_backbone(self, name):
+        """Construit un backbone et charge ses poids ImageNet locaux s'ils existent"""
+        import torch
+        from src.cv_module.backbones import build_backbone
+        
+        model = build_backbone(name)
+        weights_path = self.models_dir / "cv" / f"{name}.pth"
+        if weights_path.exists():
+            model.load_state_dict(torch.load(weights_path, map_location='cpu'))
+            self.logger.info(f"✅ Poids pré-entraînés {name} chargés")
+        else:
+            self.logger.warning(f"⚠️ Pas de poids pré-entraînés pour {name}: initialisation aléatoire")
+        return model
+    
+    def cv_checkpoint_path(self, backbone=None):
+        """Chemin du modèle CV entraîné sur nos classes de documents"""
+        backbone = backbone or CV_CONFIG['model_name']
+        return self.models_dir / "cv" / f"{backbone}_documents.pth"
+    
+    def cv_artifact_path(self, backbone=None):
+        """Fichier chargé pour le modèle CV entraîné selon le backend configuré (.pth ou .onnx)"""
+        backbone = backbone or CV_CONFIG['model_name']
+        if INFERENCE_CONFIG['backend'] == 'onnx':
+            return self.onnx_path(f"{backbone}_documents", INFERENCE_CONFIG['quantized'])
+        return self.cv_checkpoint_path(backbone)
+    
+    def text_classifier_path(self):
+        """Chemin du classifieur de texte TF-IDF entraîné sur nos classes"""
+        return self.models_dir / "nlp" / TEXT_CLASSIFIER_CONFIG['model_file']
+    
+    def load_cv_model(self, backbone=None):
+        """Charge le modèle CV entraîné (backbone configurable) depuis le stockage local"""
+        import torch
+        from src.cv_module.backbones import build_backbone
+        
+        backbone = backbone or CV_CONFIG['model_name']
+        key = f"{backbone}_documents"
+        if key in self.loaded_models:
+            return self.loaded_models[key]
+        
+        checkpoint_path = self.cv_checkpoint_path(backbone)
+        if not checkpoint_path.exists():
+            raise FileNotFoundError(
+                f"Modèle CV introuvable: {checkpoint_path} (lancer scripts/train_cv_backbones.py)"
+            )
+        
+        checkpoint = torch.load(checkpoint_path, map_location='cpu')
+        if list(checkpoint['classes']) != list(CLASSES):
+            raise ValueError(f"Classes du modèle CV incompatibles: {checkpoint['classes']}")
+        
+        model = build_backbone(backbone, num_classes=len(CLASSES))
+        model.load_state_dict(checkpoint['state_dict'])
+        model.eval()
+        
+        self.loaded_models[key] = model
+        self.logger.info(f"✅ Modèle CV {backbone} chargé depuis le stockage local")
+        return model
+    
     def load_camembert(self):
         """Charge CamemBERT depuis le stockage local"""
+        from transformers import CamembertModel, CamembertTokenizer
+        
         if 'camembert' in self.loaded_models:
-            return self.loaded_models['camembert']
+            cached = self.loaded_models['camembert']
+            return cached['model'], cached['tokenizer']
         
         nlp_path = self.models_dir / "nlp" / "camembert"
         if not nlp_path.exists():
@@ -73,6 +162,139 @@ class OfflineModelManager:
         self.logger.info("✅ CamemBERT chargé depuis le stockage local")
         return model, tokenizer
     
+    def load_camembert_tokenizer(self):
+        """Charge uniquement le tokenizer CamemBERT (sentencepiece, sans torch)"""
+        from transformers import CamembertTokenizer
+        
+        nlp_path = self.models_dir / "nlp" / "camembert"
+        if not nlp_path.exists():
+            raise FileNotFoundError(f"Tokenizer CamemBERT introuvable: {nlp_path}")
+        
+        return CamembertTokenizer.from_pretrained(str(nlp_path))
+    
+    def onnx_path(self, model_name, quantized=False):
+        """Chemin du graphe ONNX d'un modèle (cv/ ou nlp/)"""
+        subdir = "nlp" if model_name == "camembert" else "cv"
+        suffix = ".int8.onnx" if quantized else ".onnx"
+        return self.models_dir / subdir / f"{model_name}{suffix}"
+    
+    def export_onnx(self, quantize=False):
+        """Exporte ResNet50 et CamemBERT en graphes ONNX optimisés (option int8)"""
+        import torch
+        
+        opset = INFERENCE_CONFIG['onnx_opset']
+        exported = []
+        
+        # 1. ResNet50: entrée (batch, 3, 224, 224), batch dynamique
+        resnet = self.load_resnet50()
+        resnet_path = self.onnx_path("resnet50")
+        torch.onnx.export(
+            resnet, torch.randn(1, 3, 224, 224), str(resnet_path),
+            input_names=['pixel_values'], output_names=['logits'],
+            dynamic_axes={'pixel_values': {0: 'batch'}, 'logits': {0: 'batch'}},
+            opset_version=opset, do_constant_folding=True
+        )
+        exported.append(resnet_path)
+        self.logger.info(f"✅ ResNet50 exporté: {resnet_path}")
+        
+        # 2. CamemBERT: entrées (batch, séquence), axes dynamiques
+        model, tokenizer = self.load_camembert()
+        camembert_path = self.onnx_path("camembert")
+        sample = tokenizer("Facture d'électricité", return_tensors='pt')
+        
+        class _HiddenStates(torch.nn.Module):
+            """Expose uniquement last_hidden_state (sortie tensorielle simple)"""
+            def __init__(self, model):
+                super().__init__()
+                self.model = model
+            
+            def forward(self, input_ids, attention_mask):
+                return self.model(input_ids=input_ids, attention_mask=attention_mask)[0]
+        
+        torch.onnx.export(
+            _HiddenStates(model), (sample['input_ids'], sample['attention_mask']),
+            str(camembert_path),
+            input_names=['input_ids', 'attention_mask'], output_names=['last_hidden_state'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'last_hidden_state': {0: 'batch', 1: 'sequence'}
+            },
+            opset_version=opset, do_constant_folding=True
+        )
+        exported.append(camembert_path)
+        self.logger.info(f"✅ CamemBERT exporté: {camembert_path}")
+        
+        # 3. Modèle CV entraîné sur nos documents, s'il existe
+        model_names = ["resnet50", "camembert"]
+        if self.cv_checkpoint_path().exists():
+            cv_name = f"{CV_CONFIG['model_name']}_documents"
+            cv_path = self.onnx_path(cv_name)
+            torch.onnx.export(
+                self.load_cv_model(), torch.randn(1, 3, 224, 224), str(cv_path),
+                input_names=['pixel_values'], output_names=['logits'],
+                dynamic_axes={'pixel_values': {0: 'batch'}, 'logits': {0: 'batch'}},
+                opset_version=opset, do_constant_folding=True
+            )
+            exported.append(cv_path)
+            model_names.append(cv_name)
+            self.logger.info(f"✅ {cv_name} exporté: {cv_path}")
+        
+        # 4. Quantification dynamique int8 (poids), optionnelle
+        if quantize:
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            
+            for model_name in model_names:
+                source = self.onnx_path(model_name)
+                target = self.onnx_path(model_name, quantized=True)
+                quantize_dynamic(str(source), str(target), weight_type=QuantType.QInt8)
+                exported.append(target)
+                self.logger.info(f"✅ {model_name} quantifié int8: {target}")
+        
+        return exported
+    
+    def load_backend(self, model_name, backend=None, quantized=None):
+        """
+        Retourne un backend d'inférence pour un modèle
+        
+        Args:
+            model_name: 'resnet50', 'camembert' ou '<backbone>_documents'
+            backend: 'torch' ou 'onnx' (défaut: INFERENCE_CONFIG)
+            quantized: graphe int8 pour le backend ONNX
+        """
+        from src.utils.inference_backends import TorchBackend, OnnxRuntimeBackend
+        
+        backend = backend or INFERENCE_CONFIG['backend']
+        if quantized is None:
+            quantized = INFERENCE_CONFIG['quantized']
+        
+        key = f"{model_name}:{backend}:{'int8' if quantized else 'fp32'}"
+        if key in self.loaded_models:
+            return self.loaded_models[key]
+        
+        if backend == 'onnx':
+            path = self.onnx_path(model_name, quantized)
+            if not path.exists():
+                raise FileNotFoundError(
+                    f"Graphe ONNX introuvable: {path} (lancer scripts/export_onnx.py)"
+                )
+            runner = OnnxRuntimeBackend(path)
+        elif backend == 'torch':
+            if model_name == 'camembert':
+                runner = TorchBackend(self.load_camembert()[0], output_key='last_hidden_state')
+            elif model_name == 'resnet50':
+                runner = TorchBackend(self.load_resnet50())
+            elif model_name.endswith('_documents'):
+                runner = TorchBackend(self.load_cv_model(model_name[:-len('_documents')]))
+            else:
+                raise ValueError(f"Modèle inconnu: {model_name}")
+        else:
+            raise ValueError(f"Backend d'inférence inconnu: {backend}")
+        
+        self.loaded_models[key] = runner
+        self.logger.info(f"✅ Backend {backend} prêt pour {model_name}")
+        return runner
+    
     def verify_offline_setup(self):
         """Vérifie que tout fonctionne en mode offline"""
         checks = {
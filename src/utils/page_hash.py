@@ -0,0 +1,114 @@
+import threading
+import cv2
+import numpy as np
+
+from src.config.config import DEDUP_CONFIG
+
+
+def dhash(gray, hash_size=8):
+    """Hash perceptuel par différence (dHash) d'une page en niveaux de gris"""
+    # Vignette (hash_size+1) x hash_size: chaque bit compare deux pixels voisins
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def thumbnail(gray, size=32):
+    """Vignette carrée utilisée pour la vérification fine d'un quasi-doublon"""
+    return cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA)
+
+
+def hamming_distances(hashes, value):
+    """Distances de Hamming vectorisées entre un hash et un tableau de hashes uint64"""
+    xor = np.bitwise_xor(hashes, np.uint64(value))
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(xor)
+    return np.unpackbits(xor.view(np.uint8)).reshape(len(xor), 64).sum(axis=1)
+
+
+class PerceptualHashIndex:
+    """Index mémoire de pages déjà classifiées, interrogé par distance de Hamming"""
+
+    def __init__(self, max_hamming=None, verify_max_diff=None, max_entries=None):
+        self.max_hamming = max_hamming if max_hamming is not None else DEDUP_CONFIG['max_hamming']
+        self.verify_max_diff = verify_max_diff or DEDUP_CONFIG['verify_max_diff']
+        self.max_entries = max_entries or DEDUP_CONFIG['max_entries']
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Vide l'index et ses statistiques"""
+        with self._lock:
+            self._hashes = np.zeros(1024, dtype=np.uint64)
+            self._thumbnails = []
+            self._entries = []
+            self._count = 0
+            self.lookups = 0
+            self.reused = 0
+
+    def lookup(self, page_hash, thumb):
+        """
+        Cherche une page quasi identique déjà classifiée
+
+        Returns:
+            (page_ref, result, distance) ou None si aucun candidat n'est vérifié
+        """
+        with self._lock:
+            self.lookups += 1
+            if self._count == 0:
+                return None
+
+            distances = hamming_distances(self._hashes[:self._count], page_hash)
+            candidates = np.flatnonzero(distances <= self.max_hamming)
+
+            # Vérification peu coûteuse: écart moyen entre vignettes, du plus proche au plus lointain
+            for idx in candidates[np.argsort(distances[candidates], kind='stable')]:
+                diff = cv2.absdiff(self._thumbnails[idx], thumb).mean()
+                if diff <= self.verify_max_diff:
+                    self.reused += 1
+                    page_ref, result = self._entries[idx]
+                    return page_ref, result, int(distances[idx])
+
+            return None
+
+    def add(self, page_hash, thumb, page_ref, result):
+        """Enregistre une page classifiée"""
+        with self._lock:
+            if self._count >= self.max_entries:
+                return
+
+            if self._count == len(self._hashes):
+                self._hashes = np.concatenate([self._hashes, np.zeros_like(self._hashes)])
+
+            self._hashes[self._count] = page_hash
+            self._thumbnails.append(thumb)
+            self._entries.append((page_ref, result))
+            self._count += 1
+
+    def merge(self, other):
+        """Ajoute les pages d'un autre index (plage d'un gros PDF) dans leur ordre d'ajout"""
+        with other._lock:
+            hashes = other._hashes[:other._count].copy()
+            thumbnails = list(other._thumbnails)
+            entries = list(other._entries)
+            reused = other.reused
+
+        for page_hash, thumb, (page_ref, result) in zip(hashes, thumbnails, entries):
+            self.add(int(page_hash), thumb, page_ref, result)
+        with self._lock:
+            self.reused += reused
+
+    def report(self):
+        """Statistiques de réutilisation pour le rapport"""
+        with self._lock:
+            return {
+                'max_hamming': self.max_hamming,
+                'indexed_pages': self._count,
+                'lookups': self.lookups,
+                'reused': self.reused,
+                'reuse_rate': self.reused / self.lookups if self.lookups else 0.0
+            }
@@ -0,0 +1,225 @@
+import os
+import time
+import logging
+import multiprocessing
+from collections import namedtuple
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+try:
+    import psutil
+except ImportError:  # psutil est optionnel: repli sur os.kill(pid, 0)
+    psutil = None
+
+from src.config.config import PAGE_POOL_CONFIG
+
+
+# Référence à une page du pool: seul ce tuple traverse les files entre processus
+PageHandle = namedtuple('PageHandle', ['slot', 'generation', 'shape', 'dtype'])
+
+
+class StaleHandleError(Exception):
+    """Le slot d'une page a été libéré (ou réattribué) depuis la création du handle"""
+
+
+def _pid_alive(pid):
+    """Vrai si le processus existe encore"""
+    if psutil is not None:
+        return psutil.pid_exists(pid)
+    if os.name == 'nt':
+        return True  # Sans psutil, pas de test fiable: le slot n'est pas récupéré
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SharedPagePool:
+    """
+    Pool de pages en mémoire partagée: anneau de slots de taille fixe
+
+    Un seul bloc multiprocessing.shared_memory est découpé en slots. Le
+    processus de rendu écrit une page dans un slot et n'envoie aux workers
+    qu'un PageHandle (quelques octets); chaque worker lit la page comme une
+    vue NumPy sur le bloc, sans copie ni pickle. L'état des slots (pid du
+    détenteur, génération) est partagé: un slot détenu par un processus mort
+    est récupéré par reclaim()/reclaim_dead(), et la génération rend
+    inoffensif un handle périmé. Une page publiée (put) reste au processus
+    de rendu jusqu'au claim() d'un worker: si ce worker meurt entre la
+    lecture du handle et le claim, le slot est récupéré au bout de
+    claim_timeout par reclaim_unclaimed() (appelé aussi quand acquire attend).
+
+    Le pool se transmet aux workers en argument de Process (les verrous et
+    sémaphores ne se partagent que par héritage).
+    """
+
+    def __init__(self, slots=None, slot_mb=None, context=None):
+        self.slots = slots or PAGE_POOL_CONFIG['slots']
+        self.slot_bytes = int((slot_mb or PAGE_POOL_CONFIG['slot_mb']) * 1024 * 1024)
+        context = context or multiprocessing.get_context('spawn')
+
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_bytes)
+        self.name = self.shm.name
+        self.creator_pid = os.getpid()
+
+        self._lock = context.Lock()
+        self._free = context.Semaphore(self.slots)
+        self._owners = context.Array('q', self.slots, lock=False)       # 0 = slot libre
+        self._generations = context.Array('q', self.slots, lock=False)
+        self._published = context.Array('d', self.slots, lock=False)     # 0 = réclamé ou en écriture
+        self._cursor = context.Value('q', 0, lock=False)
+
+        self.logger = logging.getLogger(__name__)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['shm']
+        del state['logger']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.logger = logging.getLogger(__name__)
+        try:
+            # Python >= 3.13: un worker qui s'attache ne doit pas supprimer le bloc à sa sortie
+            self.shm = shared_memory.SharedMemory(name=self.name, track=False)
+        except TypeError:
+            self.shm = shared_memory.SharedMemory(name=self.name)
+
+    def acquire(self, timeout=None):
+        """
+        Réserve le prochain slot libre de l'anneau pour le processus courant
+
+        Bloque tant que tous les slots sont pris (contre-pression sur le rendu).
+        """
+        timeout = PAGE_POOL_CONFIG['acquire_timeout'] if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        # Pool plein: les slots de workers morts ou jamais réclamés sont récupérés
+        while not self._free.acquire(timeout=min(1.0, max(0.0, deadline - time.monotonic()))):
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Aucun slot libre dans le pool de pages après {timeout}s")
+            self.reclaim_dead()
+            self.reclaim_unclaimed()
+
+        with self._lock:
+            for offset in range(self.slots):
+                slot = (self._cursor.value + offset) % self.slots
+                if self._owners[slot] == 0:
+                    self._owners[slot] = os.getpid()
+                    self._generations[slot] += 1
+                    self._published[slot] = 0.0
+                    self._cursor.value = (slot + 1) % self.slots
+                    return slot
+
+        # Sémaphore et table désynchronisés (ne devrait pas arriver)
+        self._free.release()
+        raise RuntimeError("Pool de pages incohérent: aucun slot libre")
+
+    def _view(self, slot, shape, dtype):
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        if nbytes > self.slot_bytes:
+            raise ValueError(
+                f"Page de {nbytes / 1e6:.1f} Mo trop grande pour un slot de {self.slot_bytes / 1e6:.1f} Mo"
+            )
+        return np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+
+    def put(self, page, timeout=None):
+        """Copie une page (tableau NumPy ou image PIL) dans un slot et retourne son handle"""
+        page = np.asarray(page)
+        slot = self.acquire(timeout)
+        try:
+            np.copyto(self._view(slot, page.shape, page.dtype), page)
+        except Exception:
+            self._release_slot(slot, self._generations[slot])
+            raise
+        # Page publiée: le délai de claim court à partir d'ici
+        self._published[slot] = time.time()
+        return PageHandle(slot, self._generations[slot], page.shape, page.dtype.str)
+
+    def _check(self, handle):
+        if self._generations[handle.slot] != handle.generation or self._owners[handle.slot] == 0:
+            raise StaleHandleError(f"Slot {handle.slot} libéré ou réattribué")
+
+    def view(self, handle):
+        """Vue NumPy (sans copie) sur la page d'un handle"""
+        self._check(handle)
+        return self._view(handle.slot, handle.shape, handle.dtype)
+
+    def claim(self, handle):
+        """Transfère la page au processus courant (le worker qui la traite)"""
+        with self._lock:
+            self._check(handle)
+            self._owners[handle.slot] = os.getpid()
+            self._published[handle.slot] = 0.0
+
+    def _release_slot(self, slot, generation):
+        with self._lock:
+            if self._generations[slot] != generation or self._owners[slot] == 0:
+                return False
+            self._owners[slot] = 0
+        self._free.release()
+        return True
+
+    def release(self, handle):
+        """Rend le slot d'une page au pool (sans effet si le handle est périmé)"""
+        return self._release_slot(handle.slot, handle.generation)
+
+    @contextmanager
+    def borrow(self, handle):
+        """Détient la page le temps du traitement: vue NumPy, puis libération du slot"""
+        self.claim(handle)
+        try:
+            yield self.view(handle)
+        finally:
+            self.release(handle)
+
+    def reclaim(self, pid):
+        """Libère les slots détenus par un processus disparu; retourne leur nombre"""
+        with self._lock:
+            slots = [slot for slot in range(self.slots) if self._owners[slot] == pid]
+            for slot in slots:
+                self._owners[slot] = 0
+        for _ in slots:
+            self._free.release()
+        if slots:
+            self.logger.warning(f"♻️ {len(slots)} slot(s) de pages récupéré(s) du processus {pid}")
+        return len(slots)
+
+    def reclaim_unclaimed(self, timeout=None):
+        """Libère les pages publiées mais réclamées par aucun worker depuis timeout secondes"""
+        timeout = PAGE_POOL_CONFIG['claim_timeout'] if timeout is None else timeout
+        limit = time.time() - timeout
+        with self._lock:
+            slots = [
+                slot for slot in range(self.slots)
+                if self._owners[slot] and 0.0 < self._published[slot] <= limit
+            ]
+            for slot in slots:
+                self._owners[slot] = 0
+                self._published[slot] = 0.0
+        for _ in slots:
+            self._free.release()
+        if slots:
+            self.logger.warning(f"♻️ {len(slots)} page(s) jamais réclamée(s) libérée(s) après {timeout}s")
+        return len(slots)
+
+    def reclaim_dead(self):
+        """Libère les slots de tous les détenteurs qui ne tournent plus"""
+        owners = {pid for pid in self._owners[:] if pid}
+        return sum(self.reclaim(pid) for pid in owners if not _pid_alive(pid))
+
+    def in_use(self):
+        """Nombre de slots détenus"""
+        return sum(1 for pid in self._owners[:] if pid)
+
+    def close(self):
+        """Détache le bloc du processus courant (et le supprime s'il l'a créé)"""
+        self.shm.close()
+        if os.getpid() == self.creator_pid:
+            self.shm.unlink()
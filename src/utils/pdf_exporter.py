@@ -0,0 +1,109 @@
+import re
+import time
+import logging
+from collections import defaultdict
+from pathlib import Path
+
+from PyPDF2 import PdfReader, PdfWriter
+
+from src.config.config import EXPORT_CONFIG
+
+
+class ClassPDFExporter:
+    """
+    Export des pages classées en PDF par classe, par copie des pages d'origine
+
+    Les pages ne sont pas re-rendues: PyPDF2 recopie les objets de page du
+    PDF source (texte, images et qualité d'origine conservés). Les pages sont
+    mises en tampon et écrites par lot: un fichier par classe et par lot,
+    <classe>/<prefix>_<lot>.pdf.
+    """
+
+    def __init__(self, output_dir, prefix="lot", flush_every=None):
+        self.output_dir = Path(output_dir)
+        self.prefix = re.sub(r'[^\w.-]', '_', prefix)
+        self.flush_every = flush_every or EXPORT_CONFIG['flush_every']
+        self.logger = logging.getLogger(__name__)
+
+        self.batch = 1
+        self.pending = defaultdict(list)   # dossier -> [(pdf source, index de page)]
+        self.pending_documents = 0
+
+        self.files = 0
+        self.pages = 0
+        self.bytes = 0
+        self.flush_seconds = 0.0
+
+    def _batch_file(self, folder):
+        return self.output_dir / folder / f"{self.prefix}_{self.batch:05d}.pdf"
+
+    def add(self, pdf_path, page_index, folder):
+        """
+        Ajoute une page au tampon de son dossier (classe ou a_verifier)
+
+        pdf_path: chemin du PDF source, ou InputItem (membre d'archive lu en mémoire)
+
+        Returns:
+            dict: fichier de sortie et numéro de page (1-based) qu'aura la page
+        """
+        pages = self.pending[folder]
+        pages.append((pdf_path, page_index))
+        return {'file': str(self._batch_file(folder)), 'page': len(pages)}
+
+    def document_done(self):
+        """Signale la fin d'un PDF source; écrit le lot quand il est complet"""
+        self.pending_documents += 1
+        if self.pending_documents >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Écrit un PDF par dossier pour les pages en tampon"""
+        if not self.pending:
+            return
+
+        start = time.perf_counter()
+        handles = {}
+        try:
+            # Chaque PDF source est ouvert une seule fois par lot; les flux
+            # restent ouverts jusqu'à l'écriture (PyPDF2 lit les pages à la demande)
+            readers = {}
+            for folder, pages in self.pending.items():
+                writer = PdfWriter()
+                for source, page_index in pages:
+                    key = str(source)
+                    if key not in readers:
+                        handles[key] = source.open() if hasattr(source, 'open') else open(source, 'rb')
+                        readers[key] = PdfReader(handles[key])
+                    writer.add_page(readers[key].pages[page_index])
+
+                output_file = self._batch_file(folder)
+                output_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(output_file, 'wb') as f:
+                    writer.write(f)
+
+                self.files += 1
+                self.pages += len(pages)
+                self.bytes += output_file.stat().st_size
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+        elapsed = time.perf_counter() - start
+        self.flush_seconds += elapsed
+        self.logger.info(
+            f"💾 Lot {self.batch}: {sum(len(p) for p in self.pending.values())} page(s) "
+            f"exportée(s) dans {len(self.pending)} PDF(s) en {elapsed:.2f}s"
+        )
+
+        self.pending = defaultdict(list)
+        self.pending_documents = 0
+        self.batch += 1
+
+    def report(self):
+        """Statistiques d'export (fichiers, pages, octets écrits, temps d'écriture)"""
+        return {
+            'files': self.files,
+            'pages': self.pages,
+            'bytes': self.bytes,
+            'flush_seconds': round(self.flush_seconds, 3)
+        }
@@ -0,0 +1,110 @@
+import os
+import logging
+
+from src.config.config import RESOURCE_CONFIG
+
+
+# Threads par instance du dernier budget appliqué au processus (CoreBudget.apply)
+_applied_threads = None
+
+
+def applied_threads():
+    """Threads par instance fixés par CoreBudget.apply, ou None si aucun budget appliqué"""
+    return _applied_threads
+
+
+def available_cores():
+    """Cœurs utilisables par le processus (affinité comprise si disponible)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class CoreBudget:
+    """
+    Répartition d'un budget de cœurs entre workers
+
+    Chaque worker reçoit total_cores // workers threads, appliqués à
+    Tesseract (OMP_THREAD_LIMIT, hérité par ses sous-processus), OpenCV,
+    torch et aux sessions ONNX Runtime créées ensuite (applied_threads). Quand un worker traite plusieurs plages de pages en parallèle
+    (page_workers), ses threads sont partagés entre ces instances. Avec
+    pin=True, chaque worker est épinglé sur sa tranche de cœurs.
+    """
+
+    def __init__(self, total_cores=None, workers=1, pin=None):
+        self.total_cores = total_cores or RESOURCE_CONFIG['total_cores'] or available_cores()
+        self.workers = max(1, workers)
+        self.pin = RESOURCE_CONFIG['pin_cpus'] if pin is None else pin
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def threads_per_worker(self):
+        """Threads alloués à chaque worker (au moins 1)"""
+        return max(1, self.total_cores // self.workers)
+
+    def cores_for(self, worker_index):
+        """Tranche de cœurs attribuée à un worker (pour l'épinglage)"""
+        if hasattr(os, 'sched_getaffinity'):
+            cores = sorted(os.sched_getaffinity(0))
+        else:
+            cores = list(range(os.cpu_count() or 1))
+
+        start = (worker_index * self.threads_per_worker) % len(cores)
+        return [cores[(start + i) % len(cores)] for i in range(self.threads_per_worker)]
+
+    def apply(self, worker_index=0, page_workers=1):
+        """
+        Applique le budget au processus courant et retourne la configuration effective
+
+        page_workers: plages de pages traitées en parallèle par le worker;
+        chaque instance (Tesseract, OpenCV) reçoit threads // page_workers
+        threads, pour ne pas dépasser le budget du worker
+        """
+        global _applied_threads
+        page_workers = max(1, page_workers)
+        threads = max(1, self.threads_per_worker // page_workers)
+        tesseract_threads = RESOURCE_CONFIG['tesseract_threads'] or threads
+        _applied_threads = threads
+
+        # Tesseract (OpenMP) lit OMP_THREAD_LIMIT au lancement de chaque sous-processus
+        os.environ['OMP_THREAD_LIMIT'] = str(tesseract_threads)
+        os.environ['OMP_NUM_THREADS'] = str(threads)
+
+        applied = {
+            'worker_index': worker_index,
+            'page_workers': page_workers,
+            'threads': threads,
+            'tesseract_threads': tesseract_threads,
+            'opencv_threads': None,
+            'torch_threads': None,
+            'cpu_affinity': None
+        }
+
+        try:
+            import cv2
+            cv2.setNumThreads(threads)
+            applied['opencv_threads'] = cv2.getNumThreads()
+        except ImportError:
+            pass
+
+        try:
+            import torch
+            torch.set_num_threads(threads)
+            applied['torch_threads'] = torch.get_num_threads()
+        except ImportError:
+            pass
+
+        if self.pin:
+            if hasattr(os, 'sched_setaffinity'):
+                cores = self.cores_for(worker_index)
+                os.sched_setaffinity(0, cores)
+                applied['cpu_affinity'] = cores
+            else:
+                self.logger.warning("⚠️ Épinglage CPU non supporté sur cette plateforme")
+
+        self.logger.info(
+            f"⚙️ Budget cœurs: {self.total_cores} cœur(s) / {self.workers} worker(s) -> "
+            f"{self.threads_per_worker} thread(s) par worker, {threads} par plage de pages "
+            f"({page_workers} en parallèle)"
+        )
+        return applied
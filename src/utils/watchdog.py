@@ -0,0 +1,177 @@
+import math
+import threading
+import time
+import logging
+from collections import Counter
+from contextlib import contextmanager
+
+from src.config.config import DEADLINE_CONFIG
+
+
+class StageTimeout(Exception):
+    """Une étape (ou la page entière) a dépassé son budget de temps"""
+
+    def __init__(self, stage, budget, elapsed=None):
+        self.stage = stage
+        self.budget = budget
+        self.elapsed = budget if elapsed is None else elapsed
+        super().__init__(f"Délai dépassé à l'étape {stage} ({self.elapsed:.1f}s / {budget:.1f}s)")
+
+
+class Deadline:
+    """
+    Budget de temps d'une page, découpé en budgets par étape
+
+    Les étapes en sous-processus (Tesseract, poppler) reçoivent leur budget
+    comme timeout; les étapes en Python/OpenCV, non interruptibles, sont
+    vérifiées à chaque frontière d'étape. Sans budget (None), tout est permis.
+    """
+
+    def __init__(self, page_seconds=None, stage_seconds=None):
+        self.page_seconds = page_seconds
+        self.stage_seconds = stage_seconds or {}
+        self.start = time.monotonic()
+        self.stage_name = None
+
+    @classmethod
+    def from_config(cls):
+        """Deadline de page selon DEADLINE_CONFIG (aucune limite si désactivé)"""
+        if not DEADLINE_CONFIG['enabled']:
+            return cls()
+        return cls(DEADLINE_CONFIG['page_seconds'], DEADLINE_CONFIG['stage_seconds'])
+
+    def elapsed(self):
+        return time.monotonic() - self.start
+
+    def remaining(self):
+        if self.page_seconds is None:
+            return None
+        return self.page_seconds - self.elapsed()
+
+    def expired(self):
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def check(self, stage):
+        """Lève StageTimeout si le budget de la page est épuisé"""
+        if self.expired():
+            raise StageTimeout(stage, self.page_seconds, self.elapsed())
+
+    def timeout_for(self, stage):
+        """Timeout (s) à passer à un sous-processus: min(budget d'étape, reste de la page)"""
+        budgets = [b for b in (self.stage_seconds.get(stage), self.remaining()) if b is not None]
+        if not budgets:
+            return 0  # 0 = pas de timeout (pytesseract / pdf2image)
+        return max(min(budgets), 0.001)
+
+    @contextmanager
+    def stage(self, name):
+        """Encadre une étape: vérifie le budget de la page avant et après, et celui de l'étape"""
+        self.check(name)
+        self.stage_name = name
+        start = time.monotonic()
+        yield
+        budget = self.stage_seconds.get(name)
+        elapsed = time.monotonic() - start
+        if budget is not None and elapsed > budget:
+            raise StageTimeout(name, budget, elapsed)
+        self.check(name)
+
+
+class Watchdog:
+    """
+    Surveillance des pages en cours
+
+    Un thread signale les pages qui dépassent leur budget (une étape non
+    interruptible qui ne rend pas la main) et publie un battement de
+    progression, lu par le superviseur des workers pour redémarrer un
+    processus bloqué ou planté.
+    """
+
+    def __init__(self, interval=None, progress=None):
+        self.interval = interval or DEADLINE_CONFIG['watchdog_interval']
+        self.progress = progress   # multiprocessing.Value('d') partagé (optionnel)
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._active = {}
+        self._thread = None
+        self.overdue_pages = 0
+
+        self.beat()
+
+    def reset(self):
+        """Remet les compteurs à zéro (début de lot)"""
+        with self._lock:
+            self.overdue_pages = 0
+
+    def beat(self):
+        """Signale une progression (fin de page ou de document)"""
+        if self.progress is not None:
+            self.progress.value = time.time()
+
+    @contextmanager
+    def watch(self, deadline, label):
+        """Enregistre une page en cours auprès du watchdog"""
+        token = object()
+        with self._lock:
+            self._active[token] = [deadline, label, False]
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, daemon=True)
+                self._thread.start()
+        try:
+            yield
+        finally:
+            with self._lock:
+                del self._active[token]
+            self.beat()
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                for entry in self._active.values():
+                    deadline, label, reported = entry
+                    if not reported and deadline.expired():
+                        entry[2] = True
+                        self.overdue_pages += 1
+                        self.logger.warning(
+                            f"⏰ {label}: budget de {deadline.page_seconds}s dépassé "
+                            f"pendant l'étape {deadline.stage_name}"
+                        )
+
+
+def _percentile(sorted_values, q):
+    """Percentile par rang (valeur observée la plus proche)"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return round(sorted_values[rank - 1], 3)
+
+
+def latency_report(pages, document_timeouts=None):
+    """
+    Latences par page (p50/p95/p99/max) et délais dépassés par étape
+
+    Args:
+        pages: résultats de pages (clés page_time, timeout)
+        document_timeouts: étapes des documents abandonnés avant les pages (rendu)
+    """
+    computed = [r for r in pages if 'page_time' in r and 'duplicate_of' not in r]
+    times = sorted(r['page_time'] for r in computed)
+
+    timeouts = Counter(r['timeout']['stage'] for r in computed if r.get('timeout'))
+    timeouts.update(document_timeouts or [])
+
+    return {
+        'pages': len(times),
+        'timeouts': dict(timeouts),
+        'timeout_pages': sum(1 for r in computed if r.get('timeout')),
+        'p50_seconds': _percentile(times, 0.50),
+        'p95_seconds': _percentile(times, 0.95),
+        'p99_seconds': _percentile(times, 0.99),
+        'max_seconds': round(times[-1], 3) if times else None
+    }
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+import logging
+
+from src.config.config import QUEUE_CONFIG
+
+
+def default_worker_id():
+    """Identifiant unique d'un worker: hôte + pid"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """
+    File de travail durable (SQLite) partagée entre plusieurs workers
+
+    Chaque PDF est réclamé avec un bail (visibility timeout). Un bail expiré
+    remet le PDF à disposition des autres workers; après max_attempts
+    tentatives le PDF est marqué en échec. Les résultats sont écrits dans
+    un dossier à côté de la base puis combinés par merge().
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            path TEXT PRIMARY KEY,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lease_owner TEXT,
+            lease_expires REAL,
+            last_error TEXT,
+            result_file TEXT,
+            updated_at REAL,
+            priority REAL NOT NULL DEFAULT 0
+        )
+    """
+
+    def __init__(self, db_path, visibility_timeout=None, max_attempts=None):
+        self.db_path = Path(db_path)
+        self.results_dir = self.db_path.with_name(self.db_path.name + ".results")
+        self.visibility_timeout = visibility_timeout or QUEUE_CONFIG['visibility_timeout']
+        self.max_attempts = max_attempts or QUEUE_CONFIG['max_attempts']
+        self.logger = logging.getLogger(__name__)
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+
+        with closing(self._connect()) as conn:
+            conn.execute(self.SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+            # Files créées avant l'ordonnancement par coût
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if 'priority' not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN priority REAL NOT NULL DEFAULT 0")
+
+    def _connect(self):
+        """Connexion en autocommit (transactions explicites pour les baux)"""
+        conn = sqlite3.connect(
+            str(self.db_path), timeout=QUEUE_CONFIG['busy_timeout'], isolation_level=None
+        )
+        conn.execute(f"PRAGMA journal_mode={QUEUE_CONFIG['journal_mode']}")
+        return conn
+
+    def enqueue(self, paths, costs=None):
+        """
+        Ajoute des PDFs à la file (les doublons sont ignorés)
+
+        costs: temps prévu par chemin; les PDFs les plus longs sont réclamés
+        en premier (longest-first) pour réduire le temps total du lot
+        """
+        now = time.time()
+        costs = costs or {}
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (path, updated_at, priority) VALUES (?, ?, ?)",
+                ((str(p), now, costs.get(str(p), 0.0)) for p in paths)
+            )
+            added = conn.total_changes - before
+            conn.execute("COMMIT")
+        return added
+
+    def claim(self, worker_id):
+        """Réclame le prochain PDF disponible (ou None si aucun)"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE: un seul worker à la fois peut poser un bail
+            conn.execute("BEGIN IMMEDIATE")
+
+            # Baux expirés ayant épuisé leurs tentatives -> échec définitif
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', lease_owner = NULL, "
+                "last_error = COALESCE(last_error, 'bail expiré'), updated_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+
+            row = conn.execute(
+                "SELECT path FROM jobs "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY attempts, priority DESC, rowid LIMIT 1",
+                (now,)
+            ).fetchone()
+
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE path = ?",
+                (worker_id, now + self.visibility_timeout, now, row[0])
+            )
+            conn.execute("COMMIT")
+            return row[0]
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def heartbeat(self, path, worker_id):
+        """Prolonge le bail d'un PDF en cours de traitement"""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ? "
+                "WHERE path = ? AND lease_owner = ? AND status = 'leased'",
+                (time.time() + self.visibility_timeout, path, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, path, worker_id, result):
+        """
+        Enregistre le résultat d'un PDF et le marque comme terminé
+
+        Seul le détenteur du bail peut terminer le PDF: un worker dont le
+        bail a expiré (PDF réattribué) n'écrase pas le résultat du nouveau
+        détenteur. Retourne False si le bail n'était plus détenu.
+        """
+        # Un fichier par détenteur: l'écriture d'un worker périmé ne touche pas l'autre
+        name = hashlib.sha1(path.encode('utf-8')).hexdigest()
+        owner = hashlib.sha1(worker_id.encode('utf-8')).hexdigest()[:10]
+        result_file = self.results_dir / f"{name}.{owner}.json"
+
+        # Écriture atomique: fichier temporaire puis renommage
+        tmp_file = result_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'path': path, 'worker': worker_id, **result}, f, ensure_ascii=False)
+        os.replace(tmp_file, result_file)
+
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', lease_owner = NULL, result_file = ?, "
+                "last_error = NULL, updated_at = ? WHERE path = ? AND lease_owner = ?",
+                (result_file.name, time.time(), path, worker_id)
+            )
+
+        if cursor.rowcount == 0:
+            result_file.unlink(missing_ok=True)
+            self.logger.warning(f"⚠️ {path}: bail perdu par {worker_id}, résultat ignoré")
+            return False
+        return True
+
+    def fail(self, path, worker_id, error):
+        """Libère un PDF en échec: nouvelle tentative ou échec définitif"""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "lease_owner = NULL, lease_expires = NULL, last_error = ?, updated_at = ? "
+                "WHERE path = ? AND lease_owner = ?",
+                (self.max_attempts, str(error), time.time(), path, worker_id)
+            )
+
+    def release(self, worker_id, error):
+        """Libère tous les baux d'un worker disparu (tué ou planté) sans attendre leur expiration"""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "lease_owner = NULL, lease_expires = NULL, last_error = ?, updated_at = ? "
+                "WHERE status = 'leased' AND lease_owner = ?",
+                (self.max_attempts, str(error), time.time(), worker_id)
+            )
+            return cursor.rowcount
+
+    def stats(self):
+        """Nombre de PDFs par statut"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        counts.update(dict(rows))
+        return counts
+
+    def is_drained(self):
+        """Vrai quand plus aucun PDF n'est en attente ni en cours"""
+        counts = self.stats()
+        return counts['pending'] == 0 and counts['leased'] == 0
+
+    def merge(self):
+        """Combine les résultats de tous les workers en un seul rapport"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT path, status, attempts, last_error, result_file FROM jobs ORDER BY rowid"
+            ).fetchall()
+
+        report = {}
+        for path, status, attempts, last_error, result_file in rows:
+            if status == 'done' and result_file:
+                with open(self.results_dir / result_file, encoding='utf-8') as f:
+                    entry = json.load(f)
+                entry.pop('path', None)
+                report[path] = entry
+            elif status == 'failed':
+                report[path] = {
+                    'results': [],
+                    'processing_time': 0.0,
+                    'pages_count': 0,
+                    'error': last_error,
+                    'attempts': attempts
+                }
+
+        report['_summary'] = {'queue': self.stats()}
+        return report
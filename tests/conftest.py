@@ -0,0 +1,41 @@
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+
+def make_pdf(pages=1):
+    """PDF minimal (pages blanches A4) en octets"""
+    from PyPDF2 import PdfWriter
+
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=595, height=842)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def make_png(size=(8, 6)):
+    """Image PNG minimale en octets"""
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('L', size, color=255).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def pdf_bytes():
+    return make_pdf(pages=2)
+
+
+@pytest.fixture
+def png_bytes():
+    return make_png()
@@ -0,0 +1,99 @@
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from src.utils.input_sources import item_from_name, iter_items
+
+
+def add_to_tar(archive, name, data):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    archive.addfile(info, io.BytesIO(data))
+
+
+@pytest.fixture
+def tree(tmp_path, pdf_bytes, png_bytes):
+    """Dossier d'entrée: PDF et image sur disque, ZIP, TAR et TAR.GZ"""
+    (tmp_path / "sous_dossier").mkdir()
+    (tmp_path / "a.pdf").write_bytes(pdf_bytes)
+    (tmp_path / "sous_dossier" / "scan.png").write_bytes(png_bytes)
+    (tmp_path / "notes.txt").write_text("ignoré")
+
+    with zipfile.ZipFile(tmp_path / "lot.zip", 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("dossier/z.pdf", pdf_bytes)
+        archive.writestr("dossier/z.png", png_bytes)
+        archive.writestr("lisez-moi.txt", "ignoré")
+
+    for name, mode in (("lot.tar", 'w'), ("lot.tar.gz", 'w:gz')):
+        with tarfile.open(tmp_path / name, mode) as archive:
+            add_to_tar(archive, "t.pdf", pdf_bytes)
+            add_to_tar(archive, "t.png", png_bytes)
+            add_to_tar(archive, "autre.txt", b"ignore")
+
+    return tmp_path
+
+
+def items_by_name(root):
+    return {str(item.name)[len(str(root)) + 1:]: item for item in iter_items(root)}
+
+
+def test_iter_items_lists_documents_and_archive_members(tree):
+    items = items_by_name(tree)
+
+    assert sorted(items) == sorted([
+        "a.pdf", "sous_dossier/scan.png",
+        "lot.zip!dossier/z.pdf", "lot.zip!dossier/z.png",
+        "lot.tar!t.pdf", "lot.tar!t.png",
+        "lot.tar.gz!t.pdf", "lot.tar.gz!t.png"
+    ])
+    assert items["a.pdf"].kind == 'pdf'
+    assert items["lot.tar.gz!t.png"].kind == 'image'
+
+
+@pytest.mark.parametrize("name", ["a.pdf", "lot.zip!dossier/z.pdf", "lot.tar!t.pdf", "lot.tar.gz!t.pdf"])
+def test_members_are_read_back_intact(tree, pdf_bytes, name):
+    item = items_by_name(tree)[name]
+
+    assert item.size == len(pdf_bytes)
+    assert item.read_bytes() == pdf_bytes
+    with item.open() as stream:
+        assert stream.seekable()
+        stream.seek(5)
+        assert stream.read(10) == pdf_bytes[5:15]
+
+
+@pytest.mark.parametrize("name", ["lot.zip!dossier/z.png", "lot.tar!t.png", "lot.tar.gz!t.png"])
+def test_item_from_name_reopens_member(tree, png_bytes, name):
+    item = item_from_name(tree / name)
+
+    assert item.kind == 'image'
+    assert item.read_bytes() == png_bytes
+
+
+def test_source_is_a_path_or_bytes(tree, pdf_bytes):
+    items = items_by_name(tree)
+
+    assert items["a.pdf"].source() == str(tree / "a.pdf")
+    assert items["lot.zip!dossier/z.pdf"].source() == pdf_bytes
+    # Membre de TAR compressé: extrait une fois dans le dossier temporaire
+    with open(items["lot.tar.gz!t.pdf"].source(), 'rb') as f:
+        assert f.read() == pdf_bytes
+
+
+def test_prescan_counts_pages(tree):
+    items = items_by_name(tree)
+
+    assert items["a.pdf"].prescan()['pages'] == 2
+    assert items["lot.tar!t.pdf"].prescan()['pages'] == 2
+    assert items["lot.zip!dossier/z.png"].prescan()['pages'] == 1
+
+
+def test_output_stem_differs_for_same_file_name(tree, pdf_bytes):
+    (tree / "sous_dossier" / "a.pdf").write_bytes(pdf_bytes)
+    items = items_by_name(tree)
+
+    first, second = items["a.pdf"], items["sous_dossier/a.pdf"]
+    assert first.stem == second.stem == "a"
+    assert first.output_stem != second.output_stem
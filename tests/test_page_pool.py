@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.utils.page_pool import SharedPagePool, StaleHandleError
+
+
+@pytest.fixture
+def pool():
+    pool = SharedPagePool(slots=2, slot_mb=1)
+    yield pool
+    pool.close()
+
+
+def test_put_view_roundtrip(pool):
+    page = np.arange(100 * 80, dtype=np.uint8).reshape(100, 80)
+
+    handle = pool.put(page)
+
+    assert pool.in_use() == 1
+    np.testing.assert_array_equal(pool.view(handle), page)
+
+
+def test_borrow_releases_slot(pool):
+    handle = pool.put(np.ones((10, 10), dtype=np.uint8))
+
+    with pool.borrow(handle) as view:
+        assert view.sum() == 100
+
+    assert pool.in_use() == 0
+    with pytest.raises(StaleHandleError):
+        pool.view(handle)
+
+
+def test_stale_handle_after_slot_reuse(pool):
+    first = pool.put(np.zeros((4, 4), dtype=np.uint8))
+    pool.release(first)
+    for _ in range(pool.slots):
+        pool.put(np.ones((4, 4), dtype=np.uint8))
+
+    with pytest.raises(StaleHandleError):
+        pool.view(first)
+    # Libérer un handle périmé est sans effet
+    assert not pool.release(first)
+    assert pool.in_use() == pool.slots
+
+
+def test_page_too_large_releases_slot(pool):
+    with pytest.raises(ValueError):
+        pool.put(np.zeros((2 * 1024 * 1024,), dtype=np.uint8))
+    assert pool.in_use() == 0
+
+
+def test_full_pool_times_out(pool):
+    for _ in range(pool.slots):
+        pool.put(np.zeros((4, 4), dtype=np.uint8))
+
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.2)
+
+
+def test_reclaim_unclaimed_pages(pool):
+    published = pool.put(np.zeros((4, 4), dtype=np.uint8))
+    claimed = pool.put(np.zeros((4, 4), dtype=np.uint8))
+    pool.claim(claimed)
+
+    # Seule la page publiée et jamais réclamée est récupérée
+    assert pool.reclaim_unclaimed(timeout=0) == 1
+    assert pool.in_use() == 1
+    with pytest.raises(StaleHandleError):
+        pool.view(published)
+    pool.view(claimed)
+
+
+def test_reclaim_by_owner_pid(pool):
+    pool.put(np.zeros((4, 4), dtype=np.uint8))
+    pool.put(np.zeros((4, 4), dtype=np.uint8))
+
+    assert pool.reclaim(os.getpid()) == 2
+    assert pool.in_use() == 0
+    pool.acquire(timeout=0.1)
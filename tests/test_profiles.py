@@ -0,0 +1,49 @@
+import pytest
+
+from src.config.config import PERFORMANCE_PROFILES
+from src.config.profiles import resolve_profile
+
+
+def test_default_profile():
+    settings = resolve_profile()
+    assert settings['name'] == "balanced"
+    assert settings['dpi'] == PERFORMANCE_PROFILES['balanced']['dpi']
+
+
+def test_extends_overrides_only_given_keys():
+    profiles = dict(PERFORMANCE_PROFILES)
+    profiles['scans_rapides'] = {'extends': "fast", 'dpi': 250}
+    profiles['scans_rapides_debruites'] = {'extends': "scans_rapides", 'denoise': True}
+
+    settings = resolve_profile("scans_rapides_debruites", profiles)
+
+    assert settings['name'] == "scans_rapides_debruites"
+    assert settings['dpi'] == 250
+    assert settings['denoise'] is True
+    assert settings['ocr_profile'] == PERFORMANCE_PROFILES['fast']['ocr_profile']
+    assert 'extends' not in settings
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError, match="inconnu"):
+        resolve_profile("introuvable")
+
+
+def test_circular_extends():
+    profiles = dict(PERFORMANCE_PROFILES)
+    profiles['a'] = {'extends': "b"}
+    profiles['b'] = {'extends': "a"}
+
+    with pytest.raises(ValueError, match="circulaire"):
+        resolve_profile("a", profiles)
+
+
+def test_unknown_and_missing_keys():
+    profiles = dict(PERFORMANCE_PROFILES)
+    profiles['typo'] = {'extends': "fast", 'dpii': 100}
+    profiles['incomplet'] = {'dpi': 100}
+
+    with pytest.raises(ValueError, match="dpii"):
+        resolve_profile("typo", profiles)
+    with pytest.raises(ValueError, match="manquante"):
+        resolve_profile("incomplet", profiles)
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from src.utils import resource_manager
+from src.utils.resource_manager import CoreBudget, applied_threads
+
+
+@pytest.fixture(autouse=True)
+def restore_process_state(monkeypatch):
+    """apply() modifie l'environnement et les threads du processus: état restauré après chaque test"""
+    import cv2
+
+    monkeypatch.setenv('OMP_THREAD_LIMIT', "0")
+    monkeypatch.setenv('OMP_NUM_THREADS', "0")
+    monkeypatch.setattr(resource_manager, '_applied_threads', None)
+    opencv_threads = cv2.getNumThreads()
+    yield
+    cv2.setNumThreads(opencv_threads)
+
+
+def test_threads_per_worker():
+    assert CoreBudget(8, 2, pin=False).threads_per_worker == 4
+    assert CoreBudget(3, 8, pin=False).threads_per_worker == 1
+
+
+def test_apply_sets_thread_limits():
+    applied = CoreBudget(8, 2, pin=False).apply(worker_index=1)
+
+    assert applied['threads'] == 4
+    assert applied['page_workers'] == 1
+    assert applied['tesseract_threads'] == 4
+    assert os.environ['OMP_THREAD_LIMIT'] == "4"
+    assert os.environ['OMP_NUM_THREADS'] == "4"
+    assert applied_threads() == 4
+    assert applied['cpu_affinity'] is None
+
+
+@pytest.mark.parametrize("page_workers, threads", [(2, 4), (3, 2), (16, 1), (0, 8)])
+def test_apply_splits_threads_between_page_workers(page_workers, threads):
+    applied = CoreBudget(8, 1, pin=False).apply(page_workers=page_workers)
+
+    assert applied['threads'] == threads
+    assert applied['page_workers'] == max(1, page_workers)
+    assert os.environ['OMP_THREAD_LIMIT'] == str(threads)
+    assert applied_threads() == threads
+
+
+def test_tesseract_threads_override(monkeypatch):
+    monkeypatch.setitem(resource_manager.RESOURCE_CONFIG, 'tesseract_threads', 1)
+
+    applied = CoreBudget(8, 1, pin=False).apply()
+
+    assert applied['threads'] == 8
+    assert applied['tesseract_threads'] == 1
+    assert os.environ['OMP_THREAD_LIMIT'] == "1"
+
+
+def test_cores_for_gives_each_worker_its_slice():
+    budget = CoreBudget(4, 2, pin=False)
+    if hasattr(os, 'sched_getaffinity'):
+        available = sorted(os.sched_getaffinity(0))
+    else:
+        available = list(range(os.cpu_count() or 1))
+
+    cores = budget.cores_for(1)
+
+    assert len(cores) == budget.threads_per_worker
+    assert cores[0] == available[budget.threads_per_worker % len(available)]
+    assert set(cores) <= set(available)
@@ -0,0 +1,79 @@
+import pytest
+import yaml
+
+from src.config.config import CLASSES, RULES_CONFIG
+from src.config.rules import RuleStore, builtin_rules, compile_rules
+
+
+@pytest.fixture
+def rules_data():
+    with open(RULES_CONFIG['builtin_path'], encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+@pytest.fixture
+def rules_file(tmp_path, rules_data):
+    path = tmp_path / "rules.yaml"
+    path.write_text(yaml.safe_dump(rules_data, allow_unicode=True), encoding='utf-8')
+    return path
+
+
+def write_rules(path, data):
+    path.write_text(yaml.safe_dump(data, allow_unicode=True), encoding='utf-8')
+
+
+def test_builtin_rules_come_from_packaged_file(rules_data):
+    rules = builtin_rules()
+
+    assert set(rules.keywords) == set(CLASSES)
+    assert rules.version.startswith(f"{rules_data['version']}+")
+    assert rules.fusion == rules_data['fusion']
+
+
+def test_keyword_regex_matches_longest_first(rules_data):
+    rules = compile_rules(rules_data, version="test")
+
+    match = rules.keyword_regex.search("relevé de compte: solde créditeur")
+    assert match is not None
+    assert ('releve_bancaire', 'compte') in rules.keyword_index['compte']
+
+
+def test_invalid_rules_are_rejected(rules_data):
+    rules_data['fusion']['rejection_threshold'] = 2.0
+    with pytest.raises(ValueError):
+        compile_rules(rules_data, version="test")
+
+    rules_data['fusion']['rejection_threshold'] = 0.6
+    rules_data['template_features']['identite']['word_text_density'] = [0.5, 0.1]
+    with pytest.raises(ValueError):
+        compile_rules(rules_data, version="test")
+
+
+def test_reload_publishes_new_rules_and_notifies(rules_file, rules_data):
+    store = RuleStore(rules_file, check_interval=-1)
+    seen = []
+    store.subscribe(seen.append)
+    before = store.current()
+
+    rules_data['fusion']['rejection_threshold'] = 0.42
+    write_rules(rules_file, rules_data)
+    after = store.reload(force=True)
+
+    assert after is store.current()
+    assert after.version != before.version
+    assert after.fusion['rejection_threshold'] == 0.42
+    assert seen == [after]
+
+
+def test_invalid_file_keeps_previous_rules(rules_file):
+    store = RuleStore(rules_file, check_interval=-1)
+    previous = store.current()
+
+    rules_file.write_text("keywords: [pas, un, dictionnaire]\n", encoding='utf-8')
+    assert store.reload(force=True) is previous
+    assert store.current() is previous
+
+
+def test_missing_file_falls_back_to_builtin(tmp_path):
+    store = RuleStore(tmp_path / "absent.yaml", check_interval=-1)
+    assert store.current() is builtin_rules()
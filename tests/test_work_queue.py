@@ -0,0 +1,94 @@
+import json
+import time
+
+import pytest
+
+from src.utils.work_queue import WorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return WorkQueue(tmp_path / "queue.db", visibility_timeout=60, max_attempts=2)
+
+
+def test_enqueue_ignores_duplicates(queue):
+    assert queue.enqueue(["a.pdf", "b.pdf"]) == 2
+    assert queue.enqueue(["a.pdf", "c.pdf"]) == 1
+    assert queue.stats() == {'pending': 3, 'leased': 0, 'done': 0, 'failed': 0}
+
+
+def test_claim_longest_first(queue):
+    queue.enqueue(["court.pdf", "long.pdf", "moyen.pdf"],
+                  costs={"court.pdf": 1.0, "long.pdf": 30.0, "moyen.pdf": 5.0})
+
+    claimed = [queue.claim("w1") for _ in range(3)]
+
+    assert claimed == ["long.pdf", "moyen.pdf", "court.pdf"]
+    assert queue.claim("w1") is None
+    assert queue.stats()['leased'] == 3
+
+
+def test_complete_and_merge(queue):
+    queue.enqueue(["a.pdf"])
+    path = queue.claim("w1")
+
+    assert queue.complete(path, "w1", {'results': [{'page_number': 1}], 'pages_count': 1})
+    assert queue.is_drained()
+
+    report = queue.merge()
+    assert report["a.pdf"]['worker'] == "w1"
+    assert report["a.pdf"]['pages_count'] == 1
+    assert report['_summary']['queue']['done'] == 1
+
+
+def test_expired_lease_is_reassigned_and_stale_complete_is_ignored(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.db", visibility_timeout=0.05, max_attempts=3)
+    queue.enqueue(["a.pdf"])
+    assert queue.claim("lent") == "a.pdf"
+
+    time.sleep(0.1)
+    assert queue.claim("rapide") == "a.pdf"
+    assert not queue.heartbeat("a.pdf", "lent")
+
+    # Le worker dont le bail a expiré ne termine pas le PDF et ne laisse pas de résultat
+    assert not queue.complete("a.pdf", "lent", {'results': [], 'stale': True})
+    assert queue.complete("a.pdf", "rapide", {'results': []})
+
+    entry = queue.merge()["a.pdf"]
+    assert entry['worker'] == "rapide"
+    assert 'stale' not in entry
+    assert len(list(queue.results_dir.glob("*.json"))) == 1
+
+
+def test_fail_retries_then_fails(queue):
+    queue.enqueue(["a.pdf"])
+
+    queue.fail(queue.claim("w1"), "w1", "erreur 1")
+    assert queue.stats()['pending'] == 1
+
+    queue.fail(queue.claim("w1"), "w1", "erreur 2")
+    assert queue.stats()['failed'] == 1
+    assert queue.claim("w1") is None
+
+    entry = queue.merge()["a.pdf"]
+    assert entry['error'] == "erreur 2"
+    assert entry['attempts'] == 2
+
+
+def test_release_frees_leases_of_dead_worker(queue):
+    queue.enqueue(["a.pdf", "b.pdf"])
+    queue.claim("mort")
+    queue.claim("mort")
+
+    assert queue.release("mort", "worker disparu") == 2
+    assert queue.stats()['pending'] == 2
+    assert queue.claim("vivant") is not None
+
+
+def test_result_file_is_json(queue):
+    queue.enqueue(["a.pdf"])
+    queue.complete(queue.claim("w1"), "w1", {'results': []})
+
+    (result_file,) = queue.results_dir.glob("*.json")
+    with open(result_file, encoding='utf-8') as f:
+        assert json.load(f)['path'] == "a.pdf"